@@ -4,45 +4,100 @@
 """
 
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 from wordcloud import WordCloud
-from collections import Counter
+import hashlib
 import os
-from data_preprocessing import load_and_preprocess_data, get_top_channels_by_category, clean_korean_text, setup_matplotlib
+from data_preprocessing import load_and_preprocess_data, get_top_channels_by_category, setup_matplotlib, find_korean_font_path
+from korean_tokenizer import tokenize_titles
+from keyword_analysis import iter_title_chunks, count_top_keywords_streaming, get_distinctive_keywords, count_title_terms
 
-def generate_wordcloud(text, title, ax, font_path=None, max_words=100):
+# 워드클라우드 캔버스 크기 및 최대 단어 수 (preview는 빠른 확인용 저해상도)
+WORDCLOUD_SETTINGS = {
+    'full': {'width': 800, 'height': 400, 'max_words': 100, 'dpi': 300},
+    'preview': {'width': 400, 'height': 200, 'max_words': 50, 'dpi': 100}
+}
+
+def render_wordcloud(frequencies, width, height, max_words, font_path=None, cache_dir="cache"):
+    """
+    워드클라우드 이미지를 생성합니다.
+    빈도표와 설정이 같으면 이전에 배치한 이미지를 캐시에서 재사용합니다.
+
+    Parameters:
+    frequencies (dict): {키워드: 빈도}
+    width (int): 캔버스 너비
+    height (int): 캔버스 높이
+    max_words (int): 최대 단어 수
+    font_path (str): 한글 폰트 경로
+    cache_dir (str): 이미지 캐시 디렉토리 (None이면 캐시 미사용)
+
+    Returns:
+    np.ndarray: 워드클라우드 이미지 (height × width × 3)
+    """
+    # 빈도표 + 렌더링 설정 해시를 캐시 키로 사용
+    cache_key = hashlib.sha1(
+        repr((sorted(frequencies.items()), width, height, max_words, font_path)).encode('utf-8')
+    ).hexdigest()
+    cache_path = os.path.join(cache_dir, 'wordcloud', f'{cache_key}.npy') if cache_dir else None
+
+    if cache_path and os.path.exists(cache_path):
+        return np.load(cache_path)
+
+    wordcloud = WordCloud(
+        width=width,
+        height=height,
+        background_color='white',
+        max_words=max_words,
+        font_path=font_path,
+        colormap='coolwarm',
+        contour_color='black',
+        contour_width=1,
+        random_state=42
+    ).generate_from_frequencies(frequencies)
+    image = wordcloud.to_array()
+
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        np.save(cache_path, image)
+
+    return image
+
+def generate_wordcloud(frequencies, title, ax, font_path=None, max_words=None, preview=False, cache_dir="cache"):
     """
     워드클라우드를 생성합니다.
 
     Parameters:
-    text (str): 워드클라우드에 사용할 텍스트
+    frequencies (dict): 워드클라우드에 사용할 {키워드: 빈도} (n-gram 구문 포함)
     title (str): 그래프 제목
     ax: matplotlib axes 객체
     font_path (str): 한글 폰트 경로
-    max_words (int): 최대 단어 수
+    max_words (int): 최대 단어 수 (None이면 preview 여부에 따른 기본값)
+    preview (bool): 작은 캔버스와 적은 단어 수로 빠르게 생성
+    cache_dir (str): 워드클라우드 이미지 캐시 디렉토리
     """
-    if not text.strip():
+    if not frequencies:
         ax.text(0.5, 0.5, 'No Data Available', ha='center', va='center', fontsize=16)
         ax.set_title(title, fontsize=16, weight='bold')
         ax.axis('off')
         return
 
-    wordcloud = WordCloud(
-        width=800,
-        height=400,
-        background_color='white',
-        max_words=max_words,
+    settings = WORDCLOUD_SETTINGS['preview' if preview else 'full']
+    image = render_wordcloud(
+        frequencies,
+        settings['width'],
+        settings['height'],
+        settings['max_words'] if max_words is None else max_words,
         font_path=font_path,
-        colormap='coolwarm',
-        contour_color='black',
-        contour_width=1
-    ).generate(text)
+        cache_dir=cache_dir
+    )
 
-    ax.imshow(wordcloud, interpolation='bilinear')
+    ax.imshow(image, interpolation='bilinear')
     ax.axis('off')
     ax.set_title(title, fontsize=16, weight='bold')
 
-def analyze_wordcloud_by_category(df, category, save_path="visualizations"):
+def analyze_wordcloud_by_category(df, category, save_path="visualizations", tokenizer='simple', ngram_range=(1, 2),
+                                  font_path=None, preview=False):
     """
     특정 카테고리의 워드클라우드 분석을 수행합니다.
 
@@ -50,7 +105,14 @@ def analyze_wordcloud_by_category(df, category, save_path="visualizations"):
     df (pd.DataFrame): 전체 데이터프레임
     category (str): 분석할 카테고리
     save_path (str): 저장할 경로
+    tokenizer (str or callable): 제목 토큰화 방식 (korean_tokenizer.get_tokenizer 참고)
+    ngram_range (tuple): 워드클라우드에 포함할 (최소 n, 최대 n) 구문 길이
+    font_path (str): 한글 폰트 경로 (None이면 시스템에서 탐색)
+    preview (bool): 저해상도 미리보기 모드
     """
+    if font_path is None:
+        font_path = find_korean_font_path()
+
     # 카테고리별 데이터 필터링
     category_df = df[df['카테고리'] == category].copy()
 
@@ -65,22 +127,19 @@ def analyze_wordcloud_by_category(df, category, save_path="visualizations"):
         print(f"No channels found for category: {category}")
         return
 
-    # 각 채널별 제목 결합
+    # 각 채널별 / 전체 카테고리 단어 및 구문 빈도 집계
     channel_titles = {}
-    for channel in top_channels:
-        channel_df = category_df[category_df['채널명'] == channel]
-        if '제목' in channel_df.columns:
-            titles = ' '.join(channel_df['제목'].dropna().astype(str))
-            # 한글만 추출
-            korean_titles = clean_korean_text(titles)
-            channel_titles[channel] = korean_titles
-
-    # 전체 카테고리 제목 결합
+    all_korean_titles = {}
     if '제목' in category_df.columns:
-        all_titles = ' '.join(category_df['제목'].dropna().astype(str))
-        all_korean_titles = clean_korean_text(all_titles)
-    else:
-        all_korean_titles = ""
+        title_tokens = tokenize_titles(category_df['제목'], tokenizer=tokenizer)
+
+        channel_terms = count_title_terms(title_tokens, groups=category_df['채널명'], ngram_range=ngram_range)
+        channel_terms = channel_terms[channel_terms['그룹'].isin(top_channels)]
+        for channel, terms in channel_terms.groupby('그룹', sort=False):
+            channel_titles[channel] = dict(zip(terms['키워드'], terms['빈도']))
+
+        all_terms = count_title_terms(title_tokens, ngram_range=ngram_range)
+        all_korean_titles = dict(zip(all_terms['키워드'], all_terms['빈도']))
 
     # 시각화
     num_channels = len(top_channels)
@@ -91,16 +150,20 @@ def analyze_wordcloud_by_category(df, category, save_path="visualizations"):
     for i, channel in enumerate(top_channels):
         if i < len(axes) - 1:  # 마지막 자리는 전체용으로 남겨둠
             generate_wordcloud(
-                channel_titles.get(channel, ""),
+                channel_titles.get(channel, {}),
                 f'{channel} - {category} 워드클라우드',
-                axes[i]
+                axes[i],
+                font_path=font_path,
+                preview=preview
             )
 
     # 전체 카테고리 워드클라우드 생성
     generate_wordcloud(
         all_korean_titles,
         f'{category} 전체 워드클라우드',
-        axes[-1]
+        axes[-1],
+        font_path=font_path,
+        preview=preview
     )
 
     # 빈 subplot 숨기기
@@ -111,26 +174,34 @@ def analyze_wordcloud_by_category(df, category, save_path="visualizations"):
 
     # 저장
     os.makedirs(save_path, exist_ok=True)
-    plt.savefig(f'{save_path}/01_wordcloud_{category}.png', dpi=300, bbox_inches='tight')
+    dpi = WORDCLOUD_SETTINGS['preview' if preview else 'full']['dpi']
+    plt.savefig(f'{save_path}/01_wordcloud_{category}.png', dpi=dpi, bbox_inches='tight')
     plt.show()
 
     return channel_titles
 
-def analyze_all_categories_wordcloud(df, save_path="visualizations"):
+def analyze_all_categories_wordcloud(df, save_path="visualizations", tokenizer='simple', ngram_range=(1, 2), preview=False):
     """
     모든 카테고리의 워드클라우드 분석을 수행합니다.
 
     Parameters:
     df (pd.DataFrame): 전체 데이터프레임
     save_path (str): 저장할 경로
+    tokenizer (str or callable): 제목 토큰화 방식
+    ngram_range (tuple): 워드클라우드에 포함할 (최소 n, 최대 n) 구문 길이
+    preview (bool): 저해상도 미리보기 모드
     """
     categories = df['카테고리'].unique()
 
+    # 한글 폰트 경로는 한 번만 찾아서 모든 워드클라우드에 전달
+    font_path = find_korean_font_path()
+
     results = {}
     for category in categories:
         print(f"Processing wordcloud analysis for category: {category}")
         try:
-            channel_titles = analyze_wordcloud_by_category(df, category, save_path)
+            channel_titles = analyze_wordcloud_by_category(df, category, save_path, tokenizer, ngram_range,
+                                                           font_path=font_path, preview=preview)
             results[category] = channel_titles
         except Exception as e:
             print(f"Error processing {category}: {str(e)}")
@@ -138,7 +209,7 @@ def analyze_all_categories_wordcloud(df, save_path="visualizations"):
 
     return results
 
-def get_top_keywords_by_category(df, category, top_n=20):
+def get_top_keywords_by_category(df, category, top_n=20, tokenizer='simple', chunksize=None, ngram_range=(1, 1)):
     """
     카테고리별 상위 키워드를 추출합니다.
 
@@ -146,6 +217,9 @@ def get_top_keywords_by_category(df, category, top_n=20):
     df (pd.DataFrame): 전체 데이터프레임
     category (str): 카테고리명
     top_n (int): 상위 몇 개 키워드를 가져올지
+    tokenizer (str or callable): 제목 토큰화 방식 (korean_tokenizer.get_tokenizer 참고)
+    chunksize (int): 지정하면 청크 단위 스트리밍 근사 집계 사용 (keyword_analysis.count_top_keywords_streaming)
+    ngram_range (tuple): (최소 n, 최대 n) 키워드 길이, 예: (1, 3)이면 단어와 2-3단어 구문 포함
 
     Returns:
     list: 상위 키워드 리스트
@@ -155,18 +229,20 @@ def get_top_keywords_by_category(df, category, top_n=20):
     if category_df.empty or '제목' not in category_df.columns:
         return []
 
-    # 모든 제목 결합
-    all_titles = ' '.join(category_df['제목'].dropna().astype(str))
-    clean_titles = clean_korean_text(all_titles)
+    # 스트리밍 모드: 메모리 사용량이 제한된 근사 상위 키워드 집계
+    if chunksize:
+        top_keywords = count_top_keywords_streaming(
+            iter_title_chunks(category_df, chunksize=chunksize), top_n=top_n, tokenizer=tokenizer,
+            ngram_range=ngram_range
+        )
+        return top_keywords['키워드'].tolist()
 
-    # 단어 분리 및 카운트
-    words = clean_titles.split()
-    # 한 글자 단어 제거
-    words = [word for word in words if len(word) > 1]
+    # 제목 토큰화 (조사 제거, 한 글자 단어 제거)
+    title_tokens = tokenize_titles(category_df['제목'], tokenizer=tokenizer)
 
     # 상위 키워드 추출
-    word_counts = Counter(words)
-    top_keywords = [word for word, count in word_counts.most_common(top_n)]
+    word_counts = count_title_terms(title_tokens, ngram_range=ngram_range, top_n=top_n)
+    top_keywords = word_counts['키워드'].tolist()
 
     return top_keywords
 
@@ -186,5 +262,18 @@ if __name__ == "__main__":
         keywords = get_top_keywords_by_category(df, category, top_n=10)
         print(f"\n{category}: {', '.join(keywords[:10])}")
 
+    # 카테고리별 상위 구문 출력 (2-3단어)
+    print("\n=== 카테고리별 상위 구문 ===")
+    for category in df['카테고리'].unique():
+        phrases = get_top_keywords_by_category(df, category, top_n=10, ngram_range=(2, 3))
+        print(f"\n{category}: {', '.join(phrases)}")
+
+    # 채널별 특징 키워드 출력 (카테고리 내 다른 채널 대비 TF-IDF)
+    print("\n=== 채널별 특징 키워드 (TF-IDF) ===")
+    for category in df['카테고리'].unique():
+        distinctive = get_distinctive_keywords(df, category, top_n=5)
+        for channel, group in distinctive.groupby('채널명', sort=False):
+            print(f"{category} - {channel}: {', '.join(group['키워드'])}")
+
     print("\n워드클라우드 분석이 완료되었습니다!")
     print("결과는 visualizations/ 폴더에 저장되었습니다.")
\ No newline at end of file
@@ -9,9 +9,10 @@ import seaborn as sns
 import numpy as np
 import os
 from data_preprocessing import load_and_preprocess_data, filter_by_category, get_top_channels_by_category, setup_matplotlib, format_numbers
+from upload_timing_cube import build_timing_cube, get_channel_best_timing, bootstrap_best_slots, build_timing_slices, DAY_ORDER
 from matplotlib.ticker import FuncFormatter
 
-def analyze_upload_timing_by_category(df, category, save_path="visualizations"):
+def analyze_upload_timing_by_category(df, category, save_path="visualizations", timing_cube=None, timezone=None):
     """
     특정 카테고리의 업로드 타이밍 분석을 수행합니다.
 
@@ -19,6 +20,8 @@ def analyze_upload_timing_by_category(df, category, save_path="visualizations"):
     df (pd.DataFrame): 전체 데이터프레임
     category (str): 분석할 카테고리
     save_path (str): 저장할 경로
+    timing_cube (TimingCube): 미리 생성한 타이밍 큐브 (None이면 카테고리 데이터로 생성)
+    timezone (int or str): 결과를 볼 시간대 (UTC 오프셋 또는 시간대 이름, None이면 KST)
     """
     category_df = filter_by_category(df, category)
 
@@ -26,6 +29,13 @@ def analyze_upload_timing_by_category(df, category, save_path="visualizations"):
         print(f"No data found for category: {category}")
         return
 
+    # 카테고리 내 채널별 요일 × 시간대 큐브 (대상 시간대로 회전)
+    if timing_cube is None:
+        timing_cube = build_timing_cube(category_df)
+    if timezone is not None:
+        timing_cube = timing_cube.to_timezone(timezone)
+    category_cube = timing_cube.select('카테고리', category)
+
     # 요일별 한국어 매핑
     day_mapping = {
         'Monday': '월요일',
@@ -37,12 +47,11 @@ def analyze_upload_timing_by_category(df, category, save_path="visualizations"):
         'Sunday': '일요일'
     }
 
-    # 요일별, 시간대별 평균 조회수 계산
-    day_views = category_df.groupby('요일')['조회수'].mean().reindex(
-        ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    )
+    # 요일별, 시간대별 평균 조회수 계산 (카테고리 전체 합산 큐브의 슬라이스)
+    total_cube = category_cube.aggregate('카테고리')
+    day_views = total_cube.day_means().iloc[0]
 
-    hour_views = category_df.groupby('시간대')['조회수'].mean()
+    hour_views = total_cube.hour_means().iloc[0].dropna()
 
     # 시각화
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
@@ -73,10 +82,13 @@ def analyze_upload_timing_by_category(df, category, save_path="visualizations"):
     ax2.yaxis.set_major_formatter(FuncFormatter(format_numbers))
     ax2.set_xticks(range(0, 24, 3))
 
-    # 최고/최저 시간대 표시
+    # 최고/최저 시간대 표시 (최고 시간대가 실제로 최적일 부트스트랩 확률 포함)
     max_hour = hour_views.idxmax()
     min_hour = hour_views.idxmin()
-    ax2.axvline(x=max_hour, color='red', linestyle='--', alpha=0.7, label=f'최고: {max_hour}시')
+    hour_bootstrap = bootstrap_best_slots(category_df, group_cols=('카테고리',), slot='hour', timezone=timezone).loc[category]
+    best_hour_probability = hour_bootstrap.loc[max_hour, '최적확률']
+    ax2.axvline(x=max_hour, color='red', linestyle='--', alpha=0.7,
+                label=f'최고: {max_hour}시 (최적 확률 {best_hour_probability:.0%})')
     ax2.axvline(x=min_hour, color='blue', linestyle='--', alpha=0.7, label=f'최저: {min_hour}시')
     ax2.legend()
 
@@ -85,12 +97,12 @@ def analyze_upload_timing_by_category(df, category, save_path="visualizations"):
     top_channels = get_top_channels_by_category(df, category, top_n=5)
 
     if top_channels:
-        channel_best_days = {}
-        for channel in top_channels:
-            channel_df = category_df[category_df['채널명'] == channel]
-            if not channel_df.empty:
-                best_day = channel_df.groupby('요일')['조회수'].mean().idxmax()
-                channel_best_days[channel] = day_mapping.get(best_day, best_day)
+        channel_best_timing = get_channel_best_timing(category_cube).droplevel('카테고리')
+        channel_best_timing = channel_best_timing.reindex(top_channels).dropna(subset=['최적요일'])
+        channel_best_days = {
+            channel: day_mapping.get(best_day, best_day)
+            for channel, best_day in channel_best_timing['최적요일'].items()
+        }
 
         if channel_best_days:
             channels = list(channel_best_days.keys())
@@ -107,18 +119,9 @@ def analyze_upload_timing_by_category(df, category, save_path="visualizations"):
 
     # 4. 히트맵: 요일 × 시간대 조회수 분포
     ax4 = axes[1, 1]
-    if '요일' in category_df.columns and '시간대' in category_df.columns:
-        # 피벗 테이블 생성
-        heatmap_data = category_df.pivot_table(
-            values='조회수',
-            index='요일',
-            columns='시간대',
-            aggfunc='mean'
-        )
-
-        # 요일 순서 정렬
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        heatmap_data = heatmap_data.reindex(day_order)
+    if len(category_cube) > 0:
+        # 요일 × 시간대 평균 조회수 (영상이 없는 시간대 열 제외)
+        heatmap_data = category_cube.heatmap().dropna(axis=1, how='all')
         heatmap_data.index = [day_mapping.get(day, day) for day in heatmap_data.index]
 
         sns.heatmap(heatmap_data, cmap='YlOrRd', cbar_kws={'label': '평균 조회수'}, ax=ax4)
@@ -140,27 +143,36 @@ def analyze_upload_timing_by_category(df, category, save_path="visualizations"):
         'best_hour': hour_views.idxmax(),
         'worst_hour': hour_views.idxmin(),
         'day_views': day_views.to_dict(),
-        'hour_views': hour_views.to_dict()
+        'hour_views': hour_views.to_dict(),
+        'best_slot': total_cube.best_slots().iloc[0].to_dict(),
+        'best_hour_probability': best_hour_probability,
+        'best_hour_ci': (hour_bootstrap.loc[max_hour, '하한'], hour_bootstrap.loc[max_hour, '상한'])
     }
 
     return results
 
-def analyze_upload_timing_summary(df, save_path="visualizations"):
+def analyze_upload_timing_summary(df, save_path="visualizations", timezone=None):
     """
     모든 카테고리의 업로드 타이밍 요약 분석을 수행합니다.
 
     Parameters:
     df (pd.DataFrame): 전체 데이터프레임
     save_path (str): 저장할 경로
+    timezone (int or str): 결과를 볼 시간대 (UTC 오프셋 또는 시간대 이름, None이면 KST)
     """
     categories = df['카테고리'].unique()
     results = {}
 
+    # 전체 데이터를 한 번만 순회하여 타이밍 큐브 생성
+    timing_cube = build_timing_cube(df)
+    if timezone is not None:
+        timing_cube = timing_cube.to_timezone(timezone)
+
     # 각 카테고리별 분석
     for category in categories:
         print(f"Processing upload timing analysis for category: {category}")
         try:
-            category_results = analyze_upload_timing_by_category(df, category, save_path)
+            category_results = analyze_upload_timing_by_category(df, category, save_path, timing_cube, timezone)
             results[category] = category_results
         except Exception as e:
             print(f"Error processing {category}: {str(e)}")
@@ -224,6 +236,56 @@ def analyze_upload_timing_summary(df, save_path="visualizations"):
 
     return results
 
+def analyze_best_slot_trends(df, save_path="visualizations", freq='M', window=3, recent_periods=24, timezone=None):
+    """
+    카테고리별 최적 업로드 요일/시간대가 기간에 따라 어떻게 변했는지 분석합니다.
+
+    Parameters:
+    df (pd.DataFrame): 전체 데이터프레임
+    save_path (str): 저장할 경로
+    freq (str): 기간 단위 ('M': 월, 'Q': 분기)
+    window (int): 롤링 윈도우 기간 수
+    recent_periods (int): 시각화할 최근 기간 수
+    timezone (int or str): 결과를 볼 시간대 (UTC 오프셋 또는 시간대 이름, None이면 KST)
+
+    Returns:
+    pd.DataFrame: (기간, 카테고리)별 최적 요일/시간대 변화
+    """
+    # 기간별 카테고리 × 요일 × 시간대 슬라이스 (롤링 윈도우는 누적합 차이로 계산)
+    timing_slices = build_timing_slices(df, freq=freq)
+    if timezone is not None:
+        timing_slices = timing_slices.to_timezone(timezone)
+
+    history = timing_slices.best_slot_history(window=window)
+    history = history[history.index.get_level_values('기간') >= timing_slices.periods[-recent_periods:][0]]
+
+    fig, axes = plt.subplots(2, 1, figsize=(16, 12), sharex=True)
+    day_codes = {day: i for i, day in enumerate(DAY_ORDER)}
+
+    for category, category_history in history.groupby(level='카테고리', sort=False):
+        periods = category_history.index.get_level_values('기간').to_timestamp()
+        axes[0].plot(periods, category_history['최적요일'].map(day_codes), marker='o', label=category, alpha=0.7)
+        axes[1].plot(periods, category_history['최적시간대'], marker='o', label=category, alpha=0.7)
+
+    axes[0].set_title(f'카테고리별 최적 업로드 요일 변화 (최근 {window}개 기간 롤링)', fontsize=14, weight='bold')
+    axes[0].set_yticks(range(7))
+    axes[0].set_yticklabels(['월요일', '화요일', '수요일', '목요일', '금요일', '토요일', '일요일'])
+    axes[0].legend(bbox_to_anchor=(1.02, 1), loc='upper left')
+
+    axes[1].set_title(f'카테고리별 최적 업로드 시간대 변화 (최근 {window}개 기간 롤링)', fontsize=14, weight='bold')
+    axes[1].set_ylabel('시간대', fontsize=12)
+    axes[1].set_yticks(range(0, 24, 3))
+    axes[1].set_xlabel('기간', fontsize=12)
+
+    plt.tight_layout()
+
+    # 저장
+    os.makedirs(save_path, exist_ok=True)
+    plt.savefig(f'{save_path}/02_upload_timing_trends.png', dpi=300, bbox_inches='tight')
+    plt.show()
+
+    return history
+
 if __name__ == "__main__":
     # 실행 예시
     setup_matplotlib()
@@ -240,5 +302,13 @@ if __name__ == "__main__":
         if 'best_day' in result and 'best_hour' in result:
             print(f"{category}: {result['best_day']} {result['best_hour']}시")
 
+    # 최근 2년간 최적 업로드 슬롯 변화
+    slot_history = analyze_best_slot_trends(df)
+    latest_period = slot_history.index.get_level_values('기간').max()
+    print("\n=== 최근 기간 카테고리별 최적 업로드 타이밍 (3개월 롤링) ===")
+    for category, row in slot_history.loc[latest_period].iterrows():
+        if row['최적요일'] is not None:
+            print(f"{category}: {row['최적요일']} {int(row['최적시간대'])}시")
+
     print("\n업로드 타이밍 분석이 완료되었습니다!")
     print("결과는 visualizations/ 폴더에 저장되었습니다.")
\ No newline at end of file
@@ -10,8 +10,85 @@ import numpy as np
 import os
 from datetime import datetime, timedelta
 from data_preprocessing import load_and_preprocess_data, filter_by_category, get_top_channels_by_category, setup_matplotlib, format_numbers
+from plot_utils import density_scatter
+from trend_fitting import plot_trend
 from matplotlib.ticker import FuncFormatter
 
+# 업로드 간격 구간 (1일, 2-3일, 4-7일, 8-14일, 15일+, 같은 날 업로드는 0일로 매일 구간에 포함)
+UPLOAD_INTERVAL_BINS = [-np.inf, 1, 3, 7, 14, np.inf]
+UPLOAD_INTERVAL_LABELS = ['매일 (1일)', '2-3일', '주 1-2회 (4-7일)', '격주 (8-14일)', '월 1-2회 (15일+)']
+
+def add_upload_intervals(df):
+    """
+    모든 채널의 업로드 간격과 간격 구간을 한 번에 계산합니다.
+    채널명·게시일 순으로 한 번 정렬한 뒤 채널별 차분으로 직전 영상과의 간격(일)을 구합니다.
+
+    Parameters:
+    df (pd.DataFrame): 데이터프레임 (채널명, 게시일 컬럼 필요)
+
+    Returns:
+    pd.DataFrame: 채널명·게시일 순으로 정렬되고 업로드간격, 업로드주기구간 컬럼이 추가된 데이터프레임
+                  (채널의 첫 영상은 간격이 없으므로 NaN)
+    """
+    sorted_df = df[df['게시일'].notna()].sort_values(['채널명', '게시일'], kind='stable')
+
+    # 날짜 단위 간격 (같은 날 업로드는 0일)
+    upload_days = sorted_df['게시일'].dt.normalize()
+    sorted_df['업로드간격'] = upload_days.groupby(sorted_df['채널명'], sort=False).diff().dt.days
+    sorted_df['업로드주기구간'] = pd.cut(sorted_df['업로드간격'], bins=UPLOAD_INTERVAL_BINS,
+                                   labels=UPLOAD_INTERVAL_LABELS)
+
+    return sorted_df
+
+def calculate_upload_frequencies(df, channels=None):
+    """
+    여러 채널의 업로드 주기를 한 번에 계산합니다.
+
+    Parameters:
+    df (pd.DataFrame): 데이터프레임
+    channels (list): 계산할 채널명 목록 (None이면 전체 채널)
+
+    Returns:
+    dict: 채널명 → 업로드 주기 정보 (평균/중앙 간격은 같은 날 업로드를 제외하고 계산)
+    """
+    if df.empty or '게시일' not in df.columns:
+        return {}
+
+    if channels is not None:
+        df = df[df['채널명'].isin(channels)]
+    interval_df = add_upload_intervals(df)
+
+    # 같은 날 여러 업로드를 제외한 간격 통계
+    positive = interval_df[interval_df['업로드간격'] > 0]
+    interval_stats = positive.groupby('채널명')['업로드간격'].agg(['mean', 'median'])
+    interval_lists = positive.groupby('채널명')['업로드간격'].agg(list)
+
+    # 채널 × 주기 구간별 평균 성과
+    frequency_performance = interval_df.groupby(['채널명', '업로드주기구간'], observed=True).agg({
+        '조회수': 'mean',
+        '좋아요 수': 'mean',
+        '댓글 수': 'mean'
+    }).round(0)
+    channel_performance = {
+        channel: performance.droplevel('채널명')
+        for channel, performance in frequency_performance.groupby(level='채널명', sort=False)
+    }
+
+    results = {}
+    for channel, channel_df in interval_df.groupby('채널명', sort=False):
+        if channel not in interval_lists.index:
+            continue
+
+        results[channel] = {
+            'avg_interval': interval_stats.at[channel, 'mean'],
+            'median_interval': interval_stats.at[channel, 'median'],
+            'intervals': interval_lists[channel],
+            'frequency_performance': channel_performance[channel],
+            'channel_data': channel_df
+        }
+
+    return results
+
 def calculate_upload_frequency(df, channel_name):
     """
     특정 채널의 업로드 주기를 계산합니다.
@@ -23,62 +100,211 @@ def calculate_upload_frequency(df, channel_name):
     Returns:
     dict: 업로드 주기 정보
     """
-    channel_df = df[df['채널명'] == channel_name].copy()
+    return calculate_upload_frequencies(df, [channel_name]).get(channel_name, {})
 
-    if channel_df.empty or '게시일' not in channel_df.columns:
-        return {}
+def _interval_features(intervals):
+    """
+    업로드 간격(일)을 모델 설명변수 [log(1+간격), log(1+간격)^2]로 변환합니다.
+    """
+    log_intervals = np.log1p(intervals)
+    return np.column_stack([log_intervals, log_intervals ** 2])
+
+def fit_interval_performance_model(df, value_col='조회수', max_interval=60):
+    """
+    직전 영상과의 실제 업로드 간격과 다음 영상 조회수의 관계를 채널 고정효과 모델로 추정합니다.
+    log(1+조회수) = 채널 효과 + b1·log(1+간격) + b2·log(1+간격)^2 를
+    채널별 평균을 뺀(within 변환) 뒤 전체 영상에 대해 한 번의 최소제곱으로 풉니다.
 
-    # 날짜 순으로 정렬
-    channel_df = channel_df.sort_values('게시일')
+    Parameters:
+    df (pd.DataFrame): 데이터프레임 (채널명, 게시일, 조회수 컬럼 필요)
+    value_col (str): 성과 컬럼
+    max_interval (int): 간격 상한 (이보다 긴 간격은 상한값으로 절단)
 
-    # 업로드 간격 계산 (일 단위)
-    upload_dates = channel_df['게시일'].dt.date
-    intervals = []
+    Returns:
+    dict: 계수, 최적 간격(일), 채널 내 결정계수, 영상/채널 수, 채널 효과, 간격별 예상 조회수 배율
+          (영상 간격이 있는 채널이 없으면 빈 dict)
+    """
+    interval_df = add_upload_intervals(df)
+    interval_df = interval_df[interval_df['업로드간격'].notna() & interval_df[value_col].notna()]
 
-    for i in range(1, len(upload_dates)):
-        interval = (upload_dates.iloc[i] - upload_dates.iloc[i-1]).days
-        if interval > 0:  # 같은 날 여러 업로드 제외
-            intervals.append(interval)
+    if interval_df.empty:
+        return {}
 
-    if not intervals:
+    channel_codes, channels = pd.factorize(interval_df['채널명'])
+    channel_sizes = np.bincount(channel_codes)
+    intervals = np.minimum(interval_df['업로드간격'].to_numpy(dtype=np.float64), max_interval)
+    features = _interval_features(intervals)
+    target = np.log1p(interval_df[value_col].to_numpy(dtype=np.float64))
+
+    # 채널별 평균을 빼서 채널 고정효과 제거 (within 변환)
+    feature_means = np.column_stack([
+        np.bincount(channel_codes, weights=features[:, j]) / channel_sizes for j in range(features.shape[1])
+    ])
+    target_means = np.bincount(channel_codes, weights=target) / channel_sizes
+    within_features = features - feature_means[channel_codes]
+    within_target = target - target_means[channel_codes]
+
+    coefficients, _, rank, _ = np.linalg.lstsq(within_features, within_target, rcond=None)
+    if rank < features.shape[1]:
         return {}
 
-    avg_interval = np.mean(intervals)
-    median_interval = np.median(intervals)
-
-    # 주기별 성과 계산
-    channel_df['업로드간격'] = [0] + intervals  # 첫 번째 영상은 0
-
-    # 업로드 간격을 그룹으로 나누기 (1일, 2-3일, 4-7일, 8-14일, 15일+)
-    def categorize_interval(interval):
-        if interval <= 1:
-            return '매일 (1일)'
-        elif interval <= 3:
-            return '2-3일'
-        elif interval <= 7:
-            return '주 1-2회 (4-7일)'
-        elif interval <= 14:
-            return '격주 (8-14일)'
-        else:
-            return '월 1-2회 (15일+)'
-
-    channel_df['업로드주기구간'] = channel_df['업로드간격'].apply(categorize_interval)
-
-    # 주기별 평균 성과
-    frequency_performance = channel_df.groupby('업로드주기구간').agg({
-        '조회수': 'mean',
-        '좋아요 수': 'mean',
-        '댓글 수': 'mean'
-    }).round(0)
+    residuals = within_target - within_features @ coefficients
+    total = within_target @ within_target
+    r_squared = 1 - residuals @ residuals / total if total > 0 else np.nan
+
+    # 이차식 꼭짓점이 최대값이면 최적 간격, 아니면 범위 내 예측 최대값
+    candidate_intervals = np.arange(0, max_interval + 1)
+    effects = _interval_features(candidate_intervals) @ coefficients
+    if coefficients[1] < 0:
+        optimal_interval = float(np.clip(np.expm1(-coefficients[0] / (2 * coefficients[1])), 0, max_interval))
+    else:
+        optimal_interval = float(candidate_intervals[effects.argmax()])
 
     return {
-        'avg_interval': avg_interval,
-        'median_interval': median_interval,
-        'intervals': intervals,
-        'frequency_performance': frequency_performance,
-        'channel_data': channel_df
+        'coefficients': coefficients,
+        'optimal_interval': optimal_interval,
+        'r_squared': r_squared,
+        'n_videos': len(interval_df),
+        'n_channels': len(channels),
+        'channel_effects': pd.Series(target_means - feature_means @ coefficients, index=channels),
+        'view_multipliers': pd.Series(np.exp(effects - effects.max()), index=candidate_intervals, name='조회수배율')
     }
 
+def _cadence_chunk(daily_counts, max_period):
+    """
+    채널 묶음의 일별 업로드 수 행렬에서 자기상관을 FFT로 계산하고 주기 피크를 찾습니다.
+    """
+    n_days = daily_counts.shape[1]
+    centered = daily_counts - daily_counts.mean(axis=1, keepdims=True)
+
+    # Wiener-Khinchin: 0 패딩한 FFT 파워 스펙트럼의 역변환 = 선형 자기상관
+    n_fft = 1 << int(np.ceil(np.log2(2 * n_days)))
+    spectrum = np.fft.rfft(centered, n=n_fft, axis=1)
+    autocorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft, axis=1)[:, :max_period + 2]
+
+    variance = autocorr[:, 0]
+    constant = variance <= 1e-12
+    autocorr = autocorr / np.where(constant, 1.0, variance)[:, None]
+
+    # 2일 이상 시차의 국소 최대값 중 가장 큰 자기상관을 주기로 선택
+    lags = np.arange(2, max_period + 1)
+    candidates = autocorr[:, lags]
+    is_peak = (candidates >= autocorr[:, lags - 1]) & (candidates >= autocorr[:, lags + 1]) & (candidates > 0)
+    peak_values = np.where(is_peak, candidates, -np.inf)
+    best = peak_values.argmax(axis=1)
+    best_values = peak_values[np.arange(len(best)), best]
+
+    has_peak = np.isfinite(best_values)
+    periods = np.where(has_peak, lags[best], np.nan)
+    regularity = np.where(has_peak, best_values, 0.0)
+
+    # 매일 같은 수만큼 업로드하는 채널은 1일 주기, 완전 규칙적
+    periods[constant] = 1
+    regularity[constant] = 1.0
+
+    return periods, regularity
+
+def calculate_upload_cadence(df, window_days=364, max_period=60, min_uploads=5, chunk_size=2000):
+    """
+    모든 채널의 업로드 주기성(주기, 규칙성 점수)을 한 번에 계산합니다.
+    채널마다 마지막 업로드까지 window_days일 동안의 일별 업로드 수 시계열을 만들고,
+    채널 묶음 단위로 FFT 기반 자기상관을 계산하여 가장 강한 주기를 찾습니다.
+
+    Parameters:
+    df (pd.DataFrame): 데이터프레임 (채널명, 게시일 컬럼 필요)
+    window_days (int): 채널별 분석 기간 (일)
+    max_period (int): 탐색할 최대 주기 (일)
+    min_uploads (int): 분석 기간 내 최소 업로드 수 (미만인 채널은 제외)
+    chunk_size (int): 한 번에 FFT를 계산할 채널 수 (메모리 ≈ chunk_size × 4 × window_days)
+
+    Returns:
+    pd.DataFrame: 채널별 주기(일), 규칙성점수(주기 시차의 자기상관, 0~1), 업로드일비율, 업로드수
+    """
+    max_period = min(max_period, window_days // 2 - 1)
+    valid_df = df[df['게시일'].notna()]
+
+    # 채널별 마지막 업로드일 기준 경과 일수 → (채널, 일) 칸 번호
+    upload_days = valid_df['게시일'].dt.normalize()
+    channel_codes, channels = pd.factorize(valid_df['채널명'])
+    last_days = upload_days.groupby(channel_codes).transform('max')
+    day_offsets = window_days - 1 - (last_days - upload_days).dt.days.to_numpy()
+
+    in_window = day_offsets >= 0
+    cells = channel_codes[in_window] * window_days + day_offsets[in_window]
+    daily_counts = np.bincount(cells, minlength=len(channels) * window_days).reshape(len(channels), window_days)
+
+    upload_counts = daily_counts.sum(axis=1)
+    upload_day_ratio = (daily_counts > 0).mean(axis=1)
+    eligible = np.flatnonzero(upload_counts >= min_uploads)
+
+    periods = np.full(len(channels), np.nan)
+    regularity = np.full(len(channels), np.nan)
+    for start in range(0, len(eligible), chunk_size):
+        rows = eligible[start:start + chunk_size]
+        periods[rows], regularity[rows] = _cadence_chunk(daily_counts[rows].astype(np.float64), max_period)
+
+    return pd.DataFrame({
+        '주기': periods,
+        '규칙성점수': regularity,
+        '업로드일비율': upload_day_ratio,
+        '업로드수': upload_counts
+    }, index=pd.Index(channels, name='채널명')).iloc[eligible]
+
+def analyze_upload_cadence_by_category(df, category, save_path="visualizations", window_days=364):
+    """
+    특정 카테고리 채널들의 업로드 주기성(정기 업로드 여부)을 분석합니다.
+
+    Parameters:
+    df (pd.DataFrame): 전체 데이터프레임
+    category (str): 분석할 카테고리
+    save_path (str): 저장할 경로
+    window_days (int): 채널별 분석 기간 (일)
+
+    Returns:
+    pd.DataFrame: 채널별 주기, 규칙성 점수, 평균 조회수
+    """
+    category_df = filter_by_category(df, category)
+
+    if category_df.empty:
+        print(f"No data found for category: {category}")
+        return
+
+    cadence = calculate_upload_cadence(category_df, window_days=window_days)
+
+    if cadence.empty:
+        print(f"No valid upload cadence data for category: {category}")
+        return
+
+    cadence['평균조회수'] = category_df.groupby('채널명')['조회수'].mean().reindex(cadence.index)
+
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+
+    # 1. 채널별 주기 분포
+    ax1 = axes[0]
+    period_counts = cadence['주기'].dropna().astype(int).value_counts().sort_index()
+    ax1.bar(period_counts.index, period_counts.values, color='skyblue', alpha=0.7)
+    ax1.set_title(f'{category} - 채널별 업로드 주기 분포', fontsize=14, weight='bold')
+    ax1.set_xlabel('주기 (일)', fontsize=12)
+    ax1.set_ylabel('채널 수', fontsize=12)
+
+    # 2. 규칙성 점수 vs 평균 조회수
+    ax2 = axes[1]
+    density_scatter(ax2, cadence['규칙성점수'], cadence['평균조회수'], color='purple', alpha=0.6)
+    plot_trend(ax2, cadence['규칙성점수'], cadence['평균조회수'], log_y=True)
+    ax2.set_title(f'{category} - 업로드 규칙성 vs 평균 조회수', fontsize=14, weight='bold')
+    ax2.set_xlabel('규칙성 점수', fontsize=12)
+    ax2.set_ylabel('평균 조회수', fontsize=12)
+    ax2.yaxis.set_major_formatter(FuncFormatter(format_numbers))
+
+    plt.tight_layout()
+
+    # 저장
+    os.makedirs(save_path, exist_ok=True)
+    plt.savefig(f'{save_path}/03_upload_cadence_{category}.png', dpi=300, bbox_inches='tight')
+    plt.show()
+
+    return cadence
+
 def analyze_upload_frequency_by_category(df, category, save_path="visualizations"):
     """
     특정 카테고리의 업로드 주기 분석을 수행합니다.
@@ -101,12 +327,9 @@ def analyze_upload_frequency_by_category(df, category, save_path="visualizations
         print(f"No channels found for category: {category}")
         return
 
-    # 각 채널별 업로드 주기 분석
-    channel_results = {}
-    for channel in top_channels:
-        result = calculate_upload_frequency(category_df, channel)
-        if result:
-            channel_results[channel] = result
+    # 상위 채널의 업로드 주기를 한 번에 분석 (상위 채널 순서 유지)
+    frequencies = calculate_upload_frequencies(category_df, top_channels)
+    channel_results = {channel: frequencies[channel] for channel in top_channels if channel in frequencies}
 
     if not channel_results:
         print(f"No valid upload frequency data for category: {category}")
@@ -145,7 +368,7 @@ def analyze_upload_frequency_by_category(df, category, save_path="visualizations
     if all_frequency_data:
         combined_data = pd.concat(all_frequency_data, ignore_index=True)
 
-        frequency_views = combined_data.groupby('업로드주기구간')['조회수'].mean().sort_values(ascending=False)
+        frequency_views = combined_data.groupby('업로드주기구간', observed=True)['조회수'].mean().sort_values(ascending=False)
 
         bars2 = ax2.bar(range(len(frequency_views)), frequency_views.values, color='lightcoral', alpha=0.7)
         ax2.set_title(f'{category} - 업로드 주기별 평균 조회수', fontsize=14, weight='bold')
@@ -163,7 +386,7 @@ def analyze_upload_frequency_by_category(df, category, save_path="visualizations
     # 3. 업로드 주기별 평균 좋아요 수
     ax3 = axes[2]
     if all_frequency_data:
-        frequency_likes = combined_data.groupby('업로드주기구간')['좋아요 수'].mean().sort_values(ascending=False)
+        frequency_likes = combined_data.groupby('업로드주기구간', observed=True)['좋아요 수'].mean().sort_values(ascending=False)
 
         bars3 = ax3.bar(range(len(frequency_likes)), frequency_likes.values, color='lightgreen', alpha=0.7)
         ax3.set_title(f'{category} - 업로드 주기별 평균 좋아요 수', fontsize=14, weight='bold')
@@ -189,41 +412,34 @@ def analyze_upload_frequency_by_category(df, category, save_path="visualizations
         ax4.set_ylabel('업로드 간격 (일)', fontsize=12)
         ax4.tick_params(axis='x', rotation=45)
 
-    # 5. 업로드 주기와 조회수 상관관계 산점도
+    # 5. 실제 업로드 간격 vs 조회수 (카테고리 전체 채널 고정효과 모델)
     ax5 = axes[4]
+    interval_model = fit_interval_performance_model(category_df)
     if all_frequency_data:
-        # 업로드간격을 숫자로 변환
-        interval_mapping = {
-            '매일 (1일)': 1,
-            '2-3일': 2.5,
-            '주 1-2회 (4-7일)': 5.5,
-            '격주 (8-14일)': 11,
-            '월 1-2회 (15일+)': 20
-        }
-
-        combined_data['업로드간격_숫자'] = combined_data['업로드주기구간'].map(interval_mapping)
-
-        # 유효한 데이터만 필터링
-        valid_data = combined_data.dropna(subset=['업로드간격_숫자', '조회수'])
+        valid_data = combined_data.dropna(subset=['업로드간격', '조회수'])
 
         if not valid_data.empty:
-            ax5.scatter(valid_data['업로드간격_숫자'], valid_data['조회수'], alpha=0.6, color='purple')
+            density_scatter(ax5, valid_data['업로드간격'], valid_data['조회수'], color='purple', alpha=0.6)
             ax5.set_title(f'{category} - 업로드 간격 vs 조회수', fontsize=14, weight='bold')
             ax5.set_xlabel('업로드 간격 (일)', fontsize=12)
             ax5.set_ylabel('조회수', fontsize=12)
             ax5.yaxis.set_major_formatter(FuncFormatter(format_numbers))
 
-            # 추세선 추가
-            if len(valid_data) > 1:
-                z = np.polyfit(valid_data['업로드간격_숫자'], valid_data['조회수'], 1)
-                p = np.poly1d(z)
-                ax5.plot(valid_data['업로드간격_숫자'], p(valid_data['업로드간격_숫자']), "r--", alpha=0.8)
+            # 상위 채널 평균 효과 기준 예상 조회수 곡선과 최적 간격
+            if interval_model:
+                channel_effect = interval_model['channel_effects'].reindex(list(channel_results.keys())).mean()
+                curve_intervals = np.linspace(0, min(valid_data['업로드간격'].max(), 60), 200)
+                curve_views = np.expm1(channel_effect + _interval_features(curve_intervals) @ interval_model['coefficients'])
+                ax5.plot(curve_intervals, curve_views, "r--", alpha=0.8, label='채널 고정효과 모델')
+                ax5.axvline(x=interval_model['optimal_interval'], color='red', linestyle=':', alpha=0.7,
+                            label=f"최적 간격: {interval_model['optimal_interval']:.1f}일")
+                ax5.legend()
 
     # 6. 최적 업로드 주기 추천
     ax6 = axes[5]
     if all_frequency_data:
         # 조회수와 좋아요수를 종합한 성과 점수 계산
-        frequency_performance = combined_data.groupby('업로드주기구간').agg({
+        frequency_performance = combined_data.groupby('업로드주기구간', observed=True).agg({
             '조회수': 'mean',
             '좋아요 수': 'mean'
         })
@@ -256,6 +472,10 @@ def analyze_upload_frequency_by_category(df, category, save_path="visualizations
     plt.savefig(f'{save_path}/03_upload_frequency_{category}.png', dpi=300, bbox_inches='tight')
     plt.show()
 
+    if interval_model:
+        print(f"{category} - 모델 기준 최적 업로드 간격: {interval_model['optimal_interval']:.1f}일 "
+              f"(영상 {interval_model['n_videos']:,}개, 채널 {interval_model['n_channels']:,}개)")
+
     return channel_results
 
 def analyze_all_categories_upload_frequency(df, save_path="visualizations"):
@@ -300,5 +520,15 @@ if __name__ == "__main__":
                 category_avg = np.mean(avg_intervals)
                 print(f"{category}: 평균 {category_avg:.1f}일")
 
+    # 업로드 주기성 분석
+    print("\n=== 카테고리별 업로드 주기성 ===")
+    for category in df['카테고리'].unique():
+        cadence = analyze_upload_cadence_by_category(df, category)
+        if cadence is not None:
+            regular = cadence[cadence['규칙성점수'] >= 0.3]
+            periods = cadence['주기'].dropna()
+            main_period = f"주요 주기 {periods.mode().iloc[0]:.0f}일" if not periods.empty else "주기 없음"
+            print(f"{category}: 규칙적 채널 {len(regular)}/{len(cadence)}개, {main_period}")
+
     print("\n업로드 주기 분석이 완료되었습니다!")
     print("결과는 visualizations/ 폴더에 저장되었습니다.")
\ No newline at end of file
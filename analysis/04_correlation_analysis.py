@@ -8,8 +8,13 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import os
-from scipy.stats import pearsonr, spearmanr
 from data_preprocessing import load_and_preprocess_data, filter_by_category, get_top_channels_by_category, setup_matplotlib, format_numbers
+from plot_utils import density_scatter
+from trend_fitting import plot_trend
+from correlation_engine import (calculate_grouped_correlations, correlation_metrics_dict, compute_correlation_moments,
+                                permutation_test_correlations,
+                                combine_correlation_moments, merge_correlation_moments, moments_to_correlations,
+                                load_correlation_moments, save_correlation_moments)
 from matplotlib.ticker import FuncFormatter
 
 def calculate_correlation_metrics(df, x_col, y_col):
@@ -24,31 +29,32 @@ def calculate_correlation_metrics(df, x_col, y_col):
     Returns:
     dict: 상관관계 지표
     """
-    # 유효한 데이터만 필터링
-    valid_data = df[[x_col, y_col]].dropna()
+    correlations = calculate_grouped_correlations(df, group_cols=(), pairs=[(x_col, y_col)])
+    return correlation_metrics_dict(correlations, x_col=x_col, y_col=y_col)
 
-    if len(valid_data) < 2:
-        return {}
-
-    # 피어슨 상관계수
-    pearson_corr, pearson_p = pearsonr(valid_data[x_col], valid_data[y_col])
+def update_correlation_moments(new_df, moments_path="data/correlation_moments.pkl"):
+    """
+    새로 수집한 영상만으로 채널별 상관관계 누적 통계량을 갱신하고 저장합니다.
+    기존 영상은 다시 읽지 않으며, 카테고리·전체 상관계수는 채널 통계량을 병합하여 정확히 계산합니다.
 
-    # 스피어만 상관계수
-    spearman_corr, spearman_p = spearmanr(valid_data[x_col], valid_data[y_col])
+    Parameters:
+    new_df (pd.DataFrame): 새로 추가된 영상 데이터
+    moments_path (str): 누적 통계량 저장 경로
 
-    # R² 계산
-    r_squared = pearson_corr ** 2
+    Returns:
+    dict: 채널별, 카테고리별, 전체 Pearson 상관관계 DataFrame
+    """
+    moments = merge_correlation_moments(load_correlation_moments(moments_path), compute_correlation_moments(new_df))
+    save_correlation_moments(moments, moments_path)
 
     return {
-        'pearson_correlation': pearson_corr,
-        'pearson_p_value': pearson_p,
-        'spearman_correlation': spearman_corr,
-        'spearman_p_value': spearman_p,
-        'r_squared': r_squared,
-        'sample_size': len(valid_data)
+        'channel': moments_to_correlations(moments),
+        'category': moments_to_correlations(combine_correlation_moments(moments, ['카테고리', 'x', 'y'])),
+        'overall': moments_to_correlations(combine_correlation_moments(moments, ['x', 'y']))
     }
 
-def analyze_correlation_by_category(df, category, save_path="visualizations"):
+def analyze_correlation_by_category(df, category, save_path="visualizations", permutation_test=False,
+                                    n_permutations=2000, n_jobs=1):
     """
     특정 카테고리의 상관관계 분석을 수행합니다.
 
@@ -56,6 +62,9 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
     df (pd.DataFrame): 전체 데이터프레임
     category (str): 분석할 카테고리
     save_path (str): 저장할 경로
+    permutation_test (bool): 상위 채널의 조회수-좋아요/댓글 상관관계 순열 검정 수행 여부
+    n_permutations (int): 순열 수
+    n_jobs (int): 순열 검정 프로세스 수
     """
     category_df = filter_by_category(df, category)
 
@@ -70,10 +79,11 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
         print(f"Missing columns for {category}: {missing_cols}")
         return
 
-    # 상관관계 계산
-    views_likes_corr = calculate_correlation_metrics(category_df, '조회수', '좋아요 수')
-    views_comments_corr = calculate_correlation_metrics(category_df, '조회수', '댓글 수')
-    likes_comments_corr = calculate_correlation_metrics(category_df, '좋아요 수', '댓글 수')
+    # 세 지표 쌍의 상관관계를 한 번에 계산
+    correlations = calculate_grouped_correlations(category_df, group_cols=())
+    views_likes_corr = correlation_metrics_dict(correlations, x_col='조회수', y_col='좋아요 수')
+    views_comments_corr = correlation_metrics_dict(correlations, x_col='조회수', y_col='댓글 수')
+    likes_comments_corr = correlation_metrics_dict(correlations, x_col='좋아요 수', y_col='댓글 수')
 
     # 시각화
     fig, axes = plt.subplots(2, 3, figsize=(18, 12))
@@ -83,7 +93,7 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
     valid_data = category_df[['조회수', '좋아요 수']].dropna()
 
     if not valid_data.empty:
-        ax1.scatter(valid_data['조회수'], valid_data['좋아요 수'], alpha=0.6, color='blue')
+        density_scatter(ax1, valid_data['조회수'], valid_data['좋아요 수'], color='blue', alpha=0.6)
         ax1.set_title(f'{category} - 조회수 vs 좋아요 수', fontsize=14, weight='bold')
         ax1.set_xlabel('조회수', fontsize=12)
         ax1.set_ylabel('좋아요 수', fontsize=12)
@@ -96,11 +106,8 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
             ax1.text(0.05, 0.95, corr_text, transform=ax1.transAxes, verticalalignment='top',
                     bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
-        # 추세선 추가
-        if len(valid_data) > 1:
-            z = np.polyfit(valid_data['조회수'], valid_data['좋아요 수'], 1)
-            p = np.poly1d(z)
-            ax1.plot(valid_data['조회수'], p(valid_data['조회수']), "r--", alpha=0.8)
+        # 추세선 추가 (바이럴 영상에 강건한 Theil-Sen)
+        plot_trend(ax1, valid_data['조회수'], valid_data['좋아요 수'])
 
         ax1.xaxis.set_major_formatter(FuncFormatter(format_numbers))
         ax1.yaxis.set_major_formatter(FuncFormatter(format_numbers))
@@ -110,7 +117,7 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
     valid_data = category_df[['조회수', '댓글 수']].dropna()
 
     if not valid_data.empty:
-        ax2.scatter(valid_data['조회수'], valid_data['댓글 수'], alpha=0.6, color='green')
+        density_scatter(ax2, valid_data['조회수'], valid_data['댓글 수'], color='green', alpha=0.6)
         ax2.set_title(f'{category} - 조회수 vs 댓글 수', fontsize=14, weight='bold')
         ax2.set_xlabel('조회수', fontsize=12)
         ax2.set_ylabel('댓글 수', fontsize=12)
@@ -123,11 +130,8 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
             ax2.text(0.05, 0.95, corr_text, transform=ax2.transAxes, verticalalignment='top',
                     bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
-        # 추세선 추가
-        if len(valid_data) > 1:
-            z = np.polyfit(valid_data['조회수'], valid_data['댓글 수'], 1)
-            p = np.poly1d(z)
-            ax2.plot(valid_data['조회수'], p(valid_data['조회수']), "r--", alpha=0.8)
+        # 추세선 추가 (바이럴 영상에 강건한 Theil-Sen)
+        plot_trend(ax2, valid_data['조회수'], valid_data['댓글 수'])
 
         ax2.xaxis.set_major_formatter(FuncFormatter(format_numbers))
         ax2.yaxis.set_major_formatter(FuncFormatter(format_numbers))
@@ -137,7 +141,7 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
     valid_data = category_df[['좋아요 수', '댓글 수']].dropna()
 
     if not valid_data.empty:
-        ax3.scatter(valid_data['좋아요 수'], valid_data['댓글 수'], alpha=0.6, color='orange')
+        density_scatter(ax3, valid_data['좋아요 수'], valid_data['댓글 수'], color='orange', alpha=0.6)
         ax3.set_title(f'{category} - 좋아요 수 vs 댓글 수', fontsize=14, weight='bold')
         ax3.set_xlabel('좋아요 수', fontsize=12)
         ax3.set_ylabel('댓글 수', fontsize=12)
@@ -150,11 +154,8 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
             ax3.text(0.05, 0.95, corr_text, transform=ax3.transAxes, verticalalignment='top',
                     bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
-        # 추세선 추가
-        if len(valid_data) > 1:
-            z = np.polyfit(valid_data['좋아요 수'], valid_data['댓글 수'], 1)
-            p = np.poly1d(z)
-            ax3.plot(valid_data['좋아요 수'], p(valid_data['좋아요 수']), "r--", alpha=0.8)
+        # 추세선 추가 (바이럴 영상에 강건한 Theil-Sen)
+        plot_trend(ax3, valid_data['좋아요 수'], valid_data['댓글 수'])
 
         ax3.xaxis.set_major_formatter(FuncFormatter(format_numbers))
         ax3.yaxis.set_major_formatter(FuncFormatter(format_numbers))
@@ -174,14 +175,31 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
     if top_channels:
         channel_correlations = []
         channel_names = []
+        channel_keys = []
+
+        # 상위 채널의 상관관계를 한 번에 계산 (최소 3개 이상의 데이터가 있어야 상관관계 계산 가능)
+        top_channel_correlations = calculate_grouped_correlations(
+            category_df[category_df['채널명'].isin(top_channels)], group_cols=('채널명',),
+            pairs=[('조회수', '좋아요 수')], min_samples=3
+        )
 
         for channel in top_channels:
-            channel_df = category_df[category_df['채널명'] == channel]
-            if len(channel_df) > 2:  # 최소 3개 이상의 데이터가 있어야 상관관계 계산 가능
-                corr_metrics = calculate_correlation_metrics(channel_df, '조회수', '좋아요 수')
-                if corr_metrics:
-                    channel_correlations.append(corr_metrics['pearson_correlation'])
-                    channel_names.append(channel[:15] + '...' if len(channel) > 15 else channel)
+            corr_metrics = correlation_metrics_dict(top_channel_correlations, channel, '조회수', '좋아요 수')
+            if corr_metrics:
+                channel_correlations.append(corr_metrics['pearson_correlation'])
+                channel_names.append(channel[:15] + '...' if len(channel) > 15 else channel)
+                channel_keys.append(channel)
+
+        # 정규성 가정 없는 순열 검정 p-value (채널별 소요 시간 출력)
+        channel_permutation_tests = None
+        if permutation_test:
+            channel_permutation_tests = permutation_test_correlations(
+                category_df[category_df['채널명'].isin(top_channels)], group_cols=('채널명',),
+                n_permutations=n_permutations, n_jobs=n_jobs
+            )
+            channel_runtimes = channel_permutation_tests.groupby(level='채널명')['runtime_seconds'].sum()
+            for channel, runtime in channel_runtimes.items():
+                print(f"  {channel}: 순열 검정 {n_permutations}회 {runtime * 1000:.1f}ms")
 
         if channel_correlations:
             bars = ax5.bar(range(len(channel_names)), channel_correlations,
@@ -195,26 +213,24 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
             ax5.axhline(y=0.5, color='orange', linestyle='--', alpha=0.7, label='중간 상관관계 (0.5)')
             ax5.legend()
 
-            # 막대 위에 값 표시
-            for bar, value in zip(bars, channel_correlations):
+            # 막대 위에 값 표시 (순열 검정 시 p-value 포함)
+            for bar, value, channel in zip(bars, channel_correlations, channel_keys):
+                label = f'{value:.3f}'
+                if channel_permutation_tests is not None and (channel, '조회수', '좋아요 수') in channel_permutation_tests.index:
+                    label += f"\np={channel_permutation_tests.loc[(channel, '조회수', '좋아요 수'), 'permutation_p_value']:.3f}"
                 ax5.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
-                        f'{value:.3f}', ha='center', va='bottom', fontsize=10)
+                        label, ha='center', va='bottom', fontsize=10)
 
     # 6. 참여도 지표 분석 (좋아요율, 댓글율)
     ax6 = axes[1, 2]
 
-    # 참여도 지표 계산
-    category_df_copy = category_df.copy()
-    category_df_copy['좋아요율'] = (category_df_copy['좋아요 수'] / category_df_copy['조회수'] * 100).fillna(0)
-    category_df_copy['댓글율'] = (category_df_copy['댓글 수'] / category_df_copy['조회수'] * 100).fillna(0)
-
-    # 유효한 데이터만 필터링 (이상치 제거)
-    valid_engagement = category_df_copy[
-        (category_df_copy['좋아요율'] <= 50) & (category_df_copy['댓글율'] <= 10)  # 현실적인 범위로 제한
+    # 유효한 데이터만 필터링 (이상치 제거, 좋아요율/댓글율은 전처리에서 계산됨)
+    valid_engagement = category_df[
+        (category_df['좋아요율'] <= 50) & (category_df['댓글율'] <= 10)  # 현실적인 범위로 제한
     ]
 
     if not valid_engagement.empty:
-        ax6.scatter(valid_engagement['좋아요율'], valid_engagement['댓글율'], alpha=0.6, color='purple')
+        density_scatter(ax6, valid_engagement['좋아요율'], valid_engagement['댓글율'], color='purple', alpha=0.6)
         ax6.set_title(f'{category} - 좋아요율 vs 댓글율', fontsize=14, weight='bold')
         ax6.set_xlabel('좋아요율 (%)', fontsize=12)
         ax6.set_ylabel('댓글율 (%)', fontsize=12)
@@ -240,6 +256,8 @@ def analyze_correlation_by_category(df, category, save_path="visualizations"):
         'likes_comments_correlation': likes_comments_corr,
         'correlation_matrix': correlation_matrix.to_dict()
     }
+    if permutation_test and top_channels:
+        results['channel_permutation_tests'] = channel_permutation_tests
 
     return results
 
@@ -8,32 +8,15 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import os
+import warnings
 from scipy.stats import pearsonr
-from data_preprocessing import load_and_preprocess_data, filter_by_category, get_top_channels_by_category, setup_matplotlib, format_numbers
+from data_preprocessing import load_and_preprocess_data, filter_by_category, get_top_channels_by_category, setup_matplotlib, format_numbers, DURATION_LABELS
+from plot_utils import density_scatter
+from trend_fitting import plot_trend
+from quantile_sketch import build_quantile_sketches
 from matplotlib.ticker import FuncFormatter
 
-def categorize_video_duration(duration_minutes):
-    """
-    영상 길이를 카테고리로 분류합니다.
-
-    Parameters:
-    duration_minutes (float): 영상 길이 (분)
-
-    Returns:
-    str: 길이 카테고리
-    """
-    if duration_minutes <= 5:
-        return '초단편 (5분 이하)'
-    elif duration_minutes <= 15:
-        return '단편 (5-15분)'
-    elif duration_minutes <= 30:
-        return '중편 (15-30분)'
-    elif duration_minutes <= 60:
-        return '장편 (30-60분)'
-    else:
-        return '초장편 (60분 초과)'
-
-def analyze_duration_performance_by_category(df, category, save_path="visualizations"):
+def analyze_duration_performance_by_category(df, category, save_path="visualizations", quantile_sketches=None):
     """
     특정 카테고리의 영상 길이와 성과 분석을 수행합니다.
 
@@ -41,6 +24,7 @@ def analyze_duration_performance_by_category(df, category, save_path="visualizat
     df (pd.DataFrame): 전체 데이터프레임
     category (str): 분석할 카테고리
     save_path (str): 저장할 경로
+    quantile_sketches (dict): 카테고리 단위 분위수 스케치 (재생 시간(분), 조회수), None이면 정확한 분위수 계산
     """
     category_df = filter_by_category(df, category)
 
@@ -57,9 +41,13 @@ def analyze_duration_performance_by_category(df, category, save_path="visualizat
     category_df = category_df.copy()
     category_df = category_df.dropna(subset=['재생 시간(분)', '조회수'])
 
-    # 이상치 제거 (99th percentile 기준)
-    duration_99th = category_df['재생 시간(분)'].quantile(0.99)
-    views_99th = category_df['조회수'].quantile(0.99)
+    # 이상치 제거 (99th percentile 기준, 스케치가 있으면 컬럼 정렬 없이 근사 분위수 사용)
+    if quantile_sketches is not None:
+        duration_99th = quantile_sketches['재생 시간(분)'].quantile(0.99)[category]
+        views_99th = quantile_sketches['조회수'].quantile(0.99)[category]
+    else:
+        duration_99th = category_df['재생 시간(분)'].quantile(0.99)
+        views_99th = category_df['조회수'].quantile(0.99)
 
     category_df = category_df[
         (category_df['재생 시간(분)'] <= duration_99th) &
@@ -71,9 +59,6 @@ def analyze_duration_performance_by_category(df, category, save_path="visualizat
         print(f"No valid data after filtering for category: {category}")
         return
 
-    # 영상 길이 카테고리 추가
-    category_df['길이카테고리'] = category_df['재생 시간(분)'].apply(categorize_video_duration)
-
     # 조회수 기준 상위/하위 10개 영상
     top_10_views = category_df.nlargest(10, '조회수')
     bottom_10_views = category_df.nsmallest(10, '조회수')
@@ -84,7 +69,7 @@ def analyze_duration_performance_by_category(df, category, save_path="visualizat
 
     # 1. 영상 길이 vs 조회수 산점도
     ax1 = axes[0]
-    ax1.scatter(category_df['재생 시간(분)'], category_df['조회수'], alpha=0.6, color='blue')
+    density_scatter(ax1, category_df['재생 시간(분)'], category_df['조회수'], color='blue', alpha=0.6)
     ax1.set_title(f'{category} - 영상 길이 vs 조회수', fontsize=14, weight='bold')
     ax1.set_xlabel('재생 시간 (분)', fontsize=12)
     ax1.set_ylabel('조회수', fontsize=12)
@@ -97,15 +82,13 @@ def analyze_duration_performance_by_category(df, category, save_path="visualizat
         ax1.text(0.05, 0.95, corr_text, transform=ax1.transAxes, verticalalignment='top',
                 bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
-        # 추세선 추가
-        z = np.polyfit(category_df['재생 시간(분)'], category_df['조회수'], 1)
-        p = np.poly1d(z)
-        ax1.plot(category_df['재생 시간(분)'], p(category_df['재생 시간(분)']), "r--", alpha=0.8)
+        # 추세선 추가 (바이럴 영상에 강건한 Theil-Sen)
+        plot_trend(ax1, category_df['재생 시간(분)'], category_df['조회수'])
 
     # 2. 길이 카테고리별 평균 조회수
     ax2 = axes[1]
-    duration_categories = ['초단편 (5분 이하)', '단편 (5-15분)', '중편 (15-30분)', '장편 (30-60분)', '초장편 (60분 초과)']
-    duration_views = category_df.groupby('길이카테고리')['조회수'].mean().reindex(duration_categories, fill_value=0)
+    duration_categories = DURATION_LABELS
+    duration_views = category_df.groupby('길이카테고리', observed=True)['조회수'].mean().reindex(duration_categories, fill_value=0)
 
     bars2 = ax2.bar(range(len(duration_views)), duration_views.values, color='lightcoral', alpha=0.7)
     ax2.set_title(f'{category} - 길이별 평균 조회수', fontsize=14, weight='bold')
@@ -187,8 +170,8 @@ def analyze_duration_performance_by_category(df, category, save_path="visualizat
 
         if channel_stats:
             channel_df_stats = pd.DataFrame(channel_stats)
-            ax6.scatter(channel_df_stats['평균길이'], channel_df_stats['평균조회수'],
-                       s=100, alpha=0.7, color='purple')
+            density_scatter(ax6, channel_df_stats['평균길이'], channel_df_stats['평균조회수'],
+                            color='purple', alpha=0.7, s=100)
 
             # 채널명 라벨 추가
             for i, row in channel_df_stats.iterrows():
@@ -203,12 +186,11 @@ def analyze_duration_performance_by_category(df, category, save_path="visualizat
 
     # 7. 길이별 좋아요율 분석
     ax7 = axes[6]
-    category_df['좋아요율'] = (category_df['좋아요 수'] / category_df['조회수'] * 100).fillna(0)
 
     # 이상치 제거
     category_df_filtered = category_df[category_df['좋아요율'] <= 20]  # 20% 이하만
 
-    duration_like_rate = category_df_filtered.groupby('길이카테고리')['좋아요율'].mean().reindex(duration_categories, fill_value=0)
+    duration_like_rate = category_df_filtered.groupby('길이카테고리', observed=True)['좋아요율'].mean().reindex(duration_categories, fill_value=0)
 
     bars7 = ax7.bar(range(len(duration_like_rate)), duration_like_rate.values, color='orange', alpha=0.7)
     ax7.set_title(f'{category} - 길이별 평균 좋아요율', fontsize=14, weight='bold')
@@ -219,12 +201,11 @@ def analyze_duration_performance_by_category(df, category, save_path="visualizat
 
     # 8. 길이별 댓글율 분석
     ax8 = axes[7]
-    category_df['댓글율'] = (category_df['댓글 수'] / category_df['조회수'] * 100).fillna(0)
 
     # 이상치 제거
     category_df_filtered = category_df[category_df['댓글율'] <= 5]  # 5% 이하만
 
-    duration_comment_rate = category_df_filtered.groupby('길이카테고리')['댓글율'].mean().reindex(duration_categories, fill_value=0)
+    duration_comment_rate = category_df_filtered.groupby('길이카테고리', observed=True)['댓글율'].mean().reindex(duration_categories, fill_value=0)
 
     bars8 = ax8.bar(range(len(duration_comment_rate)), duration_comment_rate.values, color='lightgreen', alpha=0.7)
     ax8.set_title(f'{category} - 길이별 평균 댓글율', fontsize=14, weight='bold')
@@ -237,7 +218,7 @@ def analyze_duration_performance_by_category(df, category, save_path="visualizat
     ax9 = axes[8]
 
     # 정규화된 종합 점수 계산
-    duration_performance = category_df.groupby('길이카테고리').agg({
+    duration_performance = category_df.groupby('길이카테고리', observed=True).agg({
         '조회수': 'mean',
         '좋아요 수': 'mean',
         '댓글 수': 'mean'
@@ -306,11 +287,19 @@ def analyze_all_categories_duration(df, save_path="visualizations"):
     categories = df['카테고리'].unique()
     results = {}
 
+    # 이상치 기준 분위수용 스케치를 한 번의 순회로 (카테고리, 채널) 단위로 만든 뒤 카테고리 단위로 합산
+    # (정확한 분위수 경로와 같은 영상을 요약하도록 같은 결측값 제외를 먼저 적용)
+    quantile_sketches = None
+    if '재생 시간(분)' in df.columns:
+        sketch_df = df.dropna(subset=['재생 시간(분)', '조회수'])
+        quantile_sketches = {col: sketch.aggregate('카테고리')
+                             for col, sketch in build_quantile_sketches(sketch_df, ['재생 시간(분)', '조회수']).items()}
+
     # 각 카테고리별 분석
     for category in categories:
         print(f"Processing video duration analysis for category: {category}")
         try:
-            category_results = analyze_duration_performance_by_category(df, category, save_path)
+            category_results = analyze_duration_performance_by_category(df, category, save_path, quantile_sketches)
             results[category] = category_results
         except Exception as e:
             print(f"Error processing {category}: {str(e)}")
@@ -318,6 +307,186 @@ def analyze_all_categories_duration(df, save_path="visualizations"):
 
     return results
 
+def _local_linear_smooth(centers, counts, sums, bandwidth, min_videos=5):
+    """
+    구간별 (영상 수, 값 합계)에 가우시안 커널 국소 선형 회귀(LOESS 1차)를 적용합니다.
+    원본 행이 아니라 구간 단위로 적합하므로 비용은 구간 수에만 비례합니다.
+
+    Parameters:
+    centers (np.ndarray): 구간 중심 (B,)
+    counts (np.ndarray): 구간별 영상 수 (..., B)
+    sums (np.ndarray): 구간별 값 합계 (..., B)
+    bandwidth (float): 커널 대역폭 (분)
+    min_videos (float): 추정에 필요한 커널 가중 영상 수 (미만이면 NaN)
+
+    Returns:
+    np.ndarray: 구간 중심에서의 평활 추정값 (..., B)
+    """
+    # offsets[i, j] = x_j - x_i, 행렬 곱으로 모든 중심점의 가중 합을 한 번에 계산
+    offsets = centers[None, :] - centers[:, None]
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+
+    s0 = counts @ kernel.T
+    s1 = counts @ (kernel * offsets).T
+    s2 = counts @ (kernel * offsets ** 2).T
+    t0 = sums @ kernel.T
+    t1 = sums @ (kernel * offsets).T
+
+    determinant = s0 * s2 - s1 ** 2
+    valid = (s0 >= min_videos) & (determinant > 1e-12 * np.maximum(s0 * s2, 1e-300))
+    return np.divide(s2 * t0 - s1 * t1, determinant, out=np.full(s0.shape, np.nan), where=valid)
+
+def calculate_duration_response_curves(df, group_col='카테고리', value_col='조회수', bin_width=0.5, max_duration=None,
+                                       bandwidth=2.0, n_boot=200, confidence=0.95, min_videos=5, seed=42):
+    """
+    그룹별 영상 길이에 따른 조회수 반응 곡선을 계산합니다.
+    재생 시간을 bin_width 간격으로 잘게 나눠 bincount로 집계한 뒤 구간 단위로 국소 선형 평활하므로
+    비용은 O(행 수 + 구간 수²)이며, 조회수는 바이럴 영상의 영향을 줄이기 위해 log1p 평균(기하평균 성격)으로 적합합니다.
+    신뢰 밴드는 구간별 Poisson 부트스트랩(영상 수 ~ Poisson, 합계는 구간 분산으로 정규 근사)으로 계산합니다.
+
+    Parameters:
+    df (pd.DataFrame): 전처리된 데이터프레임 (재생 시간(분) 컬럼 필요)
+    group_col (str): 그룹 컬럼
+    value_col (str): 성과 지표 컬럼
+    bin_width (float): 구간 폭 (분)
+    max_duration (float): 분석할 최대 재생 시간 (None이면 99번째 백분위수)
+    bandwidth (float): 평활 커널 대역폭 (분)
+    n_boot (int): 부트스트랩 표본 수
+    confidence (float): 신뢰수준
+    min_videos (float): 곡선을 추정할 최소 커널 가중 영상 수
+    seed (int): 난수 시드
+
+    Returns:
+    dict: curves (그룹 × 재생시간별 관측조회수, 추정조회수, 하한, 상한, 영상수),
+          peaks (그룹별 최적길이, 최적길이_하한, 최적길이_상한, 최대추정조회수)
+    """
+    durations = pd.to_numeric(df['재생 시간(분)'], errors='coerce').to_numpy(dtype=np.float64)
+    values = pd.to_numeric(df[value_col], errors='coerce').to_numpy(dtype=np.float64)
+    valid = np.isfinite(durations) & np.isfinite(values) & (durations > 0) & (values >= 0)
+
+    if max_duration is None:
+        max_duration = np.percentile(durations[valid], 99) if valid.any() else bin_width
+    valid &= durations <= max_duration
+
+    group_codes, groups = pd.factorize(df[group_col].to_numpy()[valid])
+    groups = pd.Index(groups, name=group_col)
+    durations, values = durations[valid], np.log1p(values[valid])
+
+    # 그룹 × 재생시간 구간별 영상 수, 합계, 제곱합을 한 번의 bincount로 집계
+    n_bins = max(int(np.ceil(max_duration / bin_width)), 1)
+    centers = (np.arange(n_bins) + 0.5) * bin_width
+    cells = group_codes * n_bins + np.minimum((durations / bin_width).astype(np.int64), n_bins - 1)
+    shape = (len(groups), n_bins)
+    counts = np.bincount(cells, minlength=len(groups) * n_bins).reshape(shape).astype(np.float64)
+    sums = np.bincount(cells, weights=values, minlength=len(groups) * n_bins).reshape(shape)
+    squares = np.bincount(cells, weights=values ** 2, minlength=len(groups) * n_bins).reshape(shape)
+
+    fitted = _local_linear_smooth(centers, counts, sums, bandwidth, min_videos)
+
+    # 구간별 Poisson 부트스트랩: 재표본 영상 수 ~ Poisson(n), 합계 ~ N(영상 수 × 평균, 영상 수 × 분산)
+    rng = np.random.default_rng(seed)
+    means = np.divide(sums, counts, out=np.zeros(shape), where=counts > 0)
+    variances = np.maximum(np.divide(squares, counts, out=np.zeros(shape), where=counts > 0) - means ** 2, 0)
+    boot_counts = rng.poisson(counts, size=(n_boot,) + shape).astype(np.float64)
+    boot_sums = rng.normal(boot_counts * means, np.sqrt(boot_counts * variances))
+    boot_fitted = _local_linear_smooth(centers, boot_counts, boot_sums, bandwidth, min_videos)
+
+    alpha = 1 - confidence
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        lower, upper = np.nanpercentile(boot_fitted, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+    lower[np.isnan(fitted)] = np.nan
+    upper[np.isnan(fitted)] = np.nan
+
+    # 최적 길이: 평활 곡선의 최댓값 위치, 구간은 부트스트랩 표본별 최댓값 위치의 분위수
+    has_curve = ~np.isnan(fitted).all(axis=1)
+    peak_bins = np.where(has_curve, np.nanargmax(np.where(np.isnan(fitted), -np.inf, fitted), axis=1), 0)
+    # 곡선이 전부 비어 있는 부트스트랩 표본은 첫 구간으로 치우치지 않도록 NaN으로 두고 제외
+    boot_has_curve = ~np.isnan(boot_fitted).all(axis=2)
+    boot_peaks = np.where(boot_has_curve,
+                          centers[np.where(np.isnan(boot_fitted), -np.inf, boot_fitted).argmax(axis=2)], np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        peak_lower, peak_upper = np.nanpercentile(boot_peaks, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+
+    index = pd.MultiIndex.from_product([groups, centers], names=[group_col, '재생시간(분)'])
+    curves = pd.DataFrame({
+        '관측조회수': np.expm1(np.divide(sums, counts, out=np.full(shape, np.nan), where=counts > 0)).ravel(),
+        '추정조회수': np.expm1(fitted).ravel(),
+        '하한': np.expm1(lower).ravel(),
+        '상한': np.expm1(upper).ravel(),
+        '영상수': counts.astype(np.int64).ravel()
+    }, index=index)
+
+    peaks = pd.DataFrame({
+        '최적길이': np.where(has_curve, centers[peak_bins], np.nan),
+        '최적길이_하한': np.where(has_curve, peak_lower, np.nan),
+        '최적길이_상한': np.where(has_curve, peak_upper, np.nan),
+        '최대추정조회수': np.where(has_curve, np.expm1(fitted[np.arange(len(groups)), peak_bins]), np.nan)
+    }, index=groups)
+
+    return {'curves': curves, 'peaks': peaks}
+
+def analyze_duration_response_curves(df, save_path="visualizations", bin_width=0.5, bandwidth=2.0, n_boot=200):
+    """
+    카테고리별 연속 영상 길이-조회수 반응 곡선과 최적 길이를 시각화합니다.
+
+    Parameters:
+    df (pd.DataFrame): 전체 데이터프레임
+    save_path (str): 저장할 경로
+    bin_width (float): 구간 폭 (분)
+    bandwidth (float): 평활 커널 대역폭 (분)
+    n_boot (int): 부트스트랩 표본 수
+
+    Returns:
+    dict: calculate_duration_response_curves 결과 (재생 시간 데이터가 없으면 빈 dict)
+    """
+    if '재생 시간(분)' not in df.columns:
+        print("No duration data for response curves")
+        return {}
+
+    result = calculate_duration_response_curves(df, bin_width=bin_width, bandwidth=bandwidth, n_boot=n_boot)
+    curves, peaks = result['curves'], result['peaks']
+
+    n_cols = 3
+    n_rows = max(int(np.ceil(len(peaks) / n_cols)), 1)
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(20, 6 * n_rows), squeeze=False)
+    axes = axes.flatten()
+
+    for ax, (category, peak) in zip(axes, peaks.iterrows()):
+        curve = curves.loc[category]
+        observed = curve[curve['영상수'] > 0]
+
+        # 구간별 관측값 (점 크기 = 영상 수), 평활 곡선과 신뢰 밴드
+        ax.scatter(observed.index, observed['관측조회수'], s=np.sqrt(observed['영상수']) * 4,
+                   alpha=0.3, color='gray', label='구간별 관측값')
+        ax.plot(curve.index, curve['추정조회수'], color='blue', linewidth=2, label='평활 곡선')
+        ax.fill_between(curve.index, curve['하한'], curve['상한'], color='blue', alpha=0.2, label='부트스트랩 신뢰구간')
+
+        if not np.isnan(peak['최적길이']):
+            ax.axvline(x=peak['최적길이'], color='red', linestyle='--', alpha=0.7,
+                       label=f"최적 길이: {peak['최적길이']:.1f}분")
+            ax.axvspan(peak['최적길이_하한'], peak['최적길이_상한'], color='red', alpha=0.1)
+
+        ax.set_title(f'{category} - 영상 길이별 조회수 반응 곡선', fontsize=14, weight='bold')
+        ax.set_xlabel('재생 시간 (분)', fontsize=12)
+        ax.set_ylabel('조회수 (로그 평균 기준)', fontsize=12)
+        ax.yaxis.set_major_formatter(FuncFormatter(format_numbers))
+        ax.legend(fontsize=9)
+        ax.grid(True, alpha=0.3)
+
+    for ax in axes[len(peaks):]:
+        ax.set_visible(False)
+
+    plt.tight_layout()
+
+    # 저장
+    os.makedirs(save_path, exist_ok=True)
+    plt.savefig(f'{save_path}/05_duration_response_curves.png', dpi=300, bbox_inches='tight')
+    plt.show()
+
+    return result
+
 if __name__ == "__main__":
     # 실행 예시
     setup_matplotlib()
@@ -336,5 +505,12 @@ if __name__ == "__main__":
             best_duration = result.get('best_duration_category', 'N/A')
             print(f"{category}: 길이-조회수 상관관계 {correlation:.3f}, 최적 길이 {best_duration}")
 
+    # 연속 반응 곡선 기반 최적 길이
+    response = analyze_duration_response_curves(df)
+    if response:
+        print("\n=== 카테고리별 최적 영상 길이 (반응 곡선 최댓값) ===")
+        for category, peak in response['peaks'].iterrows():
+            print(f"{category}: {peak['최적길이']:.1f}분 (95% 구간 {peak['최적길이_하한']:.1f}-{peak['최적길이_상한']:.1f}분)")
+
     print("\n영상 길이 분석이 완료되었습니다!")
     print("결과는 visualizations/ 폴더에 저장되었습니다.")
\ No newline at end of file
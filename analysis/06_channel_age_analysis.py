@@ -8,64 +8,51 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import os
-from datetime import datetime, timedelta
 from scipy.stats import pearsonr
-from data_preprocessing import load_and_preprocess_data, filter_by_category, get_top_channels_by_category, setup_matplotlib, format_numbers
+from data_preprocessing import load_and_preprocess_data, filter_by_category, get_top_channels_by_category, setup_matplotlib, format_numbers, get_reference_date
+from plot_utils import density_scatter
+from trend_fitting import plot_trend
+from channel_tables import build_channel_tables, channel_video_stats, VIDEO_VALUE_COLUMNS
 from matplotlib.ticker import FuncFormatter
 
-def calculate_channel_age(creation_date, reference_date=None):
+# 채널 나이 구간 (년, 왼쪽 경계 포함)
+AGE_BINS_YEARS = [0, 1, 3, 5, 10, np.inf]
+AGE_LABELS = ['신생 (1년 미만)', '성장기 (1-3년)', '안정기 (3-5년)', '성숙기 (5-10년)', '원로 (10년 이상)']
+UNKNOWN_AGE_LABEL = '알 수 없음'
+
+def calculate_channel_age(creation_dates, reference_date=None):
     """
-    채널 생성일로부터 현재까지의 기간을 계산합니다.
+    채널 생성일로부터 기준일까지의 기간을 한 번의 벡터 연산으로 계산합니다.
 
     Parameters:
-    creation_date: 채널 생성일
-    reference_date: 기준일 (기본값: 현재 날짜)
+    creation_dates (pd.Series): 채널 생성일 (문자열 또는 datetime)
+    reference_date (str or datetime): 기준일 (기본값: RUN_CONFIG 또는 현재 날짜)
 
     Returns:
-    int: 채널 나이 (일 단위)
+    pd.Series: 채널 나이 (일 단위, 날짜를 해석할 수 없으면 NaN, 음수는 0)
     """
-    if reference_date is None:
-        reference_date = datetime.now()
-
-    if pd.isna(creation_date):
-        return None
-
-    try:
-        if isinstance(creation_date, str):
-            creation_date = pd.to_datetime(creation_date)
+    reference_date = get_reference_date(reference_date=reference_date)
+    creation_dates = pd.to_datetime(pd.Series(creation_dates), errors='coerce')
 
-        age_days = (reference_date - creation_date).days
-        return max(0, age_days)  # 음수 방지
-    except:
-        return None
+    # 해석 실패한 날짜는 NaT → NaN으로 남겨 호출 측에서 제외
+    return (reference_date - creation_dates).dt.days.clip(lower=0)
 
 def categorize_channel_age(age_days):
     """
-    채널 나이를 카테고리로 분류합니다.
+    채널 나이를 pd.cut으로 카테고리로 분류합니다.
 
     Parameters:
-    age_days (int): 채널 나이 (일 단위)
+    age_days (pd.Series): 채널 나이 (일 단위)
 
     Returns:
-    str: 나이 카테고리
+    pd.Series: 나이 카테고리 (순서형, 나이를 모르면 '알 수 없음')
     """
-    if age_days is None:
-        return '알 수 없음'
-
-    age_years = age_days / 365.25
-
-    if age_years < 1:
-        return '신생 (1년 미만)'
-    elif age_years < 3:
-        return '성장기 (1-3년)'
-    elif age_years < 5:
-        return '안정기 (3-5년)'
-    elif age_years < 10:
-        return '성숙기 (5-10년)'
-    else:
-        return '원로 (10년 이상)'
-
-def analyze_channel_age_by_category(df, category, save_path="visualizations"):
+    age_years = pd.Series(age_days, dtype=np.float64) / 365.25
+    categories = pd.cut(age_years, bins=AGE_BINS_YEARS, labels=AGE_LABELS, right=False)
+
+    return categories.cat.add_categories(UNKNOWN_AGE_LABEL).fillna(UNKNOWN_AGE_LABEL)
+
+def analyze_channel_age_by_category(df, category, save_path="visualizations", reference_date=None, channel_tables=None):
     """
     특정 카테고리의 채널 나이 분석을 수행합니다.
 
@@ -73,6 +60,8 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
     df (pd.DataFrame): 전체 데이터프레임
     category (str): 분석할 카테고리
     save_path (str): 저장할 경로
+    reference_date (str or datetime): 채널 나이 기준일 (None이면 RUN_CONFIG, 없으면 데이터의 최신 게시일)
+    channel_tables (tuple): build_channel_tables 결과 (채널 테이블, 영상 테이블), None이면 df에서 생성
     """
     category_df = filter_by_category(df, category)
 
@@ -80,22 +69,17 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
         print(f"No data found for category: {category}")
         return
 
-    # 채널별 통계 계산
-    channel_stats = category_df.groupby('채널명').agg({
-        '조회수': 'sum',
-        '좋아요 수': 'sum',
-        '댓글 수': 'sum',
-        '구독자 수': 'first',  # 채널별로 동일하다고 가정
-        '채널 개설일': 'first'
-    }).reset_index()
-
-    # 채널 나이 계산
-    reference_date = datetime(2024, 9, 29)  # 분석 기준일
-    channel_stats['채널나이_일'] = channel_stats['채널 개설일'].apply(
-        lambda x: calculate_channel_age(x, reference_date)
-    )
+    # 채널별 통계 계산 (지표는 이 카테고리 영상만 합산, 구독자 수·개설일은 채널 테이블에서 한 번만 가져옴)
+    channels, videos = channel_tables if channel_tables is not None else build_channel_tables(df, video_cols=VIDEO_VALUE_COLUMNS)
+    channel_stats = (channel_video_stats(videos, channels, category=category)
+                     .rename(columns={'구독자수': '구독자 수'})
+                     .reset_index(drop=True))
+
+    # 채널 나이 계산 (기준일은 카테고리가 아닌 전체 데이터 기준)
+    reference_date = get_reference_date(df, reference_date)
+    channel_stats['채널나이_일'] = calculate_channel_age(channel_stats['채널 개설일'], reference_date)
     channel_stats['채널나이_년'] = channel_stats['채널나이_일'] / 365.25
-    channel_stats['나이카테고리'] = channel_stats['채널나이_일'].apply(categorize_channel_age)
+    channel_stats['나이카테고리'] = categorize_channel_age(channel_stats['채널나이_일'])
 
     # 유효한 데이터만 필터링
     valid_channels = channel_stats.dropna(subset=['채널나이_일', '구독자 수', '조회수'])
@@ -110,7 +94,7 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
 
     # 1. 채널 나이 vs 구독자 수
     ax1 = axes[0]
-    ax1.scatter(valid_channels['채널나이_년'], valid_channels['구독자 수'], alpha=0.7, color='blue', s=60)
+    density_scatter(ax1, valid_channels['채널나이_년'], valid_channels['구독자 수'], color='blue', alpha=0.7, s=60)
     ax1.set_title(f'{category} - 채널 나이 vs 구독자 수', fontsize=14, weight='bold')
     ax1.set_xlabel('채널 나이 (년)', fontsize=12)
     ax1.set_ylabel('구독자 수', fontsize=12)
@@ -123,14 +107,12 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
         ax1.text(0.05, 0.95, corr_text, transform=ax1.transAxes, verticalalignment='top',
                 bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
-        # 추세선 추가
-        z = np.polyfit(valid_channels['채널나이_년'], valid_channels['구독자 수'], 1)
-        p = np.poly1d(z)
-        ax1.plot(valid_channels['채널나이_년'], p(valid_channels['채널나이_년']), "r--", alpha=0.8)
+        # 추세선 추가 (대형 채널에 강건한 Theil-Sen)
+        plot_trend(ax1, valid_channels['채널나이_년'], valid_channels['구독자 수'])
 
     # 2. 채널 나이 vs 총 조회수
     ax2 = axes[1]
-    ax2.scatter(valid_channels['채널나이_년'], valid_channels['조회수'], alpha=0.7, color='green', s=60)
+    density_scatter(ax2, valid_channels['채널나이_년'], valid_channels['조회수'], color='green', alpha=0.7, s=60)
     ax2.set_title(f'{category} - 채널 나이 vs 총 조회수', fontsize=14, weight='bold')
     ax2.set_xlabel('채널 나이 (년)', fontsize=12)
     ax2.set_ylabel('총 조회수', fontsize=12)
@@ -143,15 +125,13 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
         ax2.text(0.05, 0.95, corr_text, transform=ax2.transAxes, verticalalignment='top',
                 bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
-        # 추세선 추가
-        z = np.polyfit(valid_channels['채널나이_년'], valid_channels['조회수'], 1)
-        p = np.poly1d(z)
-        ax2.plot(valid_channels['채널나이_년'], p(valid_channels['조회수']), "r--", alpha=0.8)
+        # 추세선 추가 (대형 채널에 강건한 Theil-Sen)
+        plot_trend(ax2, valid_channels['채널나이_년'], valid_channels['조회수'])
 
     # 3. 나이 카테고리별 평균 구독자 수
     ax3 = axes[2]
-    age_categories = ['신생 (1년 미만)', '성장기 (1-3년)', '안정기 (3-5년)', '성숙기 (5-10년)', '원로 (10년 이상)']
-    age_subscribers = valid_channels.groupby('나이카테고리')['구독자 수'].mean().reindex(age_categories, fill_value=0)
+    age_categories = AGE_LABELS
+    age_subscribers = valid_channels.groupby('나이카테고리', observed=True)['구독자 수'].mean().reindex(age_categories, fill_value=0)
 
     bars3 = ax3.bar(range(len(age_subscribers)), age_subscribers.values, color='lightcoral', alpha=0.7)
     ax3.set_title(f'{category} - 나이별 평균 구독자 수', fontsize=14, weight='bold')
@@ -169,7 +149,7 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
 
     # 4. 나이 카테고리별 평균 조회수
     ax4 = axes[3]
-    age_views = valid_channels.groupby('나이카테고리')['조회수'].mean().reindex(age_categories, fill_value=0)
+    age_views = valid_channels.groupby('나이카테고리', observed=True)['조회수'].mean().reindex(age_categories, fill_value=0)
 
     bars4 = ax4.bar(range(len(age_views)), age_views.values, color='lightblue', alpha=0.7)
     ax4.set_title(f'{category} - 나이별 평균 총 조회수', fontsize=14, weight='bold')
@@ -197,9 +177,8 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
     for category_name in age_categories:
         cat_data = valid_channels[valid_channels['나이카테고리'] == category_name]
         if not cat_data.empty:
-            ax6.scatter(cat_data['구독자 수'], cat_data['조회수'],
-                       label=category_name, alpha=0.7, s=60,
-                       color=colors.get(category_name, 'gray'))
+            density_scatter(ax6, cat_data['구독자 수'], cat_data['조회수'],
+                            color=colors.get(category_name, 'gray'), alpha=0.7, s=60, label=category_name)
 
     ax6.set_title(f'{category} - 구독자 수 vs 총 조회수 (나이별)', fontsize=14, weight='bold')
     ax6.set_xlabel('구독자 수', fontsize=12)
@@ -216,8 +195,8 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
     ratio_99th = valid_channels['조회수_구독자_비율'].quantile(0.99)
     filtered_channels = valid_channels[valid_channels['조회수_구독자_비율'] <= ratio_99th]
 
-    ax7.scatter(filtered_channels['채널나이_년'], filtered_channels['조회수_구독자_비율'],
-               alpha=0.7, color='purple', s=60)
+    density_scatter(ax7, filtered_channels['채널나이_년'], filtered_channels['조회수_구독자_비율'],
+                    color='purple', alpha=0.7, s=60)
     ax7.set_title(f'{category} - 채널 나이 vs 구독자 대비 조회수 비율', fontsize=14, weight='bold')
     ax7.set_xlabel('채널 나이 (년)', fontsize=12)
     ax7.set_ylabel('총 조회수 / 구독자 수', fontsize=12)
@@ -225,14 +204,13 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
     # 8. 나이별 평균 영상당 조회수
     ax8 = axes[7]
 
-    # 영상 수 계산 (채널별)
-    video_counts = category_df.groupby('채널명').size().reset_index(name='영상수')
-    channel_stats_with_videos = valid_channels.merge(video_counts, on='채널명', how='left')
+    # 영상 수는 채널 통계에 이미 포함
+    channel_stats_with_videos = valid_channels.copy()
     channel_stats_with_videos['영상당_평균조회수'] = (
         channel_stats_with_videos['조회수'] / channel_stats_with_videos['영상수']
     )
 
-    age_avg_views_per_video = (channel_stats_with_videos.groupby('나이카테고리')['영상당_평균조회수']
+    age_avg_views_per_video = (channel_stats_with_videos.groupby('나이카테고리', observed=True)['영상당_평균조회수']
                               .mean().reindex(age_categories, fill_value=0))
 
     bars8 = ax8.bar(range(len(age_avg_views_per_video)), age_avg_views_per_video.values,
@@ -248,7 +226,7 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
     ax9 = axes[8]
 
     # 정규화된 종합 점수 계산
-    age_performance = valid_channels.groupby('나이카테고리').agg({
+    age_performance = valid_channels.groupby('나이카테고리', observed=True).agg({
         '구독자 수': 'mean',
         '조회수': 'mean',
         '좋아요 수': 'mean'
@@ -299,22 +277,30 @@ def analyze_channel_age_by_category(df, category, save_path="visualizations"):
 
     return results
 
-def analyze_all_categories_channel_age(df, save_path="visualizations"):
+def analyze_all_categories_channel_age(df, save_path="visualizations", reference_date=None):
     """
     모든 카테고리의 채널 나이 분석을 수행합니다.
 
     Parameters:
     df (pd.DataFrame): 전체 데이터프레임
     save_path (str): 저장할 경로
+    reference_date (str or datetime): 채널 나이 기준일 (None이면 RUN_CONFIG, 없으면 데이터의 최신 게시일)
     """
     categories = df['카테고리'].unique()
     results = {}
 
+    # 모든 카테고리에 같은 기준일 적용
+    reference_date = get_reference_date(df, reference_date)
+    print(f"채널 나이 기준일: {reference_date:%Y-%m-%d}")
+
+    # 채널 속성은 채널 테이블로 한 번만 분리
+    channel_tables = build_channel_tables(df, video_cols=VIDEO_VALUE_COLUMNS)
+
     # 각 카테고리별 분석
     for category in categories:
         print(f"Processing channel age analysis for category: {category}")
         try:
-            category_results = analyze_channel_age_by_category(df, category, save_path)
+            category_results = analyze_channel_age_by_category(df, category, save_path, reference_date, channel_tables)
             results[category] = category_results
         except Exception as e:
             print(f"Error processing {category}: {str(e)}")
@@ -10,6 +10,8 @@ import numpy as np
 import os
 from datetime import datetime, timedelta
 from data_preprocessing import load_and_preprocess_data, filter_by_category, get_top_channels_by_category, setup_matplotlib, format_numbers
+from plot_utils import density_scatter
+from trend_fitting import plot_trend
 from matplotlib.ticker import FuncFormatter
 
 def calculate_expected_views(df, channel_name, baseline_period_months=12):
@@ -210,7 +212,8 @@ def analyze_expected_views_by_category(df, category, save_path="visualizations")
 
     # 6. 성과 비율 vs 기대 조회수 산점도
     ax6 = axes[5]
-    ax6.scatter(expected_views, performance_ratios, alpha=0.7, color='purple', s=100)
+    density_scatter(ax6, expected_views, performance_ratios, color='purple', alpha=0.7, s=100)
+    plot_trend(ax6, expected_views, performance_ratios, log_x=True)
 
     # 채널명 라벨 추가
     for i, channel in enumerate(channels):
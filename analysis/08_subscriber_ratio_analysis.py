@@ -9,15 +9,18 @@ import seaborn as sns
 import numpy as np
 import os
 from data_preprocessing import load_and_preprocess_data, filter_by_category, get_top_channels_by_category, setup_matplotlib, format_numbers
+from trend_fitting import plot_trend
+from channel_tables import build_channel_tables, lookup_channel_ids
 from matplotlib.ticker import FuncFormatter
 
-def calculate_subscriber_metrics(df, channel_name):
+def calculate_subscriber_metrics(df, channel_name, channels):
     """
     특정 채널의 구독자 관련 지표를 계산합니다.
 
     Parameters:
     df (pd.DataFrame): 채널 데이터프레임
     channel_name (str): 채널명
+    channels (pd.DataFrame): 채널 테이블 (channel_tables.build_channel_tables 결과)
 
     Returns:
     dict: 구독자 관련 지표
@@ -27,8 +30,13 @@ def calculate_subscriber_metrics(df, channel_name):
     if channel_df.empty:
         return {}
 
-    # 총 구독자수와 총 조회수
-    total_subscribers = channel_df['구독자수'].iloc[0] if '구독자수' in channel_df.columns else 0
+    # 총 구독자수는 채널 테이블에서 조회 (영상마다 값이 다르면 최신 게시 영상 기준)
+    channel_ids = lookup_channel_ids(channels, [channel_name])
+    total_subscribers = 0
+    if len(channel_ids) and '구독자수' in channels.columns and pd.notna(channels.at[channel_ids[0], '구독자수']):
+        total_subscribers = channels.at[channel_ids[0], '구독자수']
+
+    # 총 조회수
     total_views = channel_df['조회수'].sum()
     video_count = len(channel_df)
 
@@ -67,7 +75,7 @@ def calculate_subscriber_metrics(df, channel_name):
         'performance_grade': performance_grade
     }
 
-def analyze_subscriber_ratio_by_category(df, category, save_path="visualizations"):
+def analyze_subscriber_ratio_by_category(df, category, save_path="visualizations", channels=None):
     """
     특정 카테고리의 구독자 비율 분석을 수행합니다.
 
@@ -75,6 +83,7 @@ def analyze_subscriber_ratio_by_category(df, category, save_path="visualizations
     df (pd.DataFrame): 전체 데이터프레임
     category (str): 분석할 카테고리
     save_path (str): 저장할 경로
+    channels (pd.DataFrame): 채널 테이블 (None이면 df에서 생성)
     """
     category_df = filter_by_category(df, category)
 
@@ -90,9 +99,12 @@ def analyze_subscriber_ratio_by_category(df, category, save_path="visualizations
         return
 
     # 각 채널별 구독자 지표 분석
+    if channels is None:
+        channels, _ = build_channel_tables(df, video_cols=[])
+
     channel_metrics = {}
     for channel in top_channels:
-        metrics = calculate_subscriber_metrics(category_df, channel)
+        metrics = calculate_subscriber_metrics(category_df, channel, channels)
         if metrics:
             channel_metrics[channel] = metrics
 
@@ -169,11 +181,8 @@ def analyze_subscriber_ratio_by_category(df, category, save_path="visualizations
     ax4.yaxis.set_major_formatter(FuncFormatter(format_numbers))
     ax4.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8)
 
-    # 추세선 추가
-    if len(subscribers) > 1:
-        z = np.polyfit(subscribers, total_views, 1)
-        p = np.poly1d(z)
-        ax4.plot(subscribers, p(subscribers), "r--", alpha=0.8)
+    # 추세선 추가 (대형 채널에 강건한 Theil-Sen)
+    plot_trend(ax4, subscribers, total_views)
 
     # 5. 채널별 성과 등급
     ax5 = axes[4]
@@ -238,11 +247,14 @@ def analyze_all_categories_subscriber_ratio(df, save_path="visualizations"):
     categories = df['카테고리'].unique()
     results = {}
 
+    # 채널 속성은 채널 테이블로 한 번만 분리
+    channels, _ = build_channel_tables(df, video_cols=[])
+
     # 각 카테고리별 분석
     for category in categories:
         print(f"Processing subscriber ratio analysis for category: {category}")
         try:
-            category_results = analyze_subscriber_ratio_by_category(df, category, save_path)
+            category_results = analyze_subscriber_ratio_by_category(df, category, save_path, channels)
             results[category] = category_results
         except Exception as e:
             print(f"Error processing {category}: {str(e)}")
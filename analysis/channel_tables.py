@@ -0,0 +1,135 @@
+"""
+YouTube Channel Analysis - Channel Tables
+영상 단위 데이터에서 채널 차원 테이블과 영상 팩트 테이블을 만드는 함수를 포함합니다.
+구독자 수·채널 개설일처럼 채널마다 하나인 속성은 채널 테이블에 한 번만 저장하여 영상마다 값이 달라도
+최신 값 하나로 통일하고, 채널별 집계는 정수 채널ID bincount로 계산합니다. (06 채널 나이, 08 구독자 비율 분석에서 사용)
+영상 테이블은 필요한 컬럼만 남길 수 있으며, 원본 데이터프레임을 대체하지는 않습니다.
+"""
+
+import numpy as np
+import pandas as pd
+from data_preprocessing import SUBSCRIBER_COLUMNS
+
+# 채널 차원 테이블로 옮길 채널 단위 속성 (데이터에 있는 컬럼만 사용)
+CHANNEL_ATTRIBUTE_COLUMNS = ['카테고리', '구독자수', '구독자 수', '채널 개설일', '영상 수']
+
+# 채널 테이블로 옮기면서 영상 테이블에도 남길 속성 (한 채널이 여러 카테고리에 영상을 올릴 수 있음)
+VIDEO_LEVEL_ATTRIBUTE_COLUMNS = ['카테고리']
+
+# 채널별로 합산하는 영상 지표
+VIDEO_VALUE_COLUMNS = ('조회수', '좋아요 수', '댓글 수')
+
+def build_channel_tables(df, channel_col='채널명', attribute_cols=None, video_cols=None):
+    """
+    영상 단위 데이터프레임을 채널 차원 테이블과 영상 팩트 테이블로 분리합니다.
+    채널 속성이 영상마다 다르면 가장 최근 게시 영상의 값(결측값 제외)으로 통일하고 충돌 채널 수를 알립니다.
+
+    Parameters:
+    df (pd.DataFrame): 전처리된 영상 단위 데이터프레임
+    channel_col (str): 채널 식별 컬럼
+    attribute_cols (list): 채널 테이블로 옮길 속성 컬럼 (None이면 CHANNEL_ATTRIBUTE_COLUMNS 중 존재하는 컬럼)
+    video_cols (list): 영상 테이블에 남길 컬럼 (None이면 채널 속성 외 전체, 없는 컬럼은 건너뛰고 카테고리는 항상 포함)
+
+    Returns:
+    tuple: (채널 테이블 (index: 채널ID), 영상 테이블 (채널ID 컬럼 포함, 카테고리 외 채널 속성 제외))
+    """
+    if attribute_cols is None:
+        attribute_cols = [col for col in CHANNEL_ATTRIBUTE_COLUMNS if col in df.columns]
+
+    channel_codes, channel_names = pd.factorize(df[channel_col])
+    if (channel_codes < 0).any():
+        raise ValueError(f"Missing values in channel column: {channel_col}")
+
+    # 최신 게시 영상이 마지막에 오도록 정렬한 뒤 채널별 마지막 유효값 선택 (게시일이 없는 영상은 맨 앞)
+    if '게시일' in df.columns:
+        dates = df['게시일']
+        order = np.lexsort((dates.to_numpy(dtype='datetime64[ns]'), dates.notna().to_numpy()))
+    else:
+        order = np.arange(len(df))
+    attributes = df[attribute_cols].iloc[order]
+    grouped = attributes.groupby(channel_codes[order], sort=True)
+    channels = grouped.last()
+
+    # 영상 테이블에도 남는 속성은 채널마다 달라도 정상이므로 알리지 않음
+    conflicts = (grouped.nunique() > 1).sum().drop(VIDEO_LEVEL_ATTRIBUTE_COLUMNS, errors='ignore')
+    for col, count in conflicts[conflicts > 0].items():
+        print(f"{count}개 채널에서 '{col}' 값이 영상마다 다릅니다. 최신 게시 영상 기준으로 통일합니다.")
+
+    # 구독자 수 컬럼명 통일 및 타입 정리
+    subscriber_cols = [col for col in SUBSCRIBER_COLUMNS if col in channels.columns]
+    if subscriber_cols:
+        channels['구독자수'] = pd.to_numeric(channels[subscriber_cols[0]], errors='coerce')
+        channels = channels.drop(columns=[col for col in subscriber_cols if col != '구독자수'])
+    if '채널 개설일' in channels.columns:
+        channels['채널 개설일'] = pd.to_datetime(channels['채널 개설일'], errors='coerce')
+    if '카테고리' in channels.columns:
+        channels['카테고리'] = channels['카테고리'].astype('category')
+
+    channels.insert(0, channel_col, np.asarray(channel_names, dtype=object))
+    channels.index = pd.RangeIndex(len(channels), name='채널ID')
+
+    # 영상 테이블: 채널 속성과 채널명 대신 정수 채널ID만 보관 (영상 단위 카테고리는 유지)
+    video_level_cols = [col for col in VIDEO_LEVEL_ATTRIBUTE_COLUMNS if col in attribute_cols]
+    if video_cols is None:
+        videos = df.drop(columns=[col for col in attribute_cols if col not in video_level_cols] + [channel_col])
+    else:
+        videos = df[video_level_cols + [col for col in video_cols if col in df.columns and col not in video_level_cols]].copy()
+    for col in video_level_cols:
+        videos[col] = videos[col].astype('category')
+    videos.insert(0, '채널ID', channel_codes.astype(np.int32))
+
+    return channels, videos
+
+def lookup_channel_ids(channels, channel_names=None, category=None, channel_col='채널명'):
+    """
+    채널명 또는 카테고리로 채널ID를 찾습니다.
+    (카테고리는 채널 테이블의 최신 값 기준이므로, 카테고리별 영상 집계는 channel_video_stats의 category를 사용)
+
+    Parameters:
+    channels (pd.DataFrame): 채널 테이블
+    channel_names (list): 찾을 채널명 (None이면 조건 없음)
+    category (str): 찾을 카테고리 (None이면 조건 없음)
+    channel_col (str): 채널명 컬럼
+
+    Returns:
+    np.ndarray: 조건에 맞는 채널ID 배열 (channel_names를 주면 그 순서, 없는 채널명은 제외)
+    """
+    mask = np.ones(len(channels), dtype=bool)
+    if category is not None:
+        mask &= (channels['카테고리'] == category).to_numpy()
+
+    if channel_names is None:
+        return channels.index.to_numpy()[mask]
+
+    positions = pd.Index(channels[channel_col]).get_indexer(list(channel_names))
+    positions = positions[positions >= 0]
+    return channels.index.to_numpy()[positions[mask[positions]]]
+
+def channel_video_stats(videos, channels, value_cols=VIDEO_VALUE_COLUMNS, category=None):
+    """
+    채널별 영상 지표 합계와 영상 수를 bincount로 집계하여 채널 테이블과 합칩니다.
+
+    Parameters:
+    videos (pd.DataFrame): 영상 테이블
+    channels (pd.DataFrame): 채널 테이블
+    value_cols (tuple): 합산할 영상 지표 컬럼 (없는 컬럼은 건너뜀)
+    category (str): 지정하면 해당 카테고리 영상만 집계하고 그 카테고리에 영상이 있는 채널만 반환
+
+    Returns:
+    pd.DataFrame: 채널 테이블 + 지표 합계 + 영상수 (index: 채널ID)
+    """
+    if category is not None:
+        videos = videos[(videos['카테고리'] == category).to_numpy()]
+
+    channel_ids = videos['채널ID'].to_numpy()
+    stats = channels.copy()
+
+    for col in value_cols:
+        if col in videos.columns:
+            stats[col] = np.bincount(channel_ids, weights=videos[col].to_numpy(dtype=np.float64), minlength=len(channels))
+    stats['영상수'] = np.bincount(channel_ids, minlength=len(channels))
+
+    if category is not None:
+        stats = stats[stats['영상수'] > 0]
+
+    return stats
@@ -0,0 +1,413 @@
+"""
+YouTube Channel Analysis - Correlation Engine
+카테고리·채널 그룹 × 지표 쌍의 Pearson/Spearman 상관계수를 한 번에 계산합니다.
+그룹별 합계는 bincount로, 순위는 groupby rank로 구하므로 그룹 수와 무관하게 한 번의 순회로 끝납니다.
+"""
+
+import os
+import time
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from scipy import stats
+
+# 기본 분석 지표 쌍
+CORRELATION_PAIRS = [('조회수', '좋아요 수'), ('조회수', '댓글 수'), ('좋아요 수', '댓글 수')]
+
+# 순열 검정 기본 지표 쌍
+PERMUTATION_PAIRS = [('조회수', '좋아요 수'), ('조회수', '댓글 수')]
+
+# 상관관계 누적 통계량 컬럼 (표본 수, 평균, 편차 제곱합, 편차 곱의 합)
+MOMENT_COLUMNS = ['n', 'mean_x', 'mean_y', 'm2_x', 'm2_y', 'c_xy']
+
+def _group_codes(df, group_cols):
+    """
+    그룹 컬럼을 정수 코드와 그룹 인덱스로 변환합니다. (그룹 컬럼이 없으면 전체를 한 그룹으로 처리)
+    """
+    if not group_cols:
+        return np.zeros(len(df), dtype=np.int64), pd.Index([None])
+
+    if len(group_cols) == 1:
+        codes, groups = pd.factorize(df[group_cols[0]])
+        return codes, pd.Index(groups, name=group_cols[0])
+
+    codes, groups = pd.factorize(pd.MultiIndex.from_frame(df[group_cols]))
+    return codes, pd.MultiIndex.from_tuples(groups, names=group_cols)
+
+def grouped_pearson(codes, x, y, n_groups):
+    """
+    그룹별 Pearson 상관계수와 p-value를 계산합니다.
+    그룹 평균을 먼저 구한 뒤 편차 곱의 합(Σdxdy, Σdx², Σdy²)을 bincount로 집계합니다.
+
+    Parameters:
+    codes (np.ndarray): 행별 그룹 코드 (0 이상)
+    x (np.ndarray): X 값 (결측값 없음)
+    y (np.ndarray): Y 값 (결측값 없음)
+    n_groups (int): 그룹 수
+
+    Returns:
+    tuple: (상관계수, p-value, 표본 수) 배열 (표본 2개 미만 또는 분산 0인 그룹은 NaN)
+    """
+    counts = np.bincount(codes, minlength=n_groups)
+    safe_counts = np.maximum(counts, 1)
+
+    # 큰 조회수에서 ΣxΣy 방식의 자릿수 손실을 피하기 위해 평균을 뺀 편차로 집계
+    dx = x - (np.bincount(codes, weights=x, minlength=n_groups) / safe_counts)[codes]
+    dy = y - (np.bincount(codes, weights=y, minlength=n_groups) / safe_counts)[codes]
+    sxy = np.bincount(codes, weights=dx * dy, minlength=n_groups)
+    sxx = np.bincount(codes, weights=dx * dx, minlength=n_groups)
+    syy = np.bincount(codes, weights=dy * dy, minlength=n_groups)
+
+    r, p = _pearson_from_comoments(counts, sxx, syy, sxy)
+    return r, p, counts
+
+def _pearson_from_comoments(counts, sxx, syy, sxy):
+    """
+    표본 수와 편차 제곱합/곱의 합으로 Pearson 상관계수와 p-value를 계산합니다.
+    """
+    denominator = np.sqrt(sxx * syy)
+    valid = (counts >= 2) & (denominator > 0)
+    r = np.divide(sxy, denominator, out=np.full(len(counts), np.nan), where=valid)
+    r = np.clip(r, -1.0, 1.0)
+
+    # t = r·√((n-2)/(1-r²)), 자유도 n-2의 양측 검정 (n=2이면 scipy와 같이 p=1)
+    df_t = counts - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = r * np.sqrt(df_t / (1 - r ** 2))
+        p = 2 * stats.t.sf(np.abs(t), np.maximum(df_t, 1))
+    p = np.where(np.abs(r) == 1, 0.0, p)
+    p = np.where(valid & (df_t == 0), 1.0, p)
+    p = np.where(valid, p, np.nan)
+
+    return r, p
+
+def calculate_grouped_correlations(df, group_cols=('카테고리', '채널명'), pairs=None, min_samples=2):
+    """
+    모든 그룹 × 지표 쌍의 Pearson/Spearman 상관계수, p-value, R², 표본 수를 계산합니다.
+    지표 쌍마다 두 값이 모두 있는 행만 사용합니다.
+
+    Parameters:
+    df (pd.DataFrame): 데이터프레임
+    group_cols (tuple): 그룹 기준 컬럼 (빈 튜플이면 전체를 한 그룹으로 계산)
+    pairs (list): (X 컬럼, Y 컬럼) 목록 (None이면 CORRELATION_PAIRS)
+    min_samples (int): 결과에 포함할 최소 표본 수
+
+    Returns:
+    pd.DataFrame: (그룹, X, Y)별 pearson_correlation, pearson_p_value, spearman_correlation,
+                  spearman_p_value, r_squared, sample_size
+    """
+    group_cols = list(group_cols)
+    pairs = CORRELATION_PAIRS if pairs is None else pairs
+    codes, groups = _group_codes(df, group_cols)
+    n_groups = len(groups)
+
+    frames = []
+    for x_col, y_col in pairs:
+        x = df[x_col].to_numpy(dtype=np.float64)
+        y = df[y_col].to_numpy(dtype=np.float64)
+        valid = ~(np.isnan(x) | np.isnan(y)) & (codes >= 0)
+        pair_codes, x, y = codes[valid], x[valid], y[valid]
+
+        pearson_r, pearson_p, counts = grouped_pearson(pair_codes, x, y, n_groups)
+
+        # 그룹 내 평균 순위 → 순위의 Pearson = Spearman
+        ranks = pd.DataFrame({'x': x, 'y': y}).groupby(pair_codes).rank(method='average')
+        spearman_r, spearman_p, _ = grouped_pearson(
+            pair_codes, ranks['x'].to_numpy(), ranks['y'].to_numpy(), n_groups
+        )
+        spearman_p[counts < 3] = np.nan  # scipy spearmanr과 같이 표본 2개면 검정 불가
+
+        frames.append(pd.DataFrame({
+            'x': x_col,
+            'y': y_col,
+            'pearson_correlation': pearson_r,
+            'pearson_p_value': pearson_p,
+            'spearman_correlation': spearman_r,
+            'spearman_p_value': spearman_p,
+            'r_squared': pearson_r ** 2,
+            'sample_size': counts
+        }, index=groups))
+
+    results = pd.concat(frames)
+    results = results[results['sample_size'] >= max(min_samples, 2)]
+
+    if not group_cols:
+        return results.set_index(['x', 'y'])
+    return results.set_index(['x', 'y'], append=True)
+
+def correlation_metrics_dict(correlations, group=None, x_col='조회수', y_col='좋아요 수'):
+    """
+    calculate_grouped_correlations 결과에서 한 그룹·지표 쌍의 지표를 dict로 꺼냅니다.
+
+    Parameters:
+    correlations (pd.DataFrame): calculate_grouped_correlations 결과
+    group: 그룹 키 (그룹 컬럼 없이 계산했으면 None)
+    x_col (str): X 컬럼명
+    y_col (str): Y 컬럼명
+
+    Returns:
+    dict: 상관관계 지표 (결과가 없으면 빈 dict)
+    """
+    if group is None:
+        key = (x_col, y_col)
+    else:
+        key = (*(group if isinstance(group, tuple) else (group,)), x_col, y_col)
+    if key not in correlations.index:
+        return {}
+
+    metrics = correlations.loc[key].to_dict()
+    metrics['sample_size'] = int(metrics['sample_size'])
+    return metrics
+
+def _permutation_task(args):
+    """
+    한 그룹·지표 쌍에 대해 순열 상관계수를 행렬 연산으로 일괄 계산합니다.
+    (프로세스 풀에서 실행할 수 있도록 모듈 최상위 함수로 정의)
+    """
+    x, y, n_permutations, seed, max_batch_elements = args
+    start_time = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    n = len(x)
+
+    # 표준화하면 상관계수 = z_x · z_y / n
+    x_std, y_std = x.std(), y.std()
+    if n < 3 or x_std == 0 or y_std == 0:
+        return np.nan, np.nan, time.perf_counter() - start_time
+
+    z_x = (x - x.mean()) / x_std
+    z_y = (y - y.mean()) / y_std
+    observed = z_x @ z_y / n
+
+    # 순열 행렬 (batch × n)로 Y를 섞어 한 번의 행렬 곱으로 계산
+    batch_size = max(1, min(n_permutations, max_batch_elements // n))
+    exceed = 0
+    for batch_start in range(0, n_permutations, batch_size):
+        size = min(batch_size, n_permutations - batch_start)
+        permutations = rng.permuted(np.broadcast_to(np.arange(n), (size, n)), axis=1)
+        permuted = z_y[permutations] @ z_x / n
+        exceed += np.count_nonzero(np.abs(permuted) >= np.abs(observed) - 1e-12)
+
+    p_value = (exceed + 1) / (n_permutations + 1)
+    return observed, p_value, time.perf_counter() - start_time
+
+def permutation_test_correlations(df, group_cols=('카테고리', '채널명'), pairs=None, method='pearson',
+                                  n_permutations=2000, seed=42, n_jobs=1, max_batch_elements=5_000_000):
+    """
+    그룹 × 지표 쌍별 상관계수의 순열 검정 p-value를 계산합니다.
+    조회수·좋아요·댓글처럼 꼬리가 두꺼운 분포에서 정규성 가정 없이 유의성을 판단합니다.
+
+    Parameters:
+    df (pd.DataFrame): 데이터프레임
+    group_cols (tuple): 그룹 기준 컬럼 (빈 튜플이면 전체를 한 그룹으로 계산)
+    pairs (list): (X 컬럼, Y 컬럼) 목록 (None이면 PERMUTATION_PAIRS)
+    method (str): 'pearson' 또는 'spearman' (그룹 내 순위로 계산)
+    n_permutations (int): 순열 수
+    seed (int): 난수 시드 (n_jobs와 무관하게 같은 결과)
+    n_jobs (int): 프로세스 수 (1이면 현재 프로세스에서 실행)
+    max_batch_elements (int): 한 번에 만들 순열 행렬 최대 원소 수 (메모리 제한)
+
+    Returns:
+    pd.DataFrame: (그룹, X, Y)별 correlation, permutation_p_value, sample_size, runtime_seconds
+    """
+    group_cols = list(group_cols)
+    pairs = PERMUTATION_PAIRS if pairs is None else pairs
+    codes, groups = _group_codes(df, group_cols)
+
+    # (지표 쌍, 그룹)별 작업 생성: 그룹 순 정렬 후 경계에서 분할
+    keys, tasks = [], []
+    seeds = iter(np.random.SeedSequence(seed).spawn(len(pairs) * len(groups)))
+    for x_col, y_col in pairs:
+        x = df[x_col].to_numpy(dtype=np.float64)
+        y = df[y_col].to_numpy(dtype=np.float64)
+        valid = ~(np.isnan(x) | np.isnan(y)) & (codes >= 0)
+        pair_codes, x, y = codes[valid], x[valid], y[valid]
+
+        if method == 'spearman':
+            ranks = pd.DataFrame({'x': x, 'y': y}).groupby(pair_codes).rank(method='average')
+            x, y = ranks['x'].to_numpy(), ranks['y'].to_numpy()
+
+        order = np.argsort(pair_codes, kind='stable')
+        pair_codes, x, y = pair_codes[order], x[order], y[order]
+        boundaries = np.flatnonzero(pair_codes[1:] != pair_codes[:-1]) + 1
+        group_starts = np.r_[0, boundaries] if len(pair_codes) else np.empty(0, dtype=np.int64)
+
+        for group_code, group_x, group_y in zip(pair_codes[group_starts], np.split(x, boundaries), np.split(y, boundaries)):
+            keys.append((group_code, x_col, y_col))
+            tasks.append((group_x, group_y, n_permutations, next(seeds), max_batch_elements))
+
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            task_results = list(executor.map(_permutation_task, tasks, chunksize=max(1, len(tasks) // (n_jobs * 4))))
+    else:
+        task_results = [_permutation_task(task) for task in tasks]
+
+    results = pd.DataFrame(task_results, columns=['correlation', 'permutation_p_value', 'runtime_seconds'])
+    results['sample_size'] = [len(task[0]) for task in tasks]
+    results['x'] = [key[1] for key in keys]
+    results['y'] = [key[2] for key in keys]
+    results = results[['x', 'y', 'correlation', 'permutation_p_value', 'sample_size', 'runtime_seconds']]
+
+    if not group_cols:
+        return results.set_index(['x', 'y'])
+    results.index = groups[[key[0] for key in keys]]
+    return results.set_index(['x', 'y'], append=True)
+
+def compute_correlation_moments(df, group_cols=('카테고리', '채널명'), pairs=None):
+    """
+    그룹 × 지표 쌍별 병합 가능한 누적 통계량(표본 수, 평균, 편차 제곱합, 편차 곱의 합)을 계산합니다.
+
+    Parameters:
+    df (pd.DataFrame): 데이터프레임
+    group_cols (tuple): 그룹 기준 컬럼
+    pairs (list): (X 컬럼, Y 컬럼) 목록 (None이면 CORRELATION_PAIRS)
+
+    Returns:
+    pd.DataFrame: (그룹, X, Y)별 MOMENT_COLUMNS (표본이 없는 그룹은 제외)
+    """
+    group_cols = list(group_cols)
+    pairs = CORRELATION_PAIRS if pairs is None else pairs
+    codes, groups = _group_codes(df, group_cols)
+    n_groups = len(groups)
+
+    frames = []
+    for x_col, y_col in pairs:
+        x = df[x_col].to_numpy(dtype=np.float64)
+        y = df[y_col].to_numpy(dtype=np.float64)
+        valid = ~(np.isnan(x) | np.isnan(y)) & (codes >= 0)
+        pair_codes, x, y = codes[valid], x[valid], y[valid]
+
+        counts = np.bincount(pair_codes, minlength=n_groups).astype(np.float64)
+        safe_counts = np.maximum(counts, 1)
+        mean_x = np.bincount(pair_codes, weights=x, minlength=n_groups) / safe_counts
+        mean_y = np.bincount(pair_codes, weights=y, minlength=n_groups) / safe_counts
+        dx = x - mean_x[pair_codes]
+        dy = y - mean_y[pair_codes]
+
+        frames.append(pd.DataFrame({
+            'x': x_col,
+            'y': y_col,
+            'n': counts,
+            'mean_x': mean_x,
+            'mean_y': mean_y,
+            'm2_x': np.bincount(pair_codes, weights=dx * dx, minlength=n_groups),
+            'm2_y': np.bincount(pair_codes, weights=dy * dy, minlength=n_groups),
+            'c_xy': np.bincount(pair_codes, weights=dx * dy, minlength=n_groups)
+        }, index=groups))
+
+    moments = pd.concat(frames)
+    moments = moments[moments['n'] > 0]
+
+    if not group_cols:
+        return moments.set_index(['x', 'y'])
+    return moments.set_index(['x', 'y'], append=True)
+
+def combine_correlation_moments(moments, levels=None):
+    """
+    누적 통계량을 지정한 인덱스 레벨 기준으로 병합합니다. (Chan 병렬 분산 공식, 정확한 병합)
+    전체 평균을 구한 뒤 각 부분의 평균 차이 보정항(n·Δx·Δy)을 더합니다.
+
+    Parameters:
+    moments (pd.DataFrame): compute_correlation_moments 결과 (여러 결과를 concat한 것도 가능)
+    levels (list): 남길 인덱스 레벨 (None이면 전체 레벨, 즉 같은 키끼리 병합)
+                   (예: ['카테고리', 'x', 'y']는 채널 통계량을 카테고리 단위로 병합)
+
+    Returns:
+    pd.DataFrame: 병합된 누적 통계량
+    """
+    levels = list(moments.index.names) if levels is None else list(levels)
+    weighted = moments.assign(sum_x=moments['n'] * moments['mean_x'], sum_y=moments['n'] * moments['mean_y'])
+    grouped = weighted.groupby(level=levels, sort=False)
+
+    n = grouped['n'].transform('sum')
+    delta_x = weighted['mean_x'] - grouped['sum_x'].transform('sum') / n
+    delta_y = weighted['mean_y'] - grouped['sum_y'].transform('sum') / n
+
+    parts = pd.DataFrame({
+        'n': weighted['n'],
+        'sum_x': weighted['sum_x'],
+        'sum_y': weighted['sum_y'],
+        'm2_x': weighted['m2_x'] + weighted['n'] * delta_x ** 2,
+        'm2_y': weighted['m2_y'] + weighted['n'] * delta_y ** 2,
+        'c_xy': weighted['c_xy'] + weighted['n'] * delta_x * delta_y
+    }).groupby(level=levels, sort=False).sum()
+
+    return pd.DataFrame({
+        'n': parts['n'],
+        'mean_x': parts['sum_x'] / parts['n'],
+        'mean_y': parts['sum_y'] / parts['n'],
+        'm2_x': parts['m2_x'],
+        'm2_y': parts['m2_y'],
+        'c_xy': parts['c_xy']
+    })[MOMENT_COLUMNS]
+
+def merge_correlation_moments(moments, new_moments):
+    """
+    기존 누적 통계량에 새 데이터의 누적 통계량을 병합합니다.
+
+    Parameters:
+    moments (pd.DataFrame): 기존 누적 통계량 (None이면 새 통계량 그대로)
+    new_moments (pd.DataFrame): 새 데이터의 누적 통계량 (같은 인덱스 레벨)
+
+    Returns:
+    pd.DataFrame: 병합된 누적 통계량
+    """
+    if moments is None or moments.empty:
+        return new_moments
+    return combine_correlation_moments(pd.concat([moments, new_moments]))
+
+def moments_to_correlations(moments, min_samples=2):
+    """
+    누적 통계량으로 Pearson 상관계수, p-value, R², 표본 수를 계산합니다.
+
+    Parameters:
+    moments (pd.DataFrame): 누적 통계량
+    min_samples (int): 결과에 포함할 최소 표본 수
+
+    Returns:
+    pd.DataFrame: pearson_correlation, pearson_p_value, r_squared, sample_size
+    """
+    counts = moments['n'].to_numpy().round().astype(np.int64)
+    r, p = _pearson_from_comoments(counts, moments['m2_x'].to_numpy(), moments['m2_y'].to_numpy(),
+                                   moments['c_xy'].to_numpy())
+
+    results = pd.DataFrame({
+        'pearson_correlation': r,
+        'pearson_p_value': p,
+        'r_squared': r ** 2,
+        'sample_size': counts
+    }, index=moments.index)
+    return results[results['sample_size'] >= max(min_samples, 2)]
+
+def load_correlation_moments(path):
+    """
+    저장된 누적 통계량을 로드합니다.
+
+    Parameters:
+    path (str): 파일 경로
+
+    Returns:
+    pd.DataFrame: 누적 통계량 (파일이 없거나 읽을 수 없으면 None)
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        print(f"상관관계 누적 통계량 로딩 실패: {e}")
+        return None
+
+def save_correlation_moments(moments, path):
+    """
+    누적 통계량을 저장합니다.
+
+    Parameters:
+    moments (pd.DataFrame): 누적 통계량
+    path (str): 파일 경로
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    # 저장 중 중단되어도 기존 통계량이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f'{path}.tmp'
+    moments.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
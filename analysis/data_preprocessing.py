@@ -7,6 +7,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import re
 import numpy as np
 from matplotlib.ticker import FuncFormatter
 import matplotlib.font_manager as fm
@@ -15,6 +16,22 @@ import matplotlib.font_manager as fm
 plt.rcParams['font.family'] = 'DejaVu Sans'
 plt.rcParams['axes.unicode_minus'] = False
 
+# 한글 텍스트 정제용 정규식 (호출마다 컴파일하지 않도록 모듈 로드 시 한 번만 컴파일)
+NON_KOREAN_PATTERN = re.compile(r'[^가-힣\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# 영상 길이 구간 (분, 오른쪽 경계 포함)
+DURATION_BINS = [-np.inf, 5, 15, 30, 60, np.inf]
+DURATION_LABELS = ['초단편 (5분 이하)', '단편 (5-15분)', '중편 (15-30분)', '장편 (30-60분)', '초장편 (60분 초과)']
+
+# 데이터 출처에 따라 구독자 수 컬럼명이 다름
+SUBSCRIBER_COLUMNS = ['구독자수', '구독자 수']
+
+# 실행 설정 (reference_date: 채널 나이 등 기간 계산 기준일, None이면 데이터의 최신 게시일)
+RUN_CONFIG = {
+    'reference_date': None
+}
+
 def load_and_preprocess_data(use_api=False, api_key=None, data_dir="data"):
     """
     데이터를 로드하고 전처리를 수행합니다.
@@ -148,9 +165,14 @@ def preprocess_dataframe(df):
     # 데이터프레임 복사
     df = df.copy()
 
-    # 날짜 형식을 datetime으로 변환
+    # 날짜 형식을 datetime으로 변환 (게시시간 컬럼이 있으면 날짜와 합쳐서 시간대까지 반영)
     if '게시일' in df.columns:
-        df['게시일'] = pd.to_datetime(df['게시일'], errors='coerce')
+        if '게시시간' in df.columns:
+            df['게시일'] = pd.to_datetime(
+                df['게시일'].astype(str) + ' ' + df['게시시간'].astype(str), errors='coerce'
+            ).fillna(pd.to_datetime(df['게시일'], errors='coerce'))
+        else:
+            df['게시일'] = pd.to_datetime(df['게시일'], errors='coerce')
 
         # 요일과 시간대 추출
         df['요일'] = df['게시일'].dt.day_name()
@@ -187,8 +209,72 @@ def preprocess_dataframe(df):
     if '재생 시간(분)' in df.columns:
         df = df[df['재생 시간(분)'] > 1]  # 1분 이하 제거
 
+    return add_derived_features(df)
+
+def _safe_ratio(numerator, denominator, scale=1.0):
+    """
+    분모가 0 이하인 행은 0으로 두고 비율을 float32로 계산합니다.
+    """
+    numerator = pd.to_numeric(numerator, errors='coerce').to_numpy(dtype=np.float64)
+    denominator = pd.to_numeric(denominator, errors='coerce').to_numpy(dtype=np.float64)
+    valid = np.isfinite(numerator) & (denominator > 0)
+
+    ratio = np.zeros(len(numerator), dtype=np.float64)
+    np.divide(numerator, denominator, out=ratio, where=valid)
+    return (ratio * scale).astype(np.float32)
+
+def add_derived_features(df):
+    """
+    분석 모듈들이 공통으로 사용하는 파생 지표를 한 번에 계산하여 컬럼으로 추가합니다.
+    (원본 컬럼이 없는 지표는 건너뜀)
+
+    - 길이카테고리: 재생 시간(분)을 DURATION_BINS로 나눈 순서형 카테고리
+    - 좋아요율, 댓글율: 조회수 대비 비율 (%)
+    - 구독자당조회수: 영상 조회수 / 채널 구독자 수
+
+    Parameters:
+    df (pd.DataFrame): 전처리된 데이터프레임
+
+    Returns:
+    pd.DataFrame: 파생 컬럼이 추가된 데이터프레임 (비율은 float32)
+    """
+    if '재생 시간(분)' in df.columns:
+        df['길이카테고리'] = pd.cut(df['재생 시간(분)'], bins=DURATION_BINS, labels=DURATION_LABELS, right=True)
+
+    if '조회수' in df.columns:
+        if '좋아요 수' in df.columns:
+            df['좋아요율'] = _safe_ratio(df['좋아요 수'], df['조회수'], scale=100)
+        if '댓글 수' in df.columns:
+            df['댓글율'] = _safe_ratio(df['댓글 수'], df['조회수'], scale=100)
+
+        subscriber_col = next((col for col in SUBSCRIBER_COLUMNS if col in df.columns), None)
+        if subscriber_col is not None:
+            df['구독자당조회수'] = _safe_ratio(df['조회수'], df[subscriber_col])
+
     return df
 
+def get_reference_date(df=None, reference_date=None):
+    """
+    기간 계산 기준일을 반환합니다.
+    우선순위: 인자로 받은 기준일 → RUN_CONFIG['reference_date'] → 데이터의 최신 게시일 → 현재 시각
+
+    Parameters:
+    df (pd.DataFrame): 게시일 컬럼이 있는 데이터프레임
+    reference_date (str or datetime): 명시적 기준일
+
+    Returns:
+    pd.Timestamp: 기준일
+    """
+    if reference_date is None:
+        reference_date = RUN_CONFIG.get('reference_date')
+
+    if reference_date is None and df is not None and '게시일' in df.columns:
+        reference_date = pd.to_datetime(df['게시일'], errors='coerce').max()
+
+    if reference_date is None or pd.isna(reference_date):
+        return pd.Timestamp.now()
+    return pd.Timestamp(reference_date)
+
 def filter_by_category(df, category):
     """
     특정 카테고리로 데이터를 필터링합니다.
@@ -237,20 +323,44 @@ def clean_korean_text(text):
     Returns:
     str: 전처리된 텍스트
     """
-    import re
-
     if pd.isna(text):
         return ""
 
     # 한글만 추출 (숫자, 특수문자 제거)
-    korean_text = re.sub(r'[^가-힣\s]', ' ', str(text))
+    korean_text = NON_KOREAN_PATTERN.sub(' ', str(text))
 
     # 연속된 공백을 하나로 통합
-    korean_text = re.sub(r'\s+', ' ', korean_text)
+    korean_text = WHITESPACE_PATTERN.sub(' ', korean_text)
 
     # 앞뒤 공백 제거
     return korean_text.strip()
 
+def clean_korean_text_series(texts):
+    """
+    텍스트 컬럼 전체에 한글 텍스트 전처리를 벡터화하여 수행합니다.
+    재업로드·시리즈물처럼 중복된 제목은 한 번만 정제한 뒤 결과를 재사용합니다.
+
+    Parameters:
+    texts (pd.Series): 원본 텍스트 컬럼
+
+    Returns:
+    pd.Series: 전처리된 텍스트 컬럼 (결측값은 빈 문자열, 원본 인덱스 유지)
+    """
+    texts = pd.Series(texts)
+
+    # 고유 제목만 정제 (결측값은 코드 -1)
+    codes, uniques = pd.factorize(texts)
+    cleaned = (pd.Series(uniques, dtype=object).astype(str)
+               .str.replace(NON_KOREAN_PATTERN, ' ', regex=True)
+               .str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+               .str.strip())
+
+    # 마지막 자리에 결측값용 빈 문자열을 두고 코드로 한 번에 펼치기
+    values = np.append(cleaned.to_numpy(dtype=object), '')
+    codes = np.where(codes < 0, len(uniques), codes)
+
+    return pd.Series(values[codes], index=texts.index, dtype=object)
+
 def format_numbers(x, pos):
     """
     숫자를 K, M 단위로 포맷팅합니다.
@@ -262,6 +372,29 @@ def format_numbers(x, pos):
     else:
         return f'{x:.0f}'
 
+# 워드클라우드 등에서 사용할 한글 폰트 후보 (우선순위 순)
+KOREAN_FONT_NAMES = ['Malgun Gothic', 'AppleGothic', 'NanumGothic', 'Noto Sans CJK KR', 'Noto Sans KR', 'UnDotum']
+
+_korean_font_path = None
+
+def find_korean_font_path():
+    """
+    시스템에 설치된 한글 폰트 파일 경로를 찾습니다. (한 번 찾은 결과는 재사용)
+
+    Returns:
+    str: 한글 폰트 파일 경로 (없으면 None)
+    """
+    global _korean_font_path
+
+    if _korean_font_path is None:
+        font_paths = {font.name: font.fname for font in fm.fontManager.ttflist}
+        _korean_font_path = next((font_paths[name] for name in KOREAN_FONT_NAMES if name in font_paths), '')
+
+        if not _korean_font_path:
+            print("한글 폰트를 찾을 수 없습니다. 워드클라우드의 한글이 깨질 수 있습니다.")
+
+    return _korean_font_path or None
+
 def setup_matplotlib():
     """
     Matplotlib 한글 설정을 수행합니다.
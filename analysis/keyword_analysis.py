@@ -0,0 +1,386 @@
+"""
+YouTube Channel Analysis - Keyword Analysis
+대용량 제목 데이터를 위한 키워드 집계 함수들을 포함합니다.
+"""
+
+import pandas as pd
+import numpy as np
+from itertools import chain
+from scipy import sparse
+from korean_tokenizer import tokenize_titles
+
+# 어휘 크기^n이 64비트를 넘을 때 사용하는 n-gram 해시 승수 (홀수, 오버플로는 2^64 모듈러 연산)
+NGRAM_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+class SpaceSavingCounter:
+    """
+    Space-Saving 알고리즘 기반 상위 키워드 스케치입니다.
+    최대 capacity개의 키워드만 유지하므로 전체 빈도표를 메모리에 올리지 않고 상위 키워드를 추정합니다.
+
+    각 키워드의 추정빈도는 실제 빈도의 상한이며, 추정빈도 - 오차는 하한입니다.
+    추적되지 않는 키워드의 실제 빈도는 항상 최소 추정빈도 이하입니다.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.errors = pd.Series(dtype='int64')
+        self.total = 0
+
+    def min_count(self):
+        """
+        추적되지 않는 키워드가 가질 수 있는 최대 빈도를 반환합니다.
+        """
+        if len(self.counts) < self.capacity:
+            return 0
+        return int(self.counts.min())
+
+    def update(self, title_tokens):
+        """
+        제목 토큰 청크를 스케치에 반영합니다.
+
+        Parameters:
+        title_tokens (pd.Series): 제목별 토큰 튜플 (korean_tokenizer.tokenize_titles 결과)
+        """
+        self.add_counts(pd.Series(title_tokens).explode().dropna().value_counts())
+
+    def add_counts(self, chunk_counts):
+        """
+        청크에서 집계한 키워드별 빈도를 스케치에 반영합니다.
+
+        Parameters:
+        chunk_counts (pd.Series): 키워드 → 빈도 (키워드는 중복 없음)
+        """
+        if chunk_counts.empty:
+            return
+
+        self.total += int(chunk_counts.sum())
+
+        # 새로 들어온 키워드는 과거에 버려졌을 수 있으므로 현재 최소 빈도만큼 오차를 부여
+        min_count = self.min_count()
+        new_keywords = chunk_counts.index.difference(self.counts.index)
+
+        counts = self.counts.add(chunk_counts, fill_value=0).astype('int64')
+        errors = self.errors.reindex(counts.index, fill_value=0).astype('int64')
+        counts[new_keywords] += min_count
+        errors[new_keywords] += min_count
+
+        # 상위 capacity개만 유지
+        if len(counts) > self.capacity:
+            keep = counts.nlargest(self.capacity).index
+            counts = counts[keep]
+            errors = errors[keep]
+
+        self.counts = counts
+        self.errors = errors
+
+    def most_common(self, top_n=20):
+        """
+        상위 키워드와 빈도 범위를 반환합니다.
+
+        Parameters:
+        top_n (int): 상위 몇 개 키워드를 가져올지
+
+        Returns:
+        pd.DataFrame: 키워드, 추정빈도(상한), 최소빈도(하한), 오차
+        """
+        top_counts = self.counts.nlargest(top_n)
+        top_errors = self.errors[top_counts.index]
+
+        return pd.DataFrame({
+            '키워드': top_counts.index,
+            '추정빈도': top_counts.values,
+            '최소빈도': (top_counts - top_errors).values,
+            '오차': top_errors.values
+        })
+
+def iter_title_chunks(df, category=None, chunksize=100000):
+    """
+    데이터프레임의 제목 컬럼을 청크 단위로 반환합니다.
+
+    Parameters:
+    df (pd.DataFrame): 전체 데이터프레임
+    category (str): 카테고리명 (None이면 전체)
+    chunksize (int): 청크 크기
+
+    Returns:
+    generator: 제목 Series 청크
+    """
+    titles = df['제목'] if category is None else df.loc[df['카테고리'] == category, '제목']
+
+    for start in range(0, len(titles), chunksize):
+        yield titles.iloc[start:start + chunksize]
+
+def count_top_keywords_streaming(title_chunks, top_n=20, capacity=None, tokenizer='simple', cache_dir=None, title_col='제목',
+                                  ngram_range=(1, 1)):
+    """
+    제목 청크를 순차적으로 읽으며 상위 키워드를 근사 집계합니다.
+    메모리 사용량은 capacity에만 비례하므로 메모리보다 큰 제목 데이터에도 사용할 수 있습니다.
+    (토큰 캐시는 전체 고유 제목만큼 커지므로 기본값은 캐시 없이 청크마다 토큰화)
+
+    Parameters:
+    title_chunks (iterable): 제목 Series 또는 데이터프레임 청크 (iter_title_chunks, pd.read_csv(chunksize=...) 등)
+    top_n (int): 상위 몇 개 키워드를 가져올지
+    capacity (int): 스케치가 유지할 키워드 수 (기본값: top_n * 50)
+    tokenizer (str or callable): 제목 토큰화 방식
+    cache_dir (str): 토큰 캐시 디렉토리 (None이면 캐시 사용 안 함)
+    title_col (str): 데이터프레임 청크에서 사용할 제목 컬럼
+    ngram_range (tuple): (최소 n, 최대 n) 키워드 길이 (n-gram은 청크 안의 제목에서만 만들어짐)
+
+    Returns:
+    pd.DataFrame: 키워드, 추정빈도, 최소빈도, 오차
+    """
+    counter = SpaceSavingCounter(capacity or top_n * 50)
+
+    for chunk in title_chunks:
+        titles = chunk[title_col] if isinstance(chunk, pd.DataFrame) else chunk
+        title_tokens = tokenize_titles(titles, tokenizer=tokenizer, cache_dir=cache_dir, use_cache=cache_dir is not None)
+        if tuple(ngram_range) == (1, 1):
+            counter.update(title_tokens)
+        else:
+            terms = count_title_terms(title_tokens, ngram_range=ngram_range)
+            counter.add_counts(pd.Series(terms['빈도'].to_numpy(), index=terms['키워드']))
+
+    return counter.most_common(top_n)
+
+def build_channel_term_matrix(df, tokenizer='simple', cache_dir="cache"):
+    """
+    채널 × 키워드 희소 빈도 행렬을 생성합니다.
+
+    Parameters:
+    df (pd.DataFrame): 데이터프레임 (채널명, 제목 컬럼 필요)
+    tokenizer (str or callable): 제목 토큰화 방식
+    cache_dir (str): 토큰 캐시 디렉토리
+
+    Returns:
+    tuple: (scipy.sparse.csr_matrix 빈도 행렬, 채널명 Index, 키워드 Index)
+    """
+    title_tokens = tokenize_titles(df['제목'], tokenizer=tokenizer, cache_dir=cache_dir)
+    tokens = pd.DataFrame({'채널명': df['채널명'], '키워드': title_tokens}).explode('키워드').dropna()
+
+    channel_codes, channels = pd.factorize(tokens['채널명'])
+    term_codes, terms = pd.factorize(tokens['키워드'])
+
+    # 중복 (채널, 키워드) 쌍은 COO → CSR 변환 시 합산됨
+    matrix = sparse.coo_matrix(
+        (np.ones(len(tokens), dtype=np.float64), (channel_codes, term_codes)),
+        shape=(len(channels), len(terms))
+    ).tocsr()
+
+    return matrix, pd.Index(channels), pd.Index(terms)
+
+def score_tfidf(matrix):
+    """
+    채널별 TF-IDF 점수를 계산합니다. (0이 아닌 항목만 계산)
+
+    Parameters:
+    matrix (scipy.sparse.csr_matrix): 채널 × 키워드 빈도 행렬
+
+    Returns:
+    scipy.sparse.csr_matrix: TF-IDF 점수 행렬
+    """
+    n_channels = matrix.shape[0]
+
+    # 키워드별 등장 채널 수 → 평활화된 IDF
+    document_freq = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1 + n_channels) / (1 + document_freq)) + 1
+
+    # 채널별 총 단어 수로 나눈 TF
+    row_totals = np.asarray(matrix.sum(axis=1)).ravel()
+    row_ids = np.repeat(np.arange(n_channels), np.diff(matrix.indptr))
+
+    scores = matrix.copy()
+    scores.data = matrix.data / row_totals[row_ids] * idf[matrix.indices]
+    return scores
+
+def score_log_odds(matrix, prior_strength=None):
+    """
+    채널 vs 나머지 채널의 log-odds 비율 z-점수를 계산합니다.
+    (Monroe et al. 2008, 카테고리 전체 빈도를 사전분포로 사용하는 informative Dirichlet prior)
+
+    Parameters:
+    matrix (scipy.sparse.csr_matrix): 채널 × 키워드 빈도 행렬
+    prior_strength (float): 사전분포 가중치 합 (기본값: 키워드 수)
+
+    Returns:
+    scipy.sparse.csr_matrix: log-odds z-점수 행렬
+    """
+    n_channels = matrix.shape[0]
+    term_totals = np.asarray(matrix.sum(axis=0)).ravel()
+    row_totals = np.asarray(matrix.sum(axis=1)).ravel()
+    grand_total = term_totals.sum()
+
+    alpha_total = prior_strength or matrix.shape[1]
+    alpha = alpha_total * term_totals / grand_total
+
+    # 0이 아닌 항목별 (채널, 키워드) 값
+    row_ids = np.repeat(np.arange(n_channels), np.diff(matrix.indptr))
+    y_channel = matrix.data
+    y_rest = term_totals[matrix.indices] - y_channel
+    n_channel = row_totals[row_ids]
+    n_rest = grand_total - n_channel
+    a = alpha[matrix.indices]
+
+    delta = (np.log((y_channel + a) / (n_channel + alpha_total - y_channel - a)) -
+             np.log((y_rest + a) / (n_rest + alpha_total - y_rest - a)))
+    variance = 1 / (y_channel + a) + 1 / (y_rest + a)
+
+    scores = matrix.copy()
+    scores.data = delta / np.sqrt(variance)
+    return scores
+
+def get_distinctive_keywords(df, category=None, top_n=10, method='tfidf', tokenizer='simple', cache_dir="cache"):
+    """
+    카테고리 내 다른 채널 대비 각 채널을 특징짓는 키워드를 추출합니다.
+    모든 채널을 하나의 희소 행렬로 한 번에 계산하므로 채널 수가 많아도 밀집 행렬을 만들지 않습니다.
+
+    Parameters:
+    df (pd.DataFrame): 전체 데이터프레임
+    category (str): 카테고리명 (None이면 전달된 데이터 전체)
+    top_n (int): 채널별 상위 몇 개 키워드를 가져올지
+    method (str): 'tfidf' 또는 'log_odds'
+    tokenizer (str or callable): 제목 토큰화 방식
+    cache_dir (str): 토큰 캐시 디렉토리
+
+    Returns:
+    pd.DataFrame: 채널명, 순위, 키워드, 점수, 빈도
+    """
+    category_df = df if category is None else df[df['카테고리'] == category]
+
+    if category_df.empty or '제목' not in category_df.columns:
+        return pd.DataFrame(columns=['채널명', '순위', '키워드', '점수', '빈도'])
+
+    matrix, channels, terms = build_channel_term_matrix(category_df, tokenizer=tokenizer, cache_dir=cache_dir)
+
+    if method == 'tfidf':
+        scores = score_tfidf(matrix)
+    elif method == 'log_odds':
+        scores = score_log_odds(matrix)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+
+    # 채널 내 점수 내림차순 정렬 후 채널별 상위 top_n만 선택
+    row_ids = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    order = np.lexsort((-scores.data, row_ids))
+    ranks = np.arange(len(order)) - matrix.indptr[row_ids[order]]
+    selected = order[ranks < top_n]
+
+    return pd.DataFrame({
+        '채널명': channels[row_ids[selected]],
+        '순위': ranks[ranks < top_n] + 1,
+        '키워드': terms[matrix.indices[selected]],
+        '점수': scores.data[selected],
+        '빈도': matrix.data[selected].astype(int)
+    })
+
+def build_token_ids(title_tokens):
+    """
+    제목별 토큰을 정수 ID 배열로 펼칩니다.
+
+    Parameters:
+    title_tokens (pd.Series): 제목별 토큰 튜플
+
+    Returns:
+    tuple: (토큰 ID 배열, 토큰별 제목 위치 배열, 어휘 Index)
+    """
+    lengths = np.fromiter((len(tokens) for tokens in title_tokens), dtype=np.int64, count=len(title_tokens))
+    flat_tokens = pd.Series(list(chain.from_iterable(title_tokens)), dtype=object)
+
+    token_ids, vocab = pd.factorize(flat_tokens)
+    title_rows = np.repeat(np.arange(len(title_tokens)), lengths)
+
+    return token_ids.astype(np.uint64), title_rows, pd.Index(vocab)
+
+def hash_ngrams(token_ids, title_rows, n, vocab_size):
+    """
+    같은 제목 안에서 연속된 n개 토큰을 하나의 64비트 정수 키로 변환합니다.
+    어휘 크기^n이 64비트에 들어가면 충돌 없는 위치 표기, 그렇지 않으면 다항식 해시를 사용합니다.
+
+    Parameters:
+    token_ids (np.ndarray): build_token_ids의 토큰 ID 배열
+    title_rows (np.ndarray): build_token_ids의 제목 위치 배열
+    n (int): n-gram 길이
+    vocab_size (int): 어휘 크기
+
+    Returns:
+    tuple: (n-gram 시작 토큰 위치 배열, n-gram 키 배열)
+    """
+    n_starts = len(token_ids) - n + 1
+    if n_starts <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+
+    # 제목 위치가 정렬되어 있으므로 처음과 마지막 토큰이 같은 제목이면 n-gram 전체가 같은 제목
+    starts = np.flatnonzero(title_rows[:n_starts] == title_rows[n - 1:])
+
+    base = np.uint64(vocab_size + 1) if (vocab_size + 1) ** n < 2 ** 64 else NGRAM_HASH_MULTIPLIER
+    keys = np.zeros(len(starts), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for offset in range(n):
+            keys = keys * base + token_ids[starts + offset] + np.uint64(1)
+
+    return starts, keys
+
+def count_title_terms(title_tokens, groups=None, ngram_range=(1, 1), top_n=None):
+    """
+    제목 토큰의 단어 및 n-gram(구문) 빈도를 그룹별로 집계합니다.
+    n-gram은 Python 튜플 대신 64비트 정수 키 배열로 집계하여 메모리를 절약합니다.
+
+    Parameters:
+    title_tokens (pd.Series): 제목별 토큰 튜플 (korean_tokenizer.tokenize_titles 결과)
+    groups (pd.Series): 제목별 그룹 (채널명, 카테고리 등, None이면 전체를 하나의 그룹으로 집계, 결측 그룹은 제외)
+    ngram_range (tuple): (최소 n, 최대 n)
+    top_n (int): 그룹별 상위 몇 개를 가져올지 (None이면 전체)
+
+    Returns:
+    pd.DataFrame: 그룹, 키워드 (n-gram은 공백으로 연결), n, 빈도 (그룹 내 빈도 내림차순)
+    """
+    title_tokens = pd.Series(title_tokens)
+    if groups is None:
+        group_codes, group_names = np.zeros(len(title_tokens), dtype=np.int64), pd.Index(['전체'])
+    else:
+        group_codes, group_names = pd.factorize(pd.Series(groups))
+
+        # 그룹이 결측값(코드 -1)인 제목은 집계에서 제외
+        if (group_codes < 0).any():
+            valid = group_codes >= 0
+            title_tokens = title_tokens[valid]
+            group_codes = group_codes[valid]
+
+    token_ids, title_rows, vocab = build_token_ids(title_tokens)
+
+    results = []
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        starts, keys = hash_ngrams(token_ids, title_rows, n, len(vocab))
+        if len(keys) == 0:
+            continue
+
+        # (그룹, 키) 순으로 정렬 후 연속 구간 길이로 빈도 계산
+        term_groups = group_codes[title_rows[starts]]
+        order = np.lexsort((keys, term_groups))
+        sorted_keys = keys[order]
+        sorted_groups = term_groups[order]
+        run_starts = np.flatnonzero(np.r_[True, (sorted_keys[1:] != sorted_keys[:-1]) |
+                                                (sorted_groups[1:] != sorted_groups[:-1])])
+        counts = np.diff(np.r_[run_starts, len(order)])
+
+        # 각 n-gram의 첫 등장 위치에서 토큰을 읽어 문자열로 복원
+        first_starts = starts[order[run_starts]]
+        words = vocab.to_numpy()[token_ids[first_starts[:, None] + np.arange(n)].astype(np.int64)]
+
+        results.append(pd.DataFrame({
+            '그룹': group_names[sorted_groups[run_starts]],
+            '키워드': [' '.join(term) for term in words],
+            'n': n,
+            '빈도': counts
+        }))
+
+    if not results:
+        return pd.DataFrame(columns=['그룹', '키워드', 'n', '빈도'])
+
+    terms = pd.concat(results, ignore_index=True)
+    terms = terms.sort_values(['그룹', '빈도'], ascending=[True, False], kind='stable')
+
+    if top_n is not None:
+        terms = terms.groupby('그룹', sort=False).head(top_n)
+
+    return terms.reset_index(drop=True)
@@ -0,0 +1,181 @@
+"""
+YouTube Channel Analysis - Keyword Index
+제목 키워드 → 영상 성과 조회를 위한 역색인을 포함합니다.
+"""
+
+import pandas as pd
+import numpy as np
+from korean_tokenizer import tokenize_titles
+
+def encode_row_ids(row_ids, previous_row_id=-1):
+    """
+    정렬된 행 번호 배열을 차분 인코딩하여 가장 작은 정수 타입으로 압축합니다.
+
+    Parameters:
+    row_ids (np.ndarray): 오름차순 정렬된 행 번호
+    previous_row_id (int): 직전에 저장된 마지막 행 번호 (없으면 -1)
+
+    Returns:
+    np.ndarray: 차분 배열 (uint8/uint16/uint32)
+    """
+    gaps = np.diff(row_ids, prepend=previous_row_id)
+    max_gap = gaps.max() if len(gaps) else 0
+
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_gap <= np.iinfo(dtype).max:
+            return gaps.astype(dtype)
+    return gaps.astype(np.uint64)
+
+def decode_row_ids(gaps):
+    """
+    차분 인코딩된 행 번호 배열을 복원합니다.
+
+    Parameters:
+    gaps (np.ndarray): encode_row_ids 결과
+
+    Returns:
+    np.ndarray: 행 번호 (int64)
+    """
+    return np.cumsum(gaps, dtype=np.int64) - 1
+
+class KeywordIndex:
+    """
+    제목 키워드 → 영상 행 번호 역색인입니다.
+    키워드별 행 번호는 차분 인코딩된 정수 배열로 저장하며, 조회 결과는 캐시되어
+    같은 키워드·카테고리를 다시 조회하면 재계산 없이 반환합니다.
+    새 영상은 append로 추가하며 해당 키워드의 캐시만 무효화됩니다.
+    """
+
+    def __init__(self, tokenizer='simple', cache_dir="cache"):
+        self.tokenizer = tokenizer
+        self.cache_dir = cache_dir
+        self.postings = {}
+        self.last_row_ids = {}
+        self.categories = pd.Index([])
+        self.category_codes = np.empty(0, dtype=np.int32)
+        self.views = np.empty(0, dtype=np.float64)
+        self.like_rates = np.empty(0, dtype=np.float64)
+        self.query_cache = {}
+
+    def __len__(self):
+        return len(self.views)
+
+    def append(self, df):
+        """
+        새 영상들을 색인에 추가합니다.
+
+        Parameters:
+        df (pd.DataFrame): 추가할 영상 데이터 (제목, 카테고리, 조회수, 좋아요 수 컬럼 필요)
+        """
+        if df.empty:
+            return
+
+        start_row = len(self)
+
+        # 행별 성과 지표 저장
+        views = df['조회수'].to_numpy(dtype=np.float64)
+        likes = df['좋아요 수'].to_numpy(dtype=np.float64)
+        like_rates = np.divide(likes * 100, views, out=np.zeros_like(views), where=views > 0)
+
+        # 결측 카테고리는 색인에 넣지 않고 코드 -1로 저장
+        self.categories = self.categories.append(pd.Index(df['카테고리'].dropna().unique()).difference(self.categories))
+        self.category_codes = np.concatenate([self.category_codes, self.categories.get_indexer(df['카테고리']).astype(np.int32)])
+        self.views = np.concatenate([self.views, views])
+        self.like_rates = np.concatenate([self.like_rates, like_rates])
+
+        # (키워드, 행 번호) 쌍을 키워드 순으로 정렬 후 키워드별로 분할
+        title_tokens = tokenize_titles(df['제목'], tokenizer=self.tokenizer, cache_dir=self.cache_dir)
+        pairs = pd.DataFrame({
+            '키워드': title_tokens.to_numpy(),
+            '행번호': np.arange(start_row, start_row + len(df))
+        }).explode('키워드').dropna().drop_duplicates()
+
+        if pairs.empty:
+            return
+
+        pairs = pairs.sort_values(['키워드', '행번호'])
+        tokens = pairs['키워드'].to_numpy()
+        row_ids = pairs['행번호'].to_numpy(dtype=np.int64)
+        boundaries = np.flatnonzero(tokens[1:] != tokens[:-1]) + 1
+
+        for token, token_rows in zip(tokens[np.r_[0, boundaries]], np.split(row_ids, boundaries)):
+            gaps = encode_row_ids(token_rows, self.last_row_ids.get(token, -1))
+            if token in self.postings:
+                self.postings[token] = np.concatenate([self.postings[token], gaps])
+            else:
+                self.postings[token] = gaps
+            self.last_row_ids[token] = token_rows[-1]
+
+            # 변경된 키워드의 조회 캐시 무효화
+            self.query_cache.pop(token, None)
+
+    def get_row_ids(self, token, category=None):
+        """
+        키워드가 포함된 영상의 행 번호를 반환합니다.
+
+        Parameters:
+        token (str): 키워드
+        category (str): 카테고리명 (None이면 전체)
+
+        Returns:
+        np.ndarray: 행 번호 (색인에 없는 카테고리면 빈 배열)
+        """
+        category_code = None if category is None else self.categories.get_indexer([category])[0]
+
+        # 색인에 없는 카테고리(-1)는 카테고리가 결측인 행(-1)과 섞이지 않도록 빈 결과
+        if token not in self.postings or (category_code is not None and category_code < 0):
+            return np.empty(0, dtype=np.int64)
+
+        row_ids = decode_row_ids(self.postings[token])
+
+        if category_code is not None:
+            row_ids = row_ids[self.category_codes[row_ids] == category_code]
+
+        return row_ids
+
+    def query(self, token, category=None):
+        """
+        키워드가 포함된 영상들의 성과 지표를 반환합니다.
+
+        Parameters:
+        token (str): 키워드
+        category (str): 카테고리명 (None이면 전체)
+
+        Returns:
+        dict: 영상 수, 평균/중앙 조회수, 평균 좋아요율(%)
+        """
+        token_cache = self.query_cache.setdefault(token, {})
+        if category in token_cache:
+            return token_cache[category]
+
+        row_ids = self.get_row_ids(token, category)
+
+        if len(row_ids) == 0:
+            result = {'count': 0, 'mean_views': np.nan, 'median_views': np.nan, 'like_rate': np.nan}
+        else:
+            views = self.views[row_ids]
+            result = {
+                'count': len(row_ids),
+                'mean_views': float(views.mean()),
+                'median_views': float(np.median(views)),
+                'like_rate': float(self.like_rates[row_ids].mean())
+            }
+
+        token_cache[category] = result
+        return result
+
+def build_keyword_index(df, tokenizer='simple', cache_dir="cache"):
+    """
+    데이터프레임으로부터 키워드 역색인을 생성합니다.
+
+    Parameters:
+    df (pd.DataFrame): 전체 데이터프레임
+    tokenizer (str or callable): 제목 토큰화 방식
+    cache_dir (str): 토큰 캐시 디렉토리
+
+    Returns:
+    KeywordIndex: 키워드 역색인
+    """
+    index = KeywordIndex(tokenizer=tokenizer, cache_dir=cache_dir)
+    index.append(df)
+    return index
@@ -0,0 +1,281 @@
+"""
+YouTube Channel Analysis - Korean Tokenizer
+제목 키워드 분석을 위한 한국어 토큰화 함수들을 포함합니다.
+형태소 분석기(konlpy)가 설치되어 있으면 명사 추출을 사용하고, 그렇지 않으면 조사를 제거하는 규칙 기반 토큰화를 사용합니다.
+"""
+
+import os
+import re
+import pickle
+import pandas as pd
+import numpy as np
+from data_preprocessing import clean_korean_text_series
+
+# 규칙 기반 토큰화에서 항상 제거할 조사 (긴 조사부터 검사)
+KOREAN_PARTICLES = sorted([
+    '에서부터', '으로부터', '에게서', '한테서', '로부터', '에서는', '에게는', '으로는',
+    '에서', '에게', '한테', '으로', '로서', '로써', '까지', '부터', '처럼', '보다',
+    '하고', '에는', '에도'
+], key=len, reverse=True)
+
+# 명사 끝 글자와 겹치기 쉬운 한 글자 조사 → 앞 음절 조건 (긴 조사부터 검사)
+# 받침 유무에 따라 모양이 바뀌는 조사는 맞는 모양일 때만 제거 (플레이: 받침 없는 '레' 뒤의 '이'는 조사가 아님)
+#   'batchim': 받침 있는 음절 뒤, 'vowel': 받침 없는 음절 뒤, 'vowel_or_rieul': 받침 없거나 ㄹ받침 뒤, 'any': 조건 없음
+AMBIGUOUS_PARTICLES = {
+    '이랑': 'batchim', '이나': 'batchim', '이며': 'batchim',
+    '과': 'batchim', '은': 'batchim', '이': 'batchim', '을': 'batchim',
+    '랑': 'vowel', '와': 'vowel', '는': 'vowel', '가': 'vowel', '를': 'vowel',
+    '로': 'vowel_or_rieul', '의': 'any', '에': 'any'
+}
+AMBIGUOUS_PARTICLE_ORDER = sorted(AMBIGUOUS_PARTICLES, key=len, reverse=True)
+
+# 조사 규칙에 맞지만 명사의 일부인 끝말 (예: 실험결과, 고양이, 떡볶이)
+NON_PARTICLE_ENDINGS = (
+    '결과', '효과', '성과', '학과', '고양이', '원숭이', '어린이', '놀이', '볶이', '먹이',
+    '길이', '높이', '깊이', '넓이', '걸이', '잡이', '둥이', '사랑', '주의', '강의',
+    '회의', '정의', '히어로', '제로', '도로', '미로'
+)
+
+# 한글 음절의 ㄹ받침 번호 (종성 순서 기준)
+RIEUL_FINAL = 8
+
+# 토큰화 규칙 버전 (조사 목록 등 규칙을 바꾸면 올려서 기존 디스크 캐시를 무효화)
+TOKENIZER_RULES_VERSION = 3
+
+# 형태소 분석기 이름 → konlpy 클래스명
+MORPH_ANALYZERS = {
+    'okt': 'Okt',
+    'komoran': 'Komoran',
+    'hannanum': 'Hannanum',
+    'kkma': 'Kkma',
+    'mecab': 'Mecab'
+}
+
+# 실행 중 재사용할 토큰 캐시 (캐시 파일 경로 또는 캐시 키 → {제목: 토큰 튜플})
+_TOKEN_CACHES = {}
+
+def _final_consonant(char):
+    """
+    한글 음절의 받침 번호를 반환합니다. (0이면 받침 없음, 한글 음절이 아니면 None)
+    """
+    code = ord(char) - 0xAC00
+    return code % 28 if 0 <= code < 11172 else None
+
+def _particle_fits(stem, condition):
+    """
+    어간의 마지막 음절이 조사의 앞 음절 조건에 맞는지 확인합니다.
+    """
+    final = _final_consonant(stem[-1])
+    if final is None:
+        return False
+    if condition == 'batchim':
+        return final != 0
+    if condition == 'vowel':
+        return final == 0
+    if condition == 'vowel_or_rieul':
+        return final in (0, RIEUL_FINAL)
+    return True
+
+def strip_korean_particle(word, min_stem_length=2):
+    """
+    단어 끝의 조사를 제거합니다.
+    한 글자 조사 등 모호한 조사(AMBIGUOUS_PARTICLES)는 앞 음절의 받침이 조사 모양과 맞고
+    명사의 일부로 알려진 끝말(NON_PARTICLE_ENDINGS)이 아닐 때만 제거하므로, 결과는 단어 자체로만 정해집니다.
+
+    Parameters:
+    word (str): 원본 단어
+    min_stem_length (int): 조사 제거 후 남아야 하는 최소 글자 수
+
+    Returns:
+    str: 조사가 제거된 단어
+    """
+    for particle in KOREAN_PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= min_stem_length:
+            return word[:-len(particle)]
+
+    if word.endswith(NON_PARTICLE_ENDINGS):
+        return word
+
+    for particle in AMBIGUOUS_PARTICLE_ORDER:
+        stem = word[:-len(particle)]
+        if (word.endswith(particle) and len(stem) >= min_stem_length and
+                _particle_fits(stem, AMBIGUOUS_PARTICLES[particle])):
+            return stem
+    return word
+
+def simple_tokenize(text, min_length=2):
+    """
+    공백 분리 후 조사를 제거하는 규칙 기반 토큰화를 수행합니다.
+
+    Parameters:
+    text (str): 한글 정제된 텍스트
+    min_length (int): 최소 단어 길이
+
+    Returns:
+    list: 토큰 리스트
+    """
+    tokens = [strip_korean_particle(word) for word in text.split()]
+    return [token for token in tokens if len(token) >= min_length]
+
+def get_morph_analyzer(name='okt', min_length=2):
+    """
+    konlpy 형태소 분석기 기반 명사 추출 함수를 반환합니다.
+
+    Parameters:
+    name (str): 형태소 분석기 이름 ('okt', 'komoran', 'hannanum', 'kkma', 'mecab')
+    min_length (int): 최소 명사 길이
+
+    Returns:
+    callable: 텍스트를 받아 명사 리스트를 반환하는 함수 (konlpy가 없으면 None)
+    """
+    try:
+        from konlpy import tag
+        analyzer = getattr(tag, MORPH_ANALYZERS[name.lower()])()
+    except ImportError:
+        print("konlpy가 설치되지 않았습니다. 규칙 기반 토큰화를 사용합니다.")
+        print("pip install konlpy 로 설치해주세요.")
+        return None
+    except Exception as e:
+        print(f"형태소 분석기 로딩 실패 ({name}): {e}")
+        return None
+
+    def extract_nouns(text):
+        return [noun for noun in analyzer.nouns(text) if len(noun) >= min_length]
+
+    extract_nouns.__name__ = name.lower()
+    extract_nouns.cache_key = f'{name.lower()}_min{min_length}'
+    return extract_nouns
+
+def get_tokenizer(tokenizer='simple'):
+    """
+    토큰화 함수와 캐시 키를 반환합니다.
+    사용자 정의 함수는 cache_key 속성이 있으면 그 값을, 이름 있는 함수는 '모듈.함수명'을 캐시 키로 사용하고,
+    람다처럼 이름으로 구분할 수 없는 함수는 캐시 키가 None(캐시 사용 안 함)입니다.
+
+    Parameters:
+    tokenizer (str or callable): 'simple', 'auto', 형태소 분석기 이름 또는 사용자 정의 함수
+                                 ('auto'는 konlpy가 있으면 'okt', 없으면 'simple')
+
+    Returns:
+    tuple: (토큰화 함수, 캐시 키 또는 None)
+    """
+    if callable(tokenizer):
+        cache_key = getattr(tokenizer, 'cache_key', None)
+        qualname = getattr(tokenizer, '__qualname__', None)
+        if cache_key is None and qualname and '<' not in qualname:
+            cache_key = f'{tokenizer.__module__}.{qualname}'
+        return tokenizer, cache_key
+
+    name = tokenizer.lower()
+    if name == 'simple':
+        return simple_tokenize, 'simple'
+
+    analyzer = get_morph_analyzer('okt' if name == 'auto' else name)
+    if analyzer is None:
+        return simple_tokenize, 'simple'
+
+    return analyzer, analyzer.cache_key
+
+def get_token_cache_path(cache_dir, cache_key):
+    """
+    캐시 키와 규칙 버전으로 토큰 캐시 파일 경로를 만듭니다. (파일명에 쓸 수 없는 문자는 '_'로 치환)
+
+    Parameters:
+    cache_dir (str): 캐시 디렉토리
+    cache_key (str): get_tokenizer가 반환한 캐시 키
+
+    Returns:
+    str: 캐시 파일 경로
+    """
+    safe_key = re.sub(r'[^\w.-]+', '_', cache_key)
+    return os.path.join(cache_dir, f'tokens_{safe_key}_v{TOKENIZER_RULES_VERSION}.pkl')
+
+def load_token_cache(cache_path):
+    """
+    디스크에 저장된 토큰 캐시를 로드합니다.
+
+    Parameters:
+    cache_path (str): 캐시 파일 경로
+
+    Returns:
+    dict: {제목: 토큰 튜플}
+    """
+    if cache_path in _TOKEN_CACHES:
+        return _TOKEN_CACHES[cache_path]
+
+    cache = {}
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cache = pickle.load(f)
+        except Exception as e:
+            print(f"토큰 캐시 로딩 실패: {e}")
+            cache = {}
+
+    _TOKEN_CACHES[cache_path] = cache
+    return cache
+
+def save_token_cache(cache, cache_path):
+    """
+    토큰 캐시를 디스크에 저장합니다.
+
+    Parameters:
+    cache (dict): {제목: 토큰 튜플}
+    cache_path (str): 캐시 파일 경로
+    """
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+
+    # 저장 중 중단되어도 기존 캐시가 깨지지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f'{cache_path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+
+def tokenize_titles(titles, tokenizer='simple', cache_dir="cache", use_cache=True):
+    """
+    제목 컬럼을 토큰화합니다.
+    고유 제목 단위로 한 번만 토큰화하며, 결과는 토큰화 방식별 디스크 캐시에 저장되어
+    다음 실행에서는 새로 추가된 제목만 토큰화합니다.
+
+    Parameters:
+    titles (pd.Series): 제목 컬럼
+    tokenizer (str or callable): 토큰화 방식 (get_tokenizer 참고)
+    cache_dir (str): 캐시 디렉토리 (None이면 메모리 캐시만 사용)
+    use_cache (bool): False이거나 캐시 키가 없는 토큰화 함수면 캐시 없이 이번 호출에서만 토큰화
+
+    Returns:
+    pd.Series: 제목별 토큰 튜플 (원본 인덱스 유지, 결측값은 빈 튜플)
+    """
+    titles = pd.Series(titles)
+    tokenize, cache_key = get_tokenizer(tokenizer)
+
+    cache_path = None
+    if not use_cache or cache_key is None:
+        cache = {}
+    elif cache_dir:
+        cache_path = get_token_cache_path(cache_dir, cache_key)
+        cache = load_token_cache(cache_path)
+    else:
+        cache = _TOKEN_CACHES.setdefault(f'{cache_key}_v{TOKENIZER_RULES_VERSION}', {})
+
+    # 고유 제목 중 캐시에 없는 것만 토큰화
+    codes, uniques = pd.factorize(titles)
+    uniques = pd.Series(uniques, dtype=object).astype(str)
+    missing = uniques[[title not in cache for title in uniques]]
+
+    if len(missing) > 0:
+        cleaned = clean_korean_text_series(missing)
+        for title, text in zip(missing, cleaned):
+            cache[title] = tuple(tokenize(text))
+
+        if cache_path:
+            save_token_cache(cache, cache_path)
+
+    # 마지막 자리에 결측값용 빈 튜플을 두고 코드로 한 번에 펼치기
+    token_lists = np.empty(len(uniques) + 1, dtype=object)
+    for i, title in enumerate(uniques):
+        token_lists[i] = cache[title]
+    token_lists[-1] = ()
+    codes = np.where(codes < 0, len(uniques), codes)
+
+    return pd.Series(token_lists[codes], index=titles.index, dtype=object)
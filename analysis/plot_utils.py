@@ -0,0 +1,85 @@
+"""
+YouTube Channel Analysis - Plot Utilities
+대용량 산점도를 위한 밀도 집계 시각화 함수를 포함합니다.
+점 개수가 임계값을 넘으면 NumPy로 2차원 히스토그램을 미리 집계하여 이미지(또는 hexbin)로 그리므로
+렌더링 시간이 영상 수와 무관합니다.
+"""
+
+import numpy as np
+from matplotlib.colors import LinearSegmentedColormap, LogNorm, to_rgba
+
+# 이 개수를 넘으면 개별 점 대신 밀도 이미지로 그림
+DENSITY_SCATTER_THRESHOLD = 20000
+
+def _bin_edges(values, bins, log_scale):
+    """
+    축 범위를 bins개 구간으로 나눈 경계를 반환합니다. (로그 축이면 로그 간격)
+    """
+    low, high = values.min(), values.max()
+    if low == high:
+        low, high = (low / 2, low * 2) if log_scale else (low - 0.5, high + 0.5)
+
+    if log_scale:
+        return np.logspace(np.log10(low), np.log10(high), bins + 1)
+    return np.linspace(low, high, bins + 1)
+
+def density_scatter(ax, x, y, color='blue', alpha=0.6, s=None, label=None, threshold=DENSITY_SCATTER_THRESHOLD,
+                    bins=200, log_x=False, log_y=False, mode='image'):
+    """
+    점 개수에 따라 일반 산점도 또는 밀도 집계 산점도를 그립니다.
+
+    Parameters:
+    ax (matplotlib.axes.Axes): 그릴 축
+    x (array-like): X 값
+    y (array-like): Y 값
+    color (str): 점 색상 (밀도 모드에서는 흰색 → 이 색상의 컬러맵)
+    alpha (float): 투명도
+    s (float): 점 크기 (산점도 모드에서만 사용)
+    label (str): 범례 라벨
+    threshold (int): 밀도 모드로 전환할 점 개수 (None이면 항상 산점도)
+    bins (int): 축별 구간 수 (hexbin 모드에서는 격자 크기)
+    log_x (bool): X축 로그 스케일 사용 여부 (0 이하 값 제외)
+    log_y (bool): Y축 로그 스케일 사용 여부 (0 이하 값 제외)
+    mode (str): 밀도 모드 렌더링 방식 ('image' 또는 'hexbin')
+
+    Returns:
+    matplotlib.artist.Artist: 그려진 객체
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # 결측값과 로그 축의 0 이하 값 제외
+    valid = np.isfinite(x) & np.isfinite(y)
+    if log_x:
+        valid &= x > 0
+    if log_y:
+        valid &= y > 0
+    x, y = x[valid], y[valid]
+
+    if log_x:
+        ax.set_xscale('log')
+    if log_y:
+        ax.set_yscale('log')
+
+    if threshold is None or len(x) <= threshold:
+        return ax.scatter(x, y, alpha=alpha, color=color, s=s, label=label)
+
+    cmap = LinearSegmentedColormap.from_list(f'density_{color}', [to_rgba(color, 0.15), to_rgba(color, 1.0)])
+
+    if mode == 'hexbin':
+        artist = ax.hexbin(x, y, gridsize=bins, cmap=cmap, bins='log', mincnt=1, alpha=alpha,
+                           xscale='log' if log_x else 'linear', yscale='log' if log_y else 'linear')
+    else:
+        # 2차원 히스토그램을 미리 집계한 뒤 빈 칸은 투명하게 표시
+        x_edges = _bin_edges(x, bins, log_x)
+        y_edges = _bin_edges(y, bins, log_y)
+        counts, _, _ = np.histogram2d(x, y, bins=[x_edges, y_edges])
+        counts = np.ma.masked_equal(counts.T, 0)
+        artist = ax.pcolormesh(x_edges, y_edges, counts, cmap=cmap, alpha=alpha,
+                               norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)))
+
+    # 밀도 이미지는 범례에 나타나지 않으므로 같은 색의 빈 산점도로 범례 항목 추가
+    if label is not None:
+        ax.scatter([], [], color=color, label=label)
+
+    return artist
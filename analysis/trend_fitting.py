@@ -0,0 +1,195 @@
+"""
+YouTube Channel Analysis - Trend Fitting
+산점도 추세선을 위한 직선 적합 함수를 포함합니다.
+조회수처럼 꼬리가 두꺼운 값에서 바이럴 영상 하나가 추세를 좌우하지 않도록
+로그 공간 OLS, Huber, 무작위 쌍 Theil-Sen 추정을 제공하며 모두 NumPy 벡터 연산으로 계산합니다.
+"""
+
+import numpy as np
+from scipy import stats
+
+TREND_METHODS = ('ols', 'huber', 'theil_sen')
+
+def _prepare(x, y, log_x, log_y):
+    """
+    결측값을 제외하고 로그 공간 변환(log1p)을 적용합니다.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.isfinite(x) & np.isfinite(y)
+    if log_x:
+        valid &= x > -1
+    if log_y:
+        valid &= y > -1
+    x, y = x[valid], y[valid]
+
+    return (np.log1p(x) if log_x else x), (np.log1p(y) if log_y else y)
+
+def _fit_ols(x, y, confidence, weights=None):
+    """
+    (가중) 최소제곱 직선과 기울기 신뢰구간을 계산합니다.
+    """
+    weights = np.ones_like(x) if weights is None else weights
+    total_weight = weights.sum()
+    x_mean = weights @ x / total_weight
+    y_mean = weights @ y / total_weight
+    dx, dy = x - x_mean, y - y_mean
+
+    sxx = weights @ (dx * dx)
+    slope = (weights @ (dx * dy)) / sxx
+    intercept = y_mean - slope * x_mean
+
+    # 기울기 표준오차 → t 분포 신뢰구간
+    residuals = dy - slope * dx
+    dof = max(len(x) - 2, 1)
+    slope_se = np.sqrt((weights @ (residuals * residuals)) / dof / sxx)
+    margin = stats.t.ppf((1 + confidence) / 2, dof) * slope_se
+
+    return slope, intercept, slope - margin, slope + margin
+
+def _fit_huber(x, y, confidence, epsilon=1.345, max_iter=50, tol=1e-4):
+    """
+    Huber 손실 직선을 반복 재가중 최소제곱(IRLS)으로 계산합니다.
+    Theil-Sen 직선에서 시작하고, 잔차 척도는 시작 잔차의 MAD로 한 번 추정하여 고정합니다.
+    (기울기 상대 변화가 tol 이하가 되면 종료, 추세선 용도에는 1e-4로 충분)
+    """
+    slope, intercept, _, _ = _fit_theil_sen(x, y, confidence)
+    residuals = y - (slope * x + intercept)
+    scale = 1.4826 * np.median(np.abs(residuals - np.median(residuals)))
+    weights = np.ones_like(x)
+
+    for _ in range(max_iter if scale > 0 else 0):
+        # |잔차| ≤ ε·척도는 가중치 1, 그 밖은 ε·척도/|잔차|
+        abs_residuals = np.abs(y - (slope * x + intercept)) / scale
+        weights = np.minimum(1.0, epsilon / np.maximum(abs_residuals, 1e-12))
+
+        new_slope, new_intercept, _, _ = _fit_ols(x, y, confidence, weights)
+        converged = abs(new_slope - slope) <= tol * max(1.0, abs(slope))
+        slope, intercept = new_slope, new_intercept
+        if converged:
+            break
+
+    _, _, lower, upper = _fit_ols(x, y, confidence, weights)
+    return slope, intercept, lower, upper
+
+def _fit_theil_sen(x, y, confidence, max_pairs=200000, seed=42):
+    """
+    Theil-Sen 직선을 계산합니다.
+    점 쌍이 max_pairs보다 많으면 무작위로 뽑은 max_pairs개 쌍의 기울기 중앙값을 사용합니다.
+    신뢰구간은 Sen의 순위 기반 구간을 쌍 기울기 분위수로 계산합니다.
+    """
+    n = len(x)
+    n_all_pairs = n * (n - 1) // 2
+
+    if n_all_pairs <= max_pairs:
+        i, j = np.triu_indices(n, k=1)
+    else:
+        rng = np.random.default_rng(seed)
+        i = rng.integers(0, n, max_pairs)
+        j = rng.integers(0, n, max_pairs)
+
+    dx = x[j] - x[i]
+    keep = dx != 0
+    slopes = (y[j] - y[i])[keep] / dx[keep]
+
+    if len(slopes) == 0:
+        return np.nan, np.nan, np.nan, np.nan
+
+    slope = np.median(slopes)
+    intercept = np.median(y - slope * x)
+
+    # Sen 구간: 전체 쌍 수 N에서 순위 (N ∓ C)/2, C = z·√(n(n-1)(2n+5)/18)
+    z = stats.norm.ppf((1 + confidence) / 2)
+    c = z * np.sqrt(n * (n - 1) * (2 * n + 5) / 18)
+    lower_q = np.clip((n_all_pairs - c) / (2 * n_all_pairs), 0, 1)
+    upper_q = np.clip((n_all_pairs + c) / (2 * n_all_pairs), 0, 1)
+    lower, upper = np.quantile(slopes, [lower_q, upper_q])
+
+    return slope, intercept, lower, upper
+
+def fit_trend(x, y, method='theil_sen', log_x=False, log_y=False, confidence=0.95, max_pairs=200000, seed=42):
+    """
+    추세선(직선)을 적합합니다.
+
+    Parameters:
+    x (array-like): X 값
+    y (array-like): Y 값
+    method (str): 'ols', 'huber', 'theil_sen'
+    log_x (bool): X를 log1p 공간에서 적합할지 여부
+    log_y (bool): Y를 log1p 공간에서 적합할지 여부
+    confidence (float): 기울기 신뢰구간 수준
+    max_pairs (int): Theil-Sen에서 사용할 최대 점 쌍 수
+    seed (int): Theil-Sen 쌍 추출 난수 시드
+
+    Returns:
+    dict: slope, intercept, slope_lower, slope_upper, method, n, log_x, log_y (점이 2개 미만이면 빈 dict)
+    """
+    if method not in TREND_METHODS:
+        raise ValueError(f"Unknown trend method: {method} (choose from {TREND_METHODS})")
+
+    x, y = _prepare(x, y, log_x, log_y)
+    if len(x) < 2 or np.ptp(x) == 0:
+        return {}
+
+    if method == 'ols':
+        slope, intercept, lower, upper = _fit_ols(x, y, confidence)
+    elif method == 'huber':
+        slope, intercept, lower, upper = _fit_huber(x, y, confidence)
+    else:
+        slope, intercept, lower, upper = _fit_theil_sen(x, y, confidence, max_pairs, seed)
+
+    return {
+        'slope': float(slope),
+        'intercept': float(intercept),
+        'slope_lower': float(lower),
+        'slope_upper': float(upper),
+        'method': method,
+        'n': len(x),
+        'log_x': log_x,
+        'log_y': log_y
+    }
+
+def predict_trend(trend, x):
+    """
+    적합한 추세선의 예측값을 원래 척도로 반환합니다.
+
+    Parameters:
+    trend (dict): fit_trend 결과
+    x (array-like): X 값
+
+    Returns:
+    np.ndarray: 예측 Y 값
+    """
+    x = np.asarray(x, dtype=np.float64)
+    fitted = trend['intercept'] + trend['slope'] * (np.log1p(x) if trend['log_x'] else x)
+    return np.expm1(fitted) if trend['log_y'] else fitted
+
+def plot_trend(ax, x, y, method='theil_sen', log_x=False, log_y=False, n_points=100, style="r--", alpha=0.8, **kwargs):
+    """
+    추세선을 적합하여 X 범위 위에 n_points개 점으로 그립니다. (그리는 비용은 데이터 크기와 무관)
+
+    Parameters:
+    ax (matplotlib.axes.Axes): 그릴 축
+    x (array-like): X 값
+    y (array-like): Y 값
+    method (str): 'ols', 'huber', 'theil_sen'
+    log_x (bool): X를 log1p 공간에서 적합할지 여부
+    log_y (bool): Y를 log1p 공간에서 적합할지 여부
+    n_points (int): 추세선 점 개수
+    style (str): 선 스타일
+    alpha (float): 투명도
+    **kwargs: fit_trend 추가 인자
+
+    Returns:
+    dict: fit_trend 결과
+    """
+    trend = fit_trend(x, y, method=method, log_x=log_x, log_y=log_y, **kwargs)
+    if not trend:
+        return trend
+
+    x = np.asarray(x, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    line_x = np.linspace(x.min(), x.max(), n_points)
+    ax.plot(line_x, predict_trend(trend, line_x), style, alpha=alpha)
+
+    return trend
@@ -0,0 +1,583 @@
+"""
+YouTube Channel Analysis - Upload Timing Cube
+채널 × 요일 × 시간대 조회수 합계/영상 수 큐브를 한 번에 생성하고,
+카테고리·채널별 요일/시간대 평균, 히트맵, 최적 업로드 시간을 큐브 슬라이스로 계산합니다.
+"""
+
+import pandas as pd
+import numpy as np
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+
+# 게시일 컬럼의 기본 시간대 (한국 표준시, UTC+9)
+DATA_UTC_OFFSET = 9
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+HOURS = list(range(24))
+
+# 부트스트랩 슬롯 종류별 (칸 수, 라벨)
+SLOT_TYPES = {
+    'day': (7, DAY_ORDER),
+    'hour': (24, HOURS),
+    'day_hour': (7 * 24, [f'{day} {hour}시' for day in DAY_ORDER for hour in HOURS])
+}
+
+class TimingCube:
+    """
+    그룹 × 요일(7) × 시간대(24) 조회수 합계 및 영상 수 큐브입니다.
+    그룹은 (카테고리, 채널명) MultiIndex이며 aggregate로 카테고리 단위 큐브를 만들 수 있습니다.
+    utc_offset은 요일/시간대 칸이 기준으로 하는 시간대이며, to_timezone으로 재집계 없이 바꿀 수 있습니다.
+    """
+
+    def __init__(self, groups, sums, counts, utc_offset=DATA_UTC_OFFSET):
+        self.groups = groups
+        self.sums = sums
+        self.counts = counts
+        self.utc_offset = utc_offset
+
+    def __len__(self):
+        return len(self.groups)
+
+    def select(self, level, value):
+        """
+        특정 레벨 값(예: 카테고리)에 해당하는 그룹만 잘라낸 큐브를 반환합니다.
+
+        Parameters:
+        level (str): 그룹 레벨명 ('카테고리', '채널명')
+        value: 선택할 값
+
+        Returns:
+        TimingCube: 부분 큐브
+        """
+        mask = self.groups.get_level_values(level) == value
+        return TimingCube(self.groups[mask], self.sums[mask], self.counts[mask], self.utc_offset)
+
+    def aggregate(self, level):
+        """
+        그룹 레벨 단위로 합산한 큐브를 반환합니다.
+
+        Parameters:
+        level (str): 합산 기준 레벨명 (예: '카테고리')
+
+        Returns:
+        TimingCube: 합산된 큐브
+        """
+        codes, uniques = pd.factorize(self.groups.get_level_values(level))
+
+        sums = pd.DataFrame(self.sums.reshape(len(self), -1)).groupby(codes).sum().to_numpy()
+        counts = pd.DataFrame(self.counts.reshape(len(self), -1)).groupby(codes).sum().to_numpy()
+
+        return TimingCube(pd.Index(uniques, name=level),
+                          sums.reshape(len(uniques), 7, 24), counts.reshape(len(uniques), 7, 24), self.utc_offset)
+
+    def to_timezone(self, timezone):
+        """
+        요일 × 시간대 칸을 다른 시간대 기준으로 회전한 큐브를 반환합니다.
+        주간 168개 시간 칸을 시간차만큼 순환 이동하므로 원본 데이터를 다시 집계하지 않습니다.
+
+        Parameters:
+        timezone (int or str): 대상 UTC 오프셋(시간) 또는 시간대 이름 (예: -5, 'America/New_York')
+
+        Returns:
+        TimingCube: 대상 시간대 기준 큐브
+        """
+        target_offset = get_utc_offset(timezone)
+        shift = target_offset - self.utc_offset
+
+        sums = np.roll(self.sums.reshape(len(self), -1), shift, axis=1).reshape(self.sums.shape)
+        counts = np.roll(self.counts.reshape(len(self), -1), shift, axis=1).reshape(self.counts.shape)
+
+        return TimingCube(self.groups, sums, counts, target_offset)
+
+    def total(self):
+        """
+        모든 그룹을 합산한 (7 × 24) 조회수 합계와 영상 수를 반환합니다.
+
+        Returns:
+        tuple: (합계 배열, 영상 수 배열)
+        """
+        return self.sums.sum(axis=0), self.counts.sum(axis=0)
+
+    def day_means(self):
+        """
+        그룹별 요일 평균 조회수를 반환합니다.
+
+        Returns:
+        pd.DataFrame: 그룹 × 요일 평균 조회수 (영상이 없으면 NaN)
+        """
+        return _safe_mean(self.sums.sum(axis=2), self.counts.sum(axis=2), self.groups, DAY_ORDER)
+
+    def hour_means(self):
+        """
+        그룹별 시간대 평균 조회수를 반환합니다.
+
+        Returns:
+        pd.DataFrame: 그룹 × 시간대 평균 조회수 (영상이 없으면 NaN)
+        """
+        return _safe_mean(self.sums.sum(axis=1), self.counts.sum(axis=1), self.groups, HOURS)
+
+    def heatmap(self, group=None):
+        """
+        요일 × 시간대 평균 조회수 히트맵 데이터를 반환합니다.
+
+        Parameters:
+        group: 그룹 키 (None이면 전체 합산)
+
+        Returns:
+        pd.DataFrame: 요일 × 시간대 평균 조회수
+        """
+        if group is None:
+            sums, counts = self.total()
+        else:
+            position = self.groups.get_loc(group)
+            sums, counts = self.sums[position], self.counts[position]
+
+        return _safe_mean(sums, counts, DAY_ORDER, HOURS)
+
+    def best_slots(self):
+        """
+        그룹별 평균 조회수가 가장 높은 요일 × 시간대 칸을 반환합니다.
+
+        Returns:
+        pd.DataFrame: 그룹별 최적 요일, 최적 시간대, 평균 조회수, 영상 수
+        """
+        flat_sums = self.sums.reshape(len(self), -1)
+        flat_counts = self.counts.reshape(len(self), -1)
+        means = np.divide(flat_sums, flat_counts, out=np.full(flat_sums.shape, -np.inf), where=flat_counts > 0)
+
+        best = means.argmax(axis=1)
+        rows = np.arange(len(self))
+
+        return pd.DataFrame({
+            '최적요일': np.array(DAY_ORDER)[best // 24],
+            '최적시간대': best % 24,
+            '평균조회수': means[rows, best],
+            '영상수': flat_counts[rows, best]
+        }, index=self.groups)
+
+def _mean_array(sums, counts, min_videos=1):
+    """
+    영상 수가 min_videos 미만인 칸은 NaN으로 두고 평균을 계산합니다.
+    """
+    return np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts >= max(min_videos, 1))
+
+def get_utc_offset(timezone):
+    """
+    시간대를 정수 UTC 오프셋(시간)으로 변환합니다.
+    시간대 이름은 현재 시점의 오프셋(서머타임 반영)을 사용합니다.
+
+    Parameters:
+    timezone (int or str): UTC 오프셋(시간) 또는 시간대 이름
+
+    Returns:
+    int: UTC 오프셋 (시간)
+    """
+    if isinstance(timezone, str):
+        offset_hours = pd.Timestamp.now(tz=timezone).utcoffset().total_seconds() / 3600
+    else:
+        offset_hours = float(timezone)
+
+    if not offset_hours.is_integer():
+        raise ValueError(f"Timezone offset must be a whole number of hours: {timezone} ({offset_hours})")
+
+    return int(offset_hours)
+
+def _safe_mean(sums, counts, index, columns):
+    """
+    영상 수가 0인 칸은 NaN으로 두고 평균 DataFrame을 만듭니다.
+    """
+    return pd.DataFrame(_mean_array(sums, counts), index=index, columns=columns)
+
+def build_timing_cube(df, value_col='조회수', utc_offset=DATA_UTC_OFFSET):
+    """
+    데이터 전체를 한 번 순회하여 (카테고리, 채널) × 요일 × 시간대 큐브를 생성합니다.
+
+    Parameters:
+    df (pd.DataFrame): 전처리된 데이터프레임 (카테고리, 채널명, 게시일 컬럼 필요)
+    value_col (str): 합산할 값 컬럼
+    utc_offset (int): 게시일이 시간대 정보 없이 저장된 경우의 UTC 오프셋 (기본값: KST)
+
+    Returns:
+    TimingCube: 타이밍 큐브 (게시일 시간대 기준, 시간대 정보가 있으면 UTC 기준,
+                게시일·카테고리·채널명이 결측인 영상은 제외)
+    """
+    # 결측 그룹 키는 factorize 코드 -1이 되어 잘못된 칸에 더해지므로 미리 제외
+    valid = df['게시일'].notna() & df['카테고리'].notna() & df['채널명'].notna()
+    valid_df = df.loc[valid]
+
+    # 시간대 정보가 있는 게시일은 UTC로 변환하여 집계
+    dates = valid_df['게시일']
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert('UTC')
+        utc_offset = 0
+
+    # 그룹/요일/시간대를 하나의 정수 코드로 합친 뒤 bincount로 합산
+    category_codes, categories = pd.factorize(valid_df['카테고리'])
+    channel_codes, channels = pd.factorize(valid_df['채널명'])
+    group_codes, pair_codes = pd.factorize(category_codes.astype(np.int64) * len(channels) + channel_codes)
+    groups = pd.MultiIndex.from_arrays(
+        [categories[pair_codes // len(channels)], channels[pair_codes % len(channels)]], names=['카테고리', '채널명']
+    )
+    days = dates.dt.dayofweek.to_numpy()
+    hours = dates.dt.hour.to_numpy()
+    bins = (group_codes * 7 + days) * 24 + hours
+
+    n_bins = len(groups) * 7 * 24
+    values = valid_df[value_col].to_numpy(dtype=np.float64)
+    sums = np.bincount(bins, weights=values, minlength=n_bins).reshape(len(groups), 7, 24)
+    counts = np.bincount(bins, minlength=n_bins).astype(np.float64).reshape(len(groups), 7, 24)
+
+    return TimingCube(groups, sums, counts, utc_offset)
+
+def _top_two(means, labels):
+    """
+    행별 최댓값과 차순위 값의 라벨 및 차이를 계산합니다. (NaN 칸 제외)
+    """
+    filled = np.where(np.isnan(means), -np.inf, means)
+    order = np.argsort(filled, axis=1)
+    rows = np.arange(len(filled))
+
+    best = order[:, -1]
+    best_values = filled[rows, best]
+    runner_up_values = filled[rows, order[:, -2]] if filled.shape[1] > 1 else np.full(len(filled), -np.inf)
+
+    # 차순위 칸이 비어 있으면 마진을 계산할 수 없음
+    has_runner_up = np.isfinite(runner_up_values)
+    margins = np.where(has_runner_up, best_values - runner_up_values, np.nan)
+    margin_ratios = np.divide(margins, runner_up_values, out=np.full(len(filled), np.nan),
+                              where=has_runner_up & (runner_up_values > 0))
+
+    best_labels = np.asarray(labels, dtype=object)[best]
+    best_labels[~np.isfinite(best_values)] = None
+
+    return best_labels, margins, margin_ratios
+
+def get_channel_best_timing(data, min_videos=1):
+    """
+    모든 채널의 최적 업로드 요일/시간대와 차순위 대비 마진을 한 번에 계산합니다.
+
+    Parameters:
+    data (pd.DataFrame or TimingCube): 전처리된 데이터프레임 또는 타이밍 큐브
+    min_videos (int): 요일/시간대 평균에 포함할 최소 영상 수 (미만인 칸은 제외)
+
+    Returns:
+    pd.DataFrame: (카테고리, 채널명)별 최적요일, 요일마진, 요일마진비율, 최적시간대, 시간대마진, 시간대마진비율
+    """
+    cube = data if isinstance(data, TimingCube) else build_timing_cube(data)
+
+    day_means = _mean_array(cube.sums.sum(axis=2), cube.counts.sum(axis=2), min_videos)
+    hour_means = _mean_array(cube.sums.sum(axis=1), cube.counts.sum(axis=1), min_videos)
+
+    best_days, day_margins, day_margin_ratios = _top_two(day_means, DAY_ORDER)
+    best_hours, hour_margins, hour_margin_ratios = _top_two(hour_means, HOURS)
+
+    return pd.DataFrame({
+        '최적요일': best_days,
+        '요일마진': day_margins,
+        '요일마진비율': day_margin_ratios,
+        '최적시간대': best_hours,
+        '시간대마진': hour_margins,
+        '시간대마진비율': hour_margin_ratios
+    }, index=cube.groups)
+
+def _shift_to_timezone(dates, timezone, utc_offset=DATA_UTC_OFFSET):
+    """
+    게시일을 대상 시간대의 벽시계 시각으로 옮깁니다. (시간대 정보가 있으면 UTC 기준으로 처리)
+    """
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+        utc_offset = 0
+    return dates + pd.Timedelta(hours=get_utc_offset(timezone) - utc_offset)
+
+def _slot_codes(dates, slot):
+    """
+    게시일을 부트스트랩 슬롯 코드로 변환합니다.
+    """
+    if slot == 'day':
+        return dates.dt.dayofweek.to_numpy()
+    if slot == 'hour':
+        return dates.dt.hour.to_numpy()
+    return (dates.dt.dayofweek * 24 + dates.dt.hour).to_numpy()
+
+def _bootstrap_chunk(args):
+    """
+    그룹 묶음 하나에 대해 Poisson 가중치 부트스트랩을 행렬 연산으로 수행합니다.
+    (프로세스 풀에서 실행할 수 있도록 모듈 최상위 함수로 정의)
+    """
+    group_codes, slots, values, n_groups, n_slots, n_boot, alpha, seed = args
+    rng = np.random.default_rng(seed)
+    n_rows = len(values)
+
+    # 영상 → (그룹, 슬롯) 칸 지시 행렬 (n_rows × n_groups*n_slots)
+    indicator = sparse.csr_matrix(
+        (np.ones(n_rows), (np.arange(n_rows), group_codes * n_slots + slots)),
+        shape=(n_rows, n_groups * n_slots)
+    )
+
+    # 부트스트랩 표본마다 영상별 Poisson(1) 가중치 → 칸별 가중 합계/가중 영상 수
+    weights = rng.poisson(1.0, size=(n_boot, n_rows)).astype(np.float64)
+    sums = np.asarray((indicator.T @ (weights * values).T).T).reshape(n_boot, n_groups, n_slots)
+    counts = np.asarray((indicator.T @ weights.T).T).reshape(n_boot, n_groups, n_slots)
+    means = np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+
+    # 표본별 최적 슬롯 → 슬롯이 최적일 확률
+    best = np.where(np.isnan(means), -np.inf, means).argmax(axis=2)
+    best_probability = (best[:, :, None] == np.arange(n_slots)).mean(axis=0)
+
+    # 칸별 신뢰구간 (비어 있는 표본 제외, 영상이 없는 칸은 NaN)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        lower, upper = np.nanpercentile(means, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+
+    return lower, upper, best_probability
+
+def bootstrap_best_slots(df, group_cols=('카테고리', '채널명'), slot='hour', n_boot=500, confidence=0.95,
+                         seed=42, n_jobs=1, max_cells_per_chunk=10000, timezone=None):
+    """
+    요일/시간대별 평균 조회수의 부트스트랩 신뢰구간과 각 슬롯이 최적일 확률을 계산합니다.
+    영상별 Poisson(1) 가중치로 재표본을 만들고, 그룹 묶음마다 희소 행렬 곱으로 모든 표본을 한 번에 집계합니다.
+
+    Parameters:
+    df (pd.DataFrame): 전처리된 데이터프레임
+    group_cols (tuple): 그룹 기준 컬럼 (예: ('카테고리',) 또는 ('카테고리', '채널명'))
+    slot (str): 'day', 'hour', 'day_hour'
+    n_boot (int): 부트스트랩 표본 수
+    confidence (float): 신뢰수준
+    seed (int): 난수 시드 (n_jobs와 무관하게 같은 결과)
+    n_jobs (int): 프로세스 수 (1이면 현재 프로세스에서 실행)
+    max_cells_per_chunk (int): 한 묶음의 최대 (영상 수 + 그룹 수 × 슬롯 수) (그룹은 나누지 않음,
+                               가중치 n_boot × 영상 수와 칸별 배열 n_boot × 그룹 수 × 슬롯 수를 합쳐 메모리 ≈ n_boot × 이 값)
+    timezone (int or str): 슬롯을 나눌 시간대 (UTC 오프셋 또는 시간대 이름, None이면 게시일 그대로)
+
+    Returns:
+    pd.DataFrame: 그룹 × 슬롯별 평균조회수, 하한, 상한, 최적확률, 영상수 (그룹 키가 결측인 영상은 제외)
+    """
+    n_slots, slot_labels = SLOT_TYPES[slot]
+    group_cols = list(group_cols)
+    valid_df = df[df['게시일'].notna() & df[group_cols].notna().all(axis=1)]
+
+    group_codes, groups = pd.factorize(pd.MultiIndex.from_frame(valid_df[group_cols]))
+    dates = valid_df['게시일'] if timezone is None else _shift_to_timezone(valid_df['게시일'], timezone)
+    slots = _slot_codes(dates, slot)
+    values = valid_df['조회수'].to_numpy(dtype=np.float64)
+
+    # 그룹 순으로 정렬 후 (영상 수 + 슬롯 수) 기준으로 그룹 묶음 나누기
+    # (영상이 적은 그룹이 많아도 칸별 밀집 배열 n_boot × 그룹 수 × 슬롯 수가 제한되도록)
+    order = np.argsort(group_codes, kind='stable')
+    group_codes, slots, values = group_codes[order], slots[order], values[order]
+    group_sizes = np.bincount(group_codes, minlength=len(groups))
+    group_chunks = np.cumsum(group_sizes + n_slots) // max_cells_per_chunk
+    group_chunks = np.r_[0, group_chunks[:-1]] if len(groups) else group_chunks
+    row_chunks = group_chunks[group_codes]
+
+    seeds = np.random.SeedSequence(seed).spawn(int(group_chunks.max()) + 1 if len(groups) else 0)
+    tasks = []
+    for chunk_id, chunk_seed in enumerate(seeds):
+        rows = np.flatnonzero(row_chunks == chunk_id)
+        chunk_groups = np.flatnonzero(group_chunks == chunk_id)
+        if len(chunk_groups) == 0:
+            continue
+        tasks.append((chunk_groups, (group_codes[rows] - chunk_groups[0], slots[rows], values[rows],
+                                     len(chunk_groups), n_slots, n_boot, 1 - confidence, chunk_seed)))
+
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            chunk_results = list(executor.map(_bootstrap_chunk, [task for _, task in tasks]))
+    else:
+        chunk_results = [_bootstrap_chunk(task) for _, task in tasks]
+
+    lower = np.full((len(groups), n_slots), np.nan)
+    upper = np.full((len(groups), n_slots), np.nan)
+    best_probability = np.zeros((len(groups), n_slots))
+    for (chunk_groups, _), (chunk_lower, chunk_upper, chunk_probability) in zip(tasks, chunk_results):
+        lower[chunk_groups] = chunk_lower
+        upper[chunk_groups] = chunk_upper
+        best_probability[chunk_groups] = chunk_probability
+
+    # 원본 데이터 기준 점추정
+    cells = group_codes * n_slots + slots
+    sums = np.bincount(cells, weights=values, minlength=len(groups) * n_slots).reshape(len(groups), n_slots)
+    counts = np.bincount(cells, minlength=len(groups) * n_slots).reshape(len(groups), n_slots)
+
+    # 그룹 × 슬롯 인덱스를 튜플 없이 레벨 코드 배열로 구성
+    group_positions = np.repeat(np.arange(len(groups)), n_slots)
+    index = pd.MultiIndex(
+        levels=list(groups.levels) + [pd.Index(slot_labels)],
+        codes=[level_codes[group_positions] for level_codes in groups.codes] + [np.tile(np.arange(n_slots), len(groups))],
+        names=group_cols + ['슬롯']
+    )
+    return pd.DataFrame({
+        '평균조회수': _mean_array(sums, counts).ravel(),
+        '하한': lower.ravel(),
+        '상한': upper.ravel(),
+        '최적확률': best_probability.ravel(),
+        '영상수': counts.ravel()
+    }, index=index)
+
+class TimingSlices:
+    """
+    기간(월/분기) × 그룹 × 요일(7) × 시간대(24) 조회수 합계 및 영상 수 큐브입니다.
+    기간 축은 빈 기간 없이 연속이며, update로 새 데이터만 더해 갱신합니다.
+    롤링 윈도우는 기간 축 누적합의 차이로 계산합니다.
+    """
+
+    def __init__(self, periods, groups, sums, counts, utc_offset=DATA_UTC_OFFSET):
+        self.periods = periods
+        self.groups = groups
+        self.sums = sums
+        self.counts = counts
+        self.utc_offset = utc_offset
+
+    def __len__(self):
+        return len(self.periods)
+
+    def update(self, df, value_col='조회수'):
+        """
+        새 영상들을 해당 기간 슬라이스에 더합니다. (기존 기간은 다시 집계하지 않음)
+
+        Parameters:
+        df (pd.DataFrame): 추가할 영상 데이터 (게시일, 조회수, 그룹 컬럼 필요)
+        value_col (str): 합산할 값 컬럼
+        """
+        valid_df = df[df['게시일'].notna()]
+        if valid_df.empty:
+            return
+
+        dates = valid_df['게시일']
+        if dates.dt.tz is not None:
+            dates = _shift_to_timezone(dates, self.utc_offset)
+        row_periods = dates.dt.to_period(self.periods.freqstr)
+
+        # 기간 축을 새 데이터 범위까지 연속으로 확장
+        periods = pd.period_range(
+            min(row_periods.min(), self.periods.min()) if len(self.periods) else row_periods.min(),
+            max(row_periods.max(), self.periods.max()) if len(self.periods) else row_periods.max(),
+            freq=self.periods.freq
+        )
+        new_groups = pd.Index(valid_df[self.groups.name].unique()).difference(self.groups, sort=False)
+        groups = self.groups.append(new_groups).rename(self.groups.name)
+
+        if len(periods) != len(self.periods) or len(groups) != len(self.groups):
+            period_start = periods.get_loc(self.periods[0]) if len(self.periods) else 0
+            padding = ((period_start, len(periods) - period_start - len(self.periods)),
+                       (0, len(groups) - len(self.groups)), (0, 0), (0, 0))
+            self.sums = np.pad(self.sums, padding)
+            self.counts = np.pad(self.counts, padding)
+            self.periods, self.groups = periods, groups
+
+        # 기간/그룹/요일/시간대를 하나의 정수 코드로 합친 뒤 bincount로 합산
+        period_codes = self.periods.get_indexer(row_periods)
+        group_codes = self.groups.get_indexer(valid_df[self.groups.name])
+        bins = ((period_codes * len(self.groups) + group_codes) * 7 + dates.dt.dayofweek.to_numpy()) * 24 \
+            + dates.dt.hour.to_numpy()
+
+        n_bins = self.sums.size
+        values = valid_df[value_col].to_numpy(dtype=np.float64)
+        self.sums = self.sums + np.bincount(bins, weights=values, minlength=n_bins).reshape(self.sums.shape)
+        self.counts = self.counts + np.bincount(bins, minlength=n_bins).reshape(self.counts.shape)
+
+    def cube(self, period=None):
+        """
+        한 기간(또는 전체 기간 합계)의 타이밍 큐브를 반환합니다.
+
+        Parameters:
+        period (str or pd.Period): 기간 (None이면 전체 기간 합계)
+
+        Returns:
+        TimingCube: 타이밍 큐브
+        """
+        if period is None:
+            return TimingCube(self.groups, self.sums.sum(axis=0), self.counts.sum(axis=0), self.utc_offset)
+
+        position = self.periods.get_loc(pd.Period(period, freq=self.periods.freq))
+        return TimingCube(self.groups, self.sums[position], self.counts[position], self.utc_offset)
+
+    def rolling(self, window):
+        """
+        각 기간을 끝으로 하는 최근 window개 기간의 합계 슬라이스를 반환합니다.
+
+        Parameters:
+        window (int): 롤링 윈도우 기간 수
+
+        Returns:
+        TimingSlices: 롤링 합계 슬라이스 (첫 window-1개 기간은 가능한 기간만 합산)
+        """
+        # 앞에 0을 붙인 누적합에서 window 만큼 떨어진 값을 빼기
+        sum_cumsum = np.concatenate([np.zeros((1,) + self.sums.shape[1:]), self.sums.cumsum(axis=0)])
+        count_cumsum = np.concatenate([np.zeros((1,) + self.counts.shape[1:]), self.counts.cumsum(axis=0)])
+        ends = np.arange(1, len(self) + 1)
+        starts = np.maximum(ends - window, 0)
+
+        return TimingSlices(self.periods, self.groups, sum_cumsum[ends] - sum_cumsum[starts],
+                            count_cumsum[ends] - count_cumsum[starts], self.utc_offset)
+
+    def to_timezone(self, timezone):
+        """
+        요일 × 시간대 칸을 다른 시간대 기준으로 회전한 슬라이스를 반환합니다.
+        (기간 경계는 원래 시간대 기준으로 유지)
+
+        Parameters:
+        timezone (int or str): 대상 UTC 오프셋(시간) 또는 시간대 이름
+
+        Returns:
+        TimingSlices: 대상 시간대 기준 슬라이스
+        """
+        target_offset = get_utc_offset(timezone)
+        shape = self.sums.shape[:2] + (-1,)
+        shift = target_offset - self.utc_offset
+
+        sums = np.roll(self.sums.reshape(shape), shift, axis=2).reshape(self.sums.shape)
+        counts = np.roll(self.counts.reshape(shape), shift, axis=2).reshape(self.counts.shape)
+
+        return TimingSlices(self.periods, self.groups, sums, counts, target_offset)
+
+    def best_slot_history(self, window=1, min_videos=1):
+        """
+        기간별 그룹의 최적 요일 × 시간대 변화를 계산합니다.
+
+        Parameters:
+        window (int): 롤링 윈도우 기간 수 (1이면 기간별 슬라이스 그대로)
+        min_videos (int): 평균에 포함할 칸의 최소 영상 수
+
+        Returns:
+        pd.DataFrame: (기간, 그룹)별 최적요일, 최적시간대, 평균조회수, 마진, 영상수
+        """
+        slices = self.rolling(window) if window > 1 else self
+
+        flat_sums = slices.sums.reshape(-1, 7 * 24)
+        flat_counts = slices.counts.reshape(-1, 7 * 24)
+        means = _mean_array(flat_sums, flat_counts, min_videos)
+        best_slots, margins, _ = _top_two(means, np.arange(7 * 24))
+
+        has_best = pd.notna(best_slots)
+        best = np.where(has_best, best_slots, 0).astype(np.int64)
+        rows = np.arange(len(flat_sums))
+
+        index = pd.MultiIndex.from_product([self.periods, self.groups], names=['기간', self.groups.name])
+        return pd.DataFrame({
+            '최적요일': np.where(has_best, np.array(DAY_ORDER, dtype=object)[best // 24], None),
+            '최적시간대': np.where(has_best, best % 24, np.nan),
+            '평균조회수': np.where(has_best, means[rows, best], np.nan),
+            '마진': margins,
+            '영상수': flat_counts.sum(axis=1)
+        }, index=index)
+
+def build_timing_slices(df, freq='M', group_col='카테고리', value_col='조회수', utc_offset=DATA_UTC_OFFSET):
+    """
+    게시일 기준 월/분기별 그룹 × 요일 × 시간대 슬라이스를 생성합니다.
+
+    Parameters:
+    df (pd.DataFrame): 전처리된 데이터프레임
+    freq (str): 기간 단위 ('M': 월, 'Q': 분기)
+    group_col (str): 그룹 기준 컬럼
+    value_col (str): 합산할 값 컬럼
+    utc_offset (int): 게시일이 시간대 정보 없이 저장된 경우의 UTC 오프셋 (기본값: KST)
+
+    Returns:
+    TimingSlices: 기간별 타이밍 슬라이스 (시간대 정보가 있는 게시일은 utc_offset 기준으로 변환)
+    """
+    slices = TimingSlices(pd.PeriodIndex([], freq=freq), pd.Index([], name=group_col),
+                          np.zeros((0, 0, 7, 24)), np.zeros((0, 0, 7, 24)), utc_offset)
+    slices.update(df, value_col)
+    return slices
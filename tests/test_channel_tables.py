@@ -0,0 +1,35 @@
+"""
+channel_tables 테스트
+"""
+
+import pandas as pd
+from channel_tables import build_channel_tables, channel_video_stats
+
+def _sample_videos():
+    return pd.DataFrame({
+        '채널명': ['A', 'A', 'A', 'B'],
+        '카테고리': ['Gaming', 'Food', 'Food', 'Gaming'],
+        '구독자수': [100, 300, 999, 50],
+        '게시일': pd.to_datetime(['2024-01-01', '2024-03-01', None, '2024-02-01']),
+        '조회수': [10.0, 20.0, 30.0, 40.0],
+        '제목': ['a', 'b', 'c', 'd']
+    })
+
+def test_latest_dated_video_wins():
+    # 게시일이 없는 영상의 값은 최신 값으로 쓰지 않음
+    channels, _ = build_channel_tables(_sample_videos())
+
+    assert channels['구독자수'].tolist() == [300, 50]
+
+def test_video_cols_limits_fact_table():
+    _, videos = build_channel_tables(_sample_videos(), video_cols=['조회수', '좋아요 수'])
+
+    assert videos.columns.tolist() == ['채널ID', '카테고리', '조회수']
+
+def test_category_stats_use_only_category_videos():
+    channels, videos = build_channel_tables(_sample_videos(), video_cols=['조회수'])
+    stats = channel_video_stats(videos, channels, category='Gaming')
+
+    assert stats['채널명'].tolist() == ['A', 'B']
+    assert stats['조회수'].tolist() == [10.0, 40.0]
+    assert stats['영상수'].tolist() == [1, 1]
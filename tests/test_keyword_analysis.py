@@ -0,0 +1,53 @@
+"""
+keyword_analysis 테스트
+"""
+
+from collections import Counter
+from io import StringIO
+from itertools import chain
+import numpy as np
+import pandas as pd
+from keyword_analysis import SpaceSavingCounter, count_top_keywords_streaming, count_title_terms
+
+def test_space_saving_matches_counter_within_error():
+    # 치우친 분포에서 Space-Saving 상위 키워드가 정확한 빈도(Counter)의 오차 범위 안에 있는지 확인
+    rng = np.random.default_rng(0)
+    words = np.array([f'단어{i}' for i in range(5000)], dtype=object)
+    token_ids = np.minimum(rng.zipf(1.3, size=200000), len(words)) - 1
+    title_tokens = pd.Series([tuple(words[ids]) for ids in token_ids.reshape(-1, 4)])
+
+    counter = SpaceSavingCounter(capacity=200)
+    for start in range(0, len(title_tokens), 5000):
+        counter.update(title_tokens.iloc[start:start + 5000])
+
+    exact = Counter(chain.from_iterable(title_tokens))
+    top = counter.most_common(20)
+    true_counts = top['키워드'].map(exact)
+    assert counter.total == sum(exact.values())
+    assert ((top['최소빈도'] <= true_counts) & (true_counts <= top['추정빈도'])).all()
+
+    # 추적되지 않는 키워드는 최소 추정빈도를 넘을 수 없으므로, 그보다 큰 실제 상위 키워드는 모두 포함되어야 함
+    min_count = counter.min_count()
+    assert all(word in counter.counts.index for word, count in exact.most_common(20) if count > min_count)
+
+def test_streaming_accepts_dataframe_chunks():
+    # pd.read_csv(chunksize=...) 데이터프레임 청크도 제목 컬럼을 골라 집계
+    csv = StringIO('제목\n' + '\n'.join(['게임 리뷰', '게임 공략', '여행 브이로그'] * 10))
+    streamed = count_top_keywords_streaming(pd.read_csv(csv, chunksize=7), top_n=2)
+
+    assert streamed['키워드'].iloc[0] == '게임'
+    assert streamed['추정빈도'].iloc[0] == 20
+
+def test_streaming_counts_ngrams():
+    titles = pd.Series(['게임 리뷰 영상', '게임 리뷰', '여행 브이로그'] * 10)
+    chunks = (titles.iloc[start:start + 7] for start in range(0, len(titles), 7))
+    streamed = count_top_keywords_streaming(chunks, top_n=2, ngram_range=(2, 2))
+
+    assert streamed['키워드'].tolist()[0] == '게임 리뷰'
+    assert streamed['추정빈도'].iloc[0] == 20
+
+def test_missing_groups_are_excluded():
+    # 결측 그룹의 제목은 마지막 그룹으로 섞이지 않고 제외
+    terms = count_title_terms(pd.Series([('게임',), ('여행',), ('요리',)]), groups=pd.Series(['A', None, 'B']))
+
+    assert terms[['그룹', '키워드']].values.tolist() == [['A', '게임'], ['B', '요리']]
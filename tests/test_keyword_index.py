@@ -0,0 +1,39 @@
+"""
+keyword_index 테스트
+"""
+
+import numpy as np
+import pandas as pd
+from keyword_index import KeywordIndex, build_keyword_index
+
+def _sample_videos():
+    return pd.DataFrame({
+        '제목': ['게임 리뷰', '게임을 시작', '먹방 브이로그', '오늘의 먹방을', '게임이랑 먹방', '게임 공략'],
+        '카테고리': ['Gaming', 'Gaming', 'Food', 'Food', 'Gaming', np.nan],
+        '조회수': [100, 200, 300, 400, 500, 600],
+        '좋아요 수': [10, 20, 30, 40, 50, 60]
+    })
+
+def test_append_matches_batch_build():
+    df = _sample_videos()
+    batch_index = build_keyword_index(df, cache_dir=None)
+
+    append_index = KeywordIndex(cache_dir=None)
+    for i in range(len(df)):
+        append_index.append(df.iloc[[i]])
+
+    assert sorted(batch_index.postings) == sorted(append_index.postings)
+    for token in batch_index.postings:
+        assert np.array_equal(batch_index.get_row_ids(token), append_index.get_row_ids(token))
+        assert batch_index.query(token) == append_index.query(token)
+        assert batch_index.query(token, 'Food') == append_index.query(token, 'Food')
+
+    assert batch_index.query('게임')['count'] == 4
+    assert batch_index.query('먹방')['count'] == 3
+    assert '게임을' not in batch_index.postings
+
+def test_unknown_category_returns_empty():
+    index = build_keyword_index(_sample_videos(), cache_dir=None)
+
+    assert len(index.get_row_ids('게임', 'Music')) == 0
+    assert index.query('게임', 'Music')['count'] == 0
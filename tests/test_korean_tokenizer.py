@@ -0,0 +1,32 @@
+"""
+korean_tokenizer 테스트
+"""
+
+import os
+import pandas as pd
+from korean_tokenizer import (simple_tokenize, tokenize_titles, get_tokenizer, get_token_cache_path,
+                              TOKENIZER_RULES_VERSION)
+
+def test_noun_final_syllables_are_kept():
+    # 명사 끝 글자가 조사와 같은 단어는 그대로 유지
+    assert simple_tokenize('라이브 플레이') == ['라이브', '플레이']
+    assert simple_tokenize('실험결과 정리') == ['실험결과', '정리']
+    assert simple_tokenize('마을 가을 고양이') == ['마을', '가을', '고양이']
+
+def test_particles_are_stripped_by_batchim():
+    assert simple_tokenize('게임 플레이를') == ['게임', '플레이']
+    assert simple_tokenize('먹방을 먹방이 먹방이랑') == ['먹방', '먹방', '먹방']
+    assert simple_tokenize('노래가 노래는 서울에서') == ['노래', '노래', '서울']
+
+def test_tokens_do_not_depend_on_batch():
+    titles = pd.Series(['먹방을 시작', '오늘의 먹방', '게임 플레이를', None])
+    batch_tokens = tokenize_titles(titles, use_cache=False)
+    single_tokens = [tokenize_titles(titles.iloc[[i]], use_cache=False).iloc[0] for i in range(len(titles))]
+
+    assert batch_tokens.tolist() == single_tokens
+    assert batch_tokens.tolist() == [('먹방', '시작'), ('오늘', '먹방'), ('게임', '플레이'), ()]
+
+def test_token_cache_key():
+    # 람다는 캐시하지 않고, 캐시 파일명은 규칙 버전을 포함
+    assert get_tokenizer(lambda text: text.split())[1] is None
+    assert get_token_cache_path('cache', 'simple') == os.path.join('cache', f'tokens_simple_v{TOKENIZER_RULES_VERSION}.pkl')
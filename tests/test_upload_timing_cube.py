@@ -0,0 +1,33 @@
+"""
+upload_timing_cube 테스트
+"""
+
+import numpy as np
+import pandas as pd
+from upload_timing_cube import build_timing_cube, bootstrap_best_slots, SLOT_TYPES
+
+def _sample_videos():
+    return pd.DataFrame({
+        '카테고리': ['Gaming', None, 'Food', 'Gaming', 'Food'],
+        '채널명': ['A', 'B', None, 'C', 'D'],
+        '게시일': pd.to_datetime(['2024-01-01 10:00', '2024-01-02 11:00', '2024-01-03 12:00',
+                                  '2024-01-04 13:00', '2024-01-05 14:00']),
+        '조회수': [100.0, 200.0, 300.0, 400.0, 500.0]
+    })
+
+def test_timing_cube_skips_missing_group_keys():
+    cube = build_timing_cube(_sample_videos())
+
+    assert list(cube.groups) == [('Gaming', 'A'), ('Gaming', 'C'), ('Food', 'D')]
+    assert cube.sums.sum() == 1000.0
+    assert cube.counts.sum() == 3
+    assert np.all(cube.sums[cube.groups.get_loc(('Food', 'D'))][4] == np.eye(24)[14] * 500.0)
+
+def test_bootstrap_index_covers_every_group_and_slot():
+    result = bootstrap_best_slots(_sample_videos(), slot='day', n_boot=20)
+    n_slots, slot_labels = SLOT_TYPES['day']
+
+    assert result.index.names == ['카테고리', '채널명', '슬롯']
+    assert len(result) == 3 * n_slots
+    assert list(result.loc[('Food', 'D')].index) == list(slot_labels)
+    assert result.loc[('Food', 'D', slot_labels[4]), '영상수'] == 1
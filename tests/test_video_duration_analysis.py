@@ -0,0 +1,24 @@
+"""
+05_video_duration_analysis 테스트
+"""
+
+import importlib
+import numpy as np
+import pandas as pd
+
+duration_analysis = importlib.import_module('05_video_duration_analysis')
+
+def test_empty_bootstrap_curves_do_not_pull_peak_interval():
+    # 영상이 10분 근처에만 있는 작은 그룹: 곡선이 비는 부트스트랩 표본이 있어도 최적길이 구간은 10분 근처
+    rng = np.random.default_rng(1)
+    durations = np.r_[rng.uniform(9.5, 10.5, 6), rng.uniform(1, 30, 2000)]
+    df = pd.DataFrame({
+        '카테고리': ['sparse'] * 6 + ['dense'] * 2000,
+        '재생 시간(분)': durations,
+        '조회수': rng.exponential(1000, len(durations))
+    })
+
+    peaks = duration_analysis.calculate_duration_response_curves(df, n_boot=200, min_videos=5)['peaks']
+
+    assert peaks.loc['sparse', '최적길이_하한'] > 5
+    assert peaks.loc['sparse', '최적길이_하한'] <= peaks.loc['sparse', '최적길이'] <= peaks.loc['sparse', '최적길이_상한']